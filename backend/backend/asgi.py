@@ -2,6 +2,9 @@
 ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn backend.asgi:application``) so the
+streaming compose endpoint (``api/compose/stream/``) does not pin a worker
+while tokens arrive from the model.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
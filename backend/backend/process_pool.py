@@ -0,0 +1,112 @@
+"""
+Bounded pools of worker processes for CPU-bound work (JD text extraction,
+resume rendering).
+
+A ``WorkerPool`` spawns at most ``MAX_WORKERS`` processes on first use,
+each with an address-space cap of ``MEMORY_LIMIT_MB``, and gives every call
+``TIMEOUT`` seconds, all read from the owner's settings dict. Failures reach
+the caller as the owner's exception types, and a pool whose worker died
+(e.g. killed for memory) is replaced by a fresh one.
+
+Functions run in the pool must not touch Django models: the workers are
+spawned processes without a configured Django.
+"""
+import multiprocessing
+import resource
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# --- Worker process side ---
+
+def _init_worker(memory_limit_mb):
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _run_in_worker(function, args, timeout, error, timeout_error, messages):
+    """Run in a pool process: call ``function(*args)`` within ``timeout`` seconds."""
+    def raise_timeout(signum, frame):
+        raise timeout_error(messages['timeout'])
+
+    signal.signal(signal.SIGALRM, raise_timeout)
+    signal.alarm(timeout)
+    try:
+        return function(*args)
+    except MemoryError:
+        raise error(messages['memory'])
+    finally:
+        signal.alarm(0)
+
+
+# --- Web process side ---
+
+class WorkerPool:
+    """
+    A lazily created process pool configured by ``get_config()`` (a dict with
+    ``MAX_WORKERS``, ``TIMEOUT`` and ``MEMORY_LIMIT_MB``). Failures raise
+    ``error``, or ``timeout_error`` (a subclass) for timeouts, with the
+    ``messages`` for 'timeout', 'memory' and 'crash'.
+    """
+
+    def __init__(self, get_config, error, timeout_error, messages):
+        self.get_config = get_config
+        self.error = error
+        self.timeout_error = timeout_error
+        self.messages = messages
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def get_executor(self):
+        """Return the process pool, (re)creating it if needed."""
+        with self._lock:
+            if self._executor is None:
+                config = self.get_config()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=config['MAX_WORKERS'],
+                    # Never fork the web process (threads, DB connections)
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(config['MEMORY_LIMIT_MB'],),
+                )
+            return self._executor
+
+    def _discard_broken_executor(self):
+        with self._lock:
+            executor = self._executor
+            if executor is None or not getattr(executor, '_broken', False):
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, function, *args):
+        """Start ``function(*args)`` in the pool and return its Future; ``function`` must be importable."""
+        call = (
+            _run_in_worker, function, args, self.get_config()['TIMEOUT'],
+            self.error, self.timeout_error, self.messages,
+        )
+        try:
+            return self.get_executor().submit(*call)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool once.
+            self._discard_broken_executor()
+            return self.get_executor().submit(*call)
+
+    def result(self, future):
+        """Wait for a Future from ``submit`` and translate failures into ``error``."""
+        # The worker enforces the timeout itself; this is only a backstop.
+        timeout = self.get_config()['TIMEOUT'] + 5
+        try:
+            return future.result(timeout=timeout)
+        except self.error:
+            raise
+        except TimeoutError as e:
+            raise self.timeout_error(self.messages['timeout']) from e
+        except BrokenProcessPool as e:
+            self._discard_broken_executor()
+            raise self.error(self.messages['crash']) from e
+        except Exception as e:
+            raise self.error(str(e)) from e
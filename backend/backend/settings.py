@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
+    "django.contrib.postgres", # Full-text search
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
@@ -127,6 +129,130 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Composed resume sections, keyed by a hash of section inputs + JD + prompt version + model.
+    # Shared by every web and compose worker process pointed at the same directory, so results
+    # (and the cache-stats counters) reach all of them; use django.core.cache.backends.redis.RedisCache
+    # when processes run on several hosts.
+    "compose": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("COMPOSE_CACHE_DIR", "/var/tmp/resume_bot/compose_cache"),
+        "TIMEOUT": 60 * 60 * 24 * 7, # TTL in seconds
+        "OPTIONS": {
+            "MAX_ENTRIES": 1000, # Beyond this, a third of the entries are evicted
+        },
+    },
+}
+
+
+# LLM provider used for composition (composer/providers.py)
+# Use "composer.providers.FakeProvider" to run the compose pipeline offline, e.g. for load tests.
+LLM_PROVIDER = {
+    "BACKEND": os.getenv("LLM_PROVIDER_BACKEND", "composer.providers.OpenAICompatibleProvider"),
+    "MODEL": "mistralai/mistral-7b-instruct:free",
+    "OPTIONS": {
+        # OpenAICompatibleProvider: extra completion arguments, e.g. "MAX_TOKENS": 1500, "TEMPERATURE": 0.7
+        # FakeProvider: "LATENCY": 0.5, "TOKENS_PER_SECOND": 40, "OUTPUT_TOKENS": 300, "FAILURE_RATE": 0.05, "SEED": 0
+    },
+}
+
+# Shared LLM client (composer/llm.py)
+LLM_CLIENT = {
+    "BASE_URL": "https://openrouter.ai/api/v1",
+    "API_KEY_ENV": "OPENROUTER_API_KEY",
+    "MAX_CONNECTIONS": 20, # HTTP connection pool size per process
+    "MAX_KEEPALIVE_CONNECTIONS": 10,
+    "KEEPALIVE_EXPIRY": 60, # Seconds an idle connection is kept open
+    "CONNECT_TIMEOUT": 5,
+    "READ_TIMEOUT": 120,
+    "MAX_RETRIES": 2,
+    "MAX_CONCURRENT_REQUESTS": 10, # In-flight model requests per process
+}
+
+# Compose prompt builder (composer/prompts.py)
+COMPOSE_PROMPT = {
+    "MAX_INPUT_TOKENS": 6000, # Estimated budget per section prompt; lowest-value content is trimmed first
+    "JD_SHARE": 0.6, # Share of the budget the JD may keep before the profile is trimmed further
+    "CHARS_PER_TOKEN": 4, # Heuristic used to estimate tokens
+}
+
+# Relevance ranking of profile items before prompting (composer/ranking.py)
+COMPOSE_RANKING = {
+    "ENABLED": True,
+    "MAX_ITEMS": {"experiences": 5, "projects": 3, "certifications": 3}, # Top-k per section
+}
+
+# Resumes are composed one section per model call (composer/prompts.py SECTIONS);
+# uncached sections of one composition are generated concurrently
+COMPOSE_SECTION_CONCURRENCY = 3 # Section model calls in flight per composition
+
+# Compressed, deduplicated storage of generated resume text (composer/storage.py)
+GENERATED_CONTENT_STORAGE = {
+    "CODEC": "zlib", # zlib, or zstd (needs the zstandard package)
+    "LEVEL": 6,
+    "DELTA": True, # Compress later versions for a JD against its first stored version
+}
+
+# Batch compose endpoint (compose/batch/)
+COMPOSE_BATCH_MAX_SIZE = 20 # Job descriptions per request
+COMPOSE_BATCH_CONCURRENCY = 5 # Compositions in flight per request
+
+# Background composition workers (manage.py run_compose_workers)
+COMPOSE_WORKER_CONCURRENCY = 4 # Max compositions in flight per worker process
+COMPOSE_WORKER_POLL_INTERVAL = 2 # Seconds between queue polls when idle
+COMPOSE_JOB_TIMEOUT = 10 * 60 # Running jobs older than this are requeued on worker start
+
+
+# Job description text extraction pool (jd_parser/extraction.py)
+JD_EXTRACTION = {
+    "MAX_WORKERS": 2, # Extraction processes per web process
+    "TIMEOUT": 60, # Seconds allowed per document
+    "MEMORY_LIMIT_MB": 512, # Address-space cap per extraction process
+    "ASYNC_THRESHOLD_BYTES": 2 * 1024 * 1024, # Larger uploads return immediately with extraction_status="pending"
+    "MAX_UPLOAD_BYTES": 10 * 1024 * 1024, # Larger uploads are rejected
+    "MAX_PAGES": 50, # PDFs with more pages are rejected
+    "MAX_UNCOMPRESSED_BYTES": 50 * 1024 * 1024, # DOCX archives unpacking to more are rejected
+    "PDF_ENGINE": os.getenv("JD_PDF_ENGINE", "pypdf2"), # pypdf2, pdfminer (pdfminer.six) or pymupdf
+    "DOCX_ENGINE": "streaming", # streaming (tables, headers, text boxes; flat memory) or python-docx
+    # Processes per PDF of at least PARALLEL_MIN_PAGES pages. Spawning costs ~1 s,
+    # so this only pays off for very long documents (see manage.py benchmark_extraction).
+    "PARALLEL_PAGES": 1,
+    "PARALLEL_MIN_PAGES": 40,
+    "BULK_MAX_FILES": 50, # Files per bulk upload or zip archive
+    "BULK_MAX_BYTES": 100 * 1024 * 1024, # Total unpacked size of a bulk zip archive
+    # Large uploads are kept here until extracted; manage.py recover_extractions restarts
+    # those whose web process stopped. Same filesystem as uploads lets them be hard-linked.
+    "PENDING_DIR": os.getenv("JD_PENDING_DIR") or None,
+}
+
+# Profile-to-JD fit scores of job-descriptions/ranked/ (jd_parser/matching.py)
+JD_MATCHING = {
+    "SKILL_WEIGHT": 0.7, # Share of the JD's skills found in the profile
+    "KEYWORD_WEIGHT": 0.3, # Share of the JD's top keywords found in the profile
+}
+
+# Server-side HTML/PDF rendering of resumes (resume/rendering.py); rendered files are
+# stored by a hash of their input (resume/artifacts.py), so each is rendered once
+RESUME_RENDERING = {
+    "MAX_WORKERS": 2, # Rendering processes per web process
+    "TIMEOUT": 30, # Seconds allowed per render
+    "MEMORY_LIMIT_MB": 512, # Address-space cap per rendering process
+    "PDF_ENGINE": "builtin", # builtin (standard library, PDF base fonts) or pymupdf (HTML/CSS layout, embedded fonts)
+    "CACHE_MAX_AGE": 365 * 24 * 60 * 60, # Seconds clients may cache a rendered file; its URL changes with its content
+    "URL_MAX_AGE": 60 * 60, # Seconds the signed link an export redirects to stays valid
+}
+
+# Uploads above this are streamed to a temporary file instead of held in memory,
+# and that file is handed to the extraction pool without another copy.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
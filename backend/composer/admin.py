@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import GeneratedResume
+from .models import GeneratedResume, CompositionJob, ResumeContent
 
 # Register your models here.
 admin.site.register(GeneratedResume)
+admin.site.register(ResumeContent)
+admin.site.register(CompositionJob)
@@ -0,0 +1,76 @@
+"""
+Content-addressed cache for composed resume sections.
+
+Entries are keyed by a hash of everything that determines the AI output
+of one section (the section's profile inputs, job description text, prompt
+version and model), so recomposing after an edit only calls the model for
+the sections the edit touched. TTL, eviction and the backend are configured
+through the ``compose`` entry of ``settings.CACHES``; it must be a backend
+shared by all processes (web and compose workers), so a section composed
+anywhere is reused everywhere and the hit/miss counters cover them all.
+The counters are approximate: the file backend increments are not atomic.
+"""
+import hashlib
+import json
+
+from django.core.cache import caches
+
+CACHE_ALIAS = 'compose'
+KEY_PREFIX = 'compose:section:'
+HITS_KEY = 'compose:stats:hits'
+MISSES_KEY = 'compose:stats:misses'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def make_key(section, inputs, jd_text, prompt_version, model):
+    """Build a stable cache key from the inputs of one section's composition."""
+    payload = json.dumps(
+        {
+            'section': section,
+            'inputs': inputs,
+            'job_description': jd_text,
+            'prompt_version': prompt_version,
+            'model': model,
+        },
+        sort_keys=True,
+        default=str, # Dates, Decimals, etc.
+    )
+    return KEY_PREFIX + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get(key):
+    """Return the cached content for ``key`` (or None) and record a hit/miss."""
+    content = get_cache().get(key)
+    _increment(HITS_KEY if content is not None else MISSES_KEY)
+    return content
+
+
+def set(key, content):
+    get_cache().set(key, content)
+
+
+def stats():
+    """Return the hit/miss counters of the compose cache."""
+    values = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0,
+    }
+
+
+def _increment(key):
+    cache = get_cache()
+    # Counters never expire; add() is a no-op if the key already exists.
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); start counting again.
+        cache.set(key, 1, timeout=None)
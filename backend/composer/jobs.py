@@ -0,0 +1,114 @@
+"""
+Database-backed queue for background resume composition.
+
+Jobs are rows of ``CompositionJob``. Workers claim pending rows with
+``SELECT ... FOR UPDATE SKIP LOCKED`` so any number of worker processes can
+share the queue without an external broker.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import CompositionJob
+from .services import ComposeError, compose, get_profile_data, save_result
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(user, jd, force_refresh=False):
+    """Create a pending composition job for ``user`` and ``jd``."""
+    return CompositionJob.objects.create(user=user, job_description=jd, force_refresh=force_refresh)
+
+
+def claim_next_job():
+    """Atomically mark the oldest pending job as running and return it (or None)."""
+    with transaction.atomic():
+        job = (
+            CompositionJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('created_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_job(job):
+    """Compose the resume for a claimed job and record the outcome on it."""
+    try:
+        jd = job.job_description
+        profile_data = get_profile_data(job.user)
+        result = compose(profile_data, jd, force_refresh=job.force_refresh)
+        job.generated_resume = save_result(job.user, jd, result.content, result.selected_items)
+        job.status = 'succeeded'
+    except ComposeError as e:
+        job.status = 'failed'
+        job.error = str(e)
+    except Exception as e:
+        logger.exception("Composition job %s failed", job.pk)
+        job.status = 'failed'
+        job.error = f"Unexpected error: {e}"
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'generated_resume', 'finished_at'])
+    return job
+
+
+def requeue_stale_jobs(timeout=None):
+    """Put jobs left running by a crashed worker back in the queue."""
+    timeout = settings.COMPOSE_JOB_TIMEOUT if timeout is None else timeout
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return CompositionJob.objects.filter(status='running', started_at__lt=cutoff).update(
+        status='pending', started_at=None
+    )
+
+
+def _worker_loop(stop_event, poll_interval, drain):
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if drain:
+                    return
+                stop_event.wait(poll_interval)
+                continue
+            run_job(job)
+    finally:
+        # Each worker thread owns its own database connection.
+        connection.close()
+
+
+def run_workers(concurrency=None, poll_interval=None, drain=False, stop_event=None):
+    """
+    Run ``concurrency`` worker threads until ``stop_event`` is set.
+
+    With ``drain=True`` the workers exit once the queue is empty instead of
+    polling for new jobs.
+    """
+    concurrency = concurrency or settings.COMPOSE_WORKER_CONCURRENCY
+    poll_interval = settings.COMPOSE_WORKER_POLL_INTERVAL if poll_interval is None else poll_interval
+    stop_event = stop_event or threading.Event()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='compose-worker') as executor:
+        futures = [
+            executor.submit(_worker_loop, stop_event, poll_interval, drain)
+            for _ in range(concurrency)
+        ]
+        try:
+            while not all(f.done() for f in futures):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            stop_event.set()
+    for future in futures:
+        future.result() # Surface unexpected worker crashes
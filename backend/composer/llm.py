@@ -0,0 +1,143 @@
+"""
+Process-wide, lazily initialised OpenAI-compatible clients.
+
+Reusing one client per process keeps HTTP connections (and their TLS
+sessions) alive between compositions instead of paying for a new handshake
+on every request. Pool size, timeouts and the number of concurrent model
+requests are configured by ``settings.LLM_CLIENT``.
+
+The sync client is shared by all threads. httpx async clients are bound to
+the event loop that created them, so one async client is kept per loop.
+"""
+import asyncio
+import os
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from dotenv import load_dotenv
+from openai import OpenAI, AsyncOpenAI # Use OpenAI library for OpenRouter
+
+# Load environment variables from .env file
+load_dotenv()
+
+_lock = threading.Lock()
+_client = None
+_async_clients = weakref.WeakKeyDictionary() # event loop -> AsyncOpenAI
+_limiter = None
+
+
+def get_config():
+    return settings.LLM_CLIENT
+
+
+def _client_kwargs(config):
+    api_key = os.getenv(config['API_KEY_ENV'])
+    if not api_key:
+        raise ImproperlyConfigured("OpenRouter API key not configured in environment.")
+    return {
+        'base_url': config['BASE_URL'],
+        'api_key': api_key,
+        'max_retries': config['MAX_RETRIES'],
+    }
+
+
+def _http_options(config):
+    return {
+        'limits': httpx.Limits(
+            max_connections=config['MAX_CONNECTIONS'],
+            max_keepalive_connections=config['MAX_KEEPALIVE_CONNECTIONS'],
+            keepalive_expiry=config['KEEPALIVE_EXPIRY'],
+        ),
+        'timeout': httpx.Timeout(config['READ_TIMEOUT'], connect=config['CONNECT_TIMEOUT']),
+    }
+
+
+def get_client():
+    """Return the shared sync client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                config = get_config()
+                _client = OpenAI(
+                    http_client=httpx.Client(**_http_options(config)),
+                    **_client_kwargs(config),
+                )
+    return _client
+
+
+def get_async_client():
+    """Return the async client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            config = get_config()
+            client = AsyncOpenAI(
+                http_client=httpx.AsyncClient(**_http_options(config)),
+                **_client_kwargs(config),
+            )
+            _async_clients[loop] = client
+    return client
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight model requests across all threads and event loops of the process."""
+
+    def __init__(self, limit, poll_interval=0.05):
+        self.limit = limit
+        self.poll_interval = poll_interval
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    @contextmanager
+    def slot(self):
+        self._semaphore.acquire()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        # Never block the event loop on the thread semaphore; poll instead so
+        # a cancelled task cannot leave a slot acquired.
+        while not self._semaphore.acquire(blocking=False):
+            await asyncio.sleep(self.poll_interval)
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _lock:
+            if _limiter is None:
+                _limiter = ConcurrencyLimiter(get_config()['MAX_CONCURRENT_REQUESTS'])
+    return _limiter
+
+
+def request_slot():
+    """Context manager reserving one of the process-wide model request slots."""
+    return get_limiter().slot()
+
+
+def async_request_slot():
+    """Async context manager reserving one of the process-wide model request slots."""
+    return get_limiter().async_slot()
+
+
+def reset():
+    """Drop the shared clients and limiter, e.g. after settings changed in tests."""
+    global _client, _limiter
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _async_clients.clear()
+        _limiter = None
@@ -0,0 +1,87 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from composer import storage
+from composer.models import GeneratedResume, ResumeContent
+from composer.serializers import GeneratedResumeSerializer
+from jd_parser.models import JobDescription
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large table of job descriptions and generated resumes (rolled back afterwards) and "
+        "time the list, latest and detail endpoints: median latency, queries per request and the "
+        "plan of the latest-resume query. An N+1 baseline serializes a page without select_related."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="Generated resumes to seed.")
+        parser.add_argument('--users', type=int, default=20, help="Users the rows are spread over.")
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.seed(options['rows'], options['users'])
+            self.run(user, options['repeat'])
+            transaction.set_rollback(True)
+
+    def seed(self, rows, user_count):
+        started = time.perf_counter()
+        suffix = timezone.now().strftime('%Y%m%d%H%M%S%f')
+        users = User.objects.bulk_create(User(username=f"benchmark-{suffix}-{i}") for i in range(user_count))
+        jds = JobDescription.objects.bulk_create(
+            (
+                JobDescription(user=users[i % user_count], title=f"Role {i}", raw_text=f"Job description {i}")
+                for i in range(max(user_count, rows // 10))
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        for start in range(0, rows, BATCH_SIZE):
+            indexes = range(start, min(start + BATCH_SIZE, rows))
+            storage.create_resumes(
+                [GeneratedResume(user=jds[i % len(jds)].user, job_description=jds[i % len(jds)]) for i in indexes],
+                [f"Resume {i}. " * 50 for i in indexes],
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ANALYZE {JobDescription._meta.db_table}, {GeneratedResume._meta.db_table}, "
+                f"{ResumeContent._meta.db_table}"
+            )
+        self.stdout.write(f"Seeded {rows} resumes and {len(jds)} job descriptions in {time.perf_counter() - started:.1f}s")
+        return users[0]
+
+    def run(self, user, repeat):
+        client = APIClient()
+        client.force_authenticate(user)
+        resume_id = GeneratedResume.objects.filter(user=user).values_list('id', flat=True).first()
+        requests = {
+            'list': lambda: client.get('/api/generated/'),
+            'list (page 2)': lambda: client.get(client.get('/api/generated/').data['next']),
+            'latest': lambda: client.get('/api/generated-resumes/latest/'),
+            'detail': lambda: client.get(f'/api/generated/{resume_id}/'),
+            'jd list': lambda: client.get('/api/job-descriptions/'),
+            'N+1 baseline (20 rows)': lambda: GeneratedResumeSerializer(
+                GeneratedResume.objects.filter(user=user).order_by('-created_at', '-id')[:20], many=True
+            ).data,
+        }
+        self.stdout.write(f"{'request':<24} {'median ms':>10} {'queries':>8}")
+        for name, request in requests.items():
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    request()
+                    timings.append(time.perf_counter() - started)
+            self.stdout.write(f"{name:<24} {statistics.median(timings) * 1000:>10.2f} {len(queries):>8}")
+
+        latest = GeneratedResume.objects.filter(user=user).order_by('-created_at', '-id')[:1]
+        self.stdout.write("\nPlan of the latest-resume query:\n" + latest.explain())
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
+
+from composer import storage
+from composer.models import ResumeContent
+
+
+class Command(BaseCommand):
+    help = (
+        "Move generated resumes written before compressed storage into ResumeContent, in batches "
+        "(safe to interrupt and re-run), and optionally delete contents no resume uses anymore."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Resumes per transaction.")
+        parser.add_argument('--prune', action='store_true', help="Also delete unreferenced contents.")
+
+    def handle(self, *args, **options):
+        moved = text_bytes = 0
+        while True:
+            count, size = storage.compress_legacy_batch(options['batch_size'])
+            if not count:
+                break
+            moved += count
+            text_bytes += size
+            self.stdout.write(f"Moved {moved} resume(s)...")
+        self.stdout.write(f"Moved {moved} resume(s) holding {text_bytes / 1024 / 1024:.1f} MB of text.")
+
+        if options['prune']:
+            self.stdout.write(f"Deleted {storage.prune_contents()} unreferenced content(s).")
+
+        totals = ResumeContent.objects.aggregate(contents=Count('id'), stored=Sum(Length('data')), text=Sum('length'))
+        self.stdout.write(
+            f"Stored contents: {totals['contents']}, {(totals['stored'] or 0) / 1024 / 1024:.1f} MB compressed "
+            f"for {(totals['text'] or 0) / 1024 / 1024:.1f} M characters of text."
+        )
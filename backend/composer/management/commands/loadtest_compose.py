@@ -0,0 +1,121 @@
+import contextvars
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from composer import providers
+from jd_parser.models import JobDescription
+
+
+# (start, end) of the provider calls made for the current request, section threads included
+provider_calls = contextvars.ContextVar('provider_calls')
+
+
+class TimedFakeProvider(providers.FakeProvider):
+    """FakeProvider that records when each completion was "at the provider"."""
+
+    def complete(self, messages):
+        started = time.perf_counter()
+        try:
+            return super().complete(messages)
+        finally:
+            provider_calls.get([]).append((started, time.perf_counter()))
+
+
+def covered_time(intervals):
+    """Wall-clock time covered by possibly overlapping (start, end) intervals."""
+    total, reached = 0.0, float('-inf')
+    for start, end in sorted(intervals):
+        if end > reached:
+            total += end - max(start, reached)
+            reached = end
+    return total
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the compose endpoint offline with the fake LLM provider and report "
+        "end-to-end latency next to our own overhead (latency minus provider time)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help="User whose profile and job descriptions are composed.")
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, default=5)
+        parser.add_argument('--latency', type=float, default=0.2, help="Fake provider latency before the first token (s).")
+        parser.add_argument('--tokens-per-second', type=float, default=0, help="Fake provider token rate (0 = instant).")
+        parser.add_argument('--failure-rate', type=float, default=0.0)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+        jd_ids = list(JobDescription.objects.filter(user=user).values_list('id', flat=True))
+        if not jd_ids:
+            raise CommandError("The user has no job descriptions to compose for.")
+
+        provider_settings = {
+            'BACKEND': 'composer.management.commands.loadtest_compose.TimedFakeProvider',
+            'MODEL': 'fake-loadtest',
+            'OPTIONS': {
+                'LATENCY': options['latency'],
+                'TOKENS_PER_SECOND': options['tokens_per_second'],
+                'FAILURE_RATE': options['failure_rate'],
+            },
+        }
+        with override_settings(LLM_PROVIDER=provider_settings):
+            providers.reset()
+            try:
+                samples = self.run_load(user, jd_ids, options['requests'], options['concurrency'])
+            finally:
+                providers.reset()
+        self.report(samples)
+
+    def run_load(self, user, jd_ids, total, concurrency):
+        def one_request(index):
+            client = APIClient()
+            client.force_authenticate(user)
+            calls = []
+            provider_calls.set(calls)
+            started = time.perf_counter()
+            try:
+                response = client.post(
+                    '/api/compose/',
+                    {'job_description_id': jd_ids[index % len(jd_ids)], 'force_refresh': True},
+                    format='json',
+                )
+                total_time = time.perf_counter() - started
+                return response.status_code, total_time, covered_time(calls)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(one_request, range(total)))
+
+    def report(self, samples):
+        ok = [sample for sample in samples if sample[0] == 200]
+        self.stdout.write(f"Requests: {len(samples)}  succeeded: {len(ok)}  failed: {len(samples) - len(ok)}")
+        if not ok:
+            return
+        for label, values in (
+            ("end-to-end", [total for _, total, _ in ok]),
+            ("provider", [provider for _, _, provider in ok]),
+            ("overhead", [total - provider for _, total, provider in ok]),
+        ):
+            values_ms = [value * 1000 for value in values]
+            self.stdout.write(
+                f"{label:>11}: p50 {percentile(values_ms, 50):8.1f} ms  p95 {percentile(values_ms, 95):8.1f} ms  "
+                f"max {max(values_ms):8.1f} ms  mean {statistics.mean(values_ms):8.1f} ms"
+            )
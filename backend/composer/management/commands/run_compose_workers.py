@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from composer import jobs
+
+
+class Command(BaseCommand):
+    help = "Run a pool of worker threads that execute queued composition jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.COMPOSE_WORKER_CONCURRENCY,
+            help="Number of jobs processed in parallel (default: COMPOSE_WORKER_CONCURRENCY).",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.COMPOSE_WORKER_POLL_INTERVAL,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+        parser.add_argument(
+            '--drain', action='store_true',
+            help="Exit once the queue is empty instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        requeued = jobs.requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s).")
+        self.stdout.write(f"Starting {options['concurrency']} composition worker(s)...")
+        jobs.run_workers(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            drain=options['drain'],
+        )
+        self.stdout.write(self.style.SUCCESS("Composition workers stopped."))
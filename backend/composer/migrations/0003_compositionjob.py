@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0002_remove_generatedresume_model_used'),
+        ('jd_parser', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompositionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('force_refresh', models.BooleanField(default=False, help_text='Bypass the compose cache for this job.')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('generated_resume', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='composer.generatedresume')),
+                ('job_description', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='composition_jobs', to='jd_parser.jobdescription')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='composition_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0003_compositionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedresume',
+            name='selected_items',
+            field=models.JSONField(blank=True, default=dict, help_text='Profile items ranked most relevant to the JD and sent to the AI, per section.'),
+        ),
+    ]
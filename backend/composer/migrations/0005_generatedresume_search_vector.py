@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:07
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0004_generatedresume_selected_items'),
+        ('jd_parser', '0005_jobdescription_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedresume',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('generated_content', config='english'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='generatedresume',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='resume_search_vector_idx'),
+        ),
+    ]
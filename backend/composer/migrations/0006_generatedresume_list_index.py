@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0005_generatedresume_search_vector'),
+        ('jd_parser', '0006_jobdescription_list_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generatedresume',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='resume_user_created_idx'),
+        ),
+    ]
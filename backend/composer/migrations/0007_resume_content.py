@@ -0,0 +1,66 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0006_generatedresume_list_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(help_text='SHA-256 of the UTF-8 text.', max_length=64, unique=True)),
+                ('codec', models.CharField(help_text='Compression codec of data (zlib or zstd).', max_length=10)),
+                ('data', models.BinaryField()),
+                ('length', models.PositiveIntegerField(help_text='Length of the text in characters.')),
+                ('preview', models.TextField(blank=True, help_text='Start of the text, for list views.')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='generatedresume',
+            name='resume_search_vector_idx',
+        ),
+        migrations.RemoveField(
+            model_name='generatedresume',
+            name='search_vector',
+        ),
+        # Same column, new name in Python: existing rows keep their text until compress_generated_resumes
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='generatedresume',
+                    old_name='generated_content',
+                    new_name='legacy_content',
+                ),
+                migrations.AlterField(
+                    model_name='generatedresume',
+                    name='legacy_content',
+                    field=models.TextField(blank=True, db_column='generated_content', help_text='Uncompressed content of resumes not yet moved to ResumeContent.'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='resumecontent',
+            name='base',
+            field=models.ForeignKey(blank=True, help_text='Content whose text is the compression dictionary of data.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='deltas', to='composer.resumecontent'),
+        ),
+        migrations.AddField(
+            model_name='generatedresume',
+            name='content',
+            field=models.ForeignKey(blank=True, help_text='The actual resume content generated by the AI.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='resumes', to='composer.resumecontent'),
+        ),
+        migrations.AddIndex(
+            model_name='resumecontent',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='resume_content_search_idx'),
+        ),
+    ]
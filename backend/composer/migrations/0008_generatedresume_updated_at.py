@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0007_resume_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedresume',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        # Existing resumes have not changed since they were written
+        migrations.RunSQL(
+            "UPDATE composer_generatedresume SET updated_at = created_at",
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,16 +1,95 @@
 from django.db import models
 from django.contrib.auth.models import User
-from jd_parser.models import JobDescription
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.utils.functional import cached_property
+from jd_parser.models import DeferSearchVectorManager, JobDescription
+
+class ResumeContent(models.Model):
+    """
+    Generated resume text, compressed and stored once per distinct content
+    (see composer/storage.py). Near-identical versions for the same JD are
+    stored as a delta against ``base``, the first stored version.
+    """
+    sha256 = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the UTF-8 text.")
+    codec = models.CharField(max_length=10, help_text="Compression codec of data (zlib or zstd).")
+    data = models.BinaryField()
+    base = models.ForeignKey('self', on_delete=models.PROTECT, null=True, blank=True, related_name='deltas', help_text="Content whose text is the compression dictionary of data.")
+    length = models.PositiveIntegerField(help_text="Length of the text in characters.")
+    preview = models.TextField(blank=True, help_text="Start of the text, for list views.")
+    search_vector = SearchVectorField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = DeferSearchVectorManager()
+
+    def __str__(self):
+        return f"Resume content {self.sha256[:12]} ({self.length} chars, {self.codec})"
+
+    @cached_property
+    def text(self):
+        from .storage import decompress # storage imports this module
+        base_text = self.base.text if self.base_id else None
+        return decompress(bytes(self.data), self.codec, base_text)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='resume_content_search_idx'),
+        ]
+
+class GeneratedResumeQuerySet(models.QuerySet):
+    def with_content(self):
+        """Join the compressed content (and its base) needed to read ``generated_content``."""
+        return self.select_related('content__base').defer('content__search_vector', 'content__base__search_vector')
 
 class GeneratedResume(models.Model):
     """Stores the resume content generated by the AI for a specific user and job description."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='generated_resumes')
     job_description = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name='generated_resumes')
-    generated_content = models.TextField(help_text="The actual resume content generated by the AI.")
+    content = models.ForeignKey(ResumeContent, on_delete=models.PROTECT, null=True, blank=True, related_name='resumes', help_text="The actual resume content generated by the AI.")
+    # Rows written before ResumeContent; moved by manage.py compress_generated_resumes
+    legacy_content = models.TextField(blank=True, db_column='generated_content', help_text="Uncompressed content of resumes not yet moved to ResumeContent.")
+    selected_items = models.JSONField(default=dict, blank=True, help_text="Profile items ranked most relevant to the JD and sent to the AI, per section.")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = GeneratedResumeQuerySet.as_manager()
 
     def __str__(self):
         return f"Generated Resume for {self.user.username} (JD: {self.job_description.id}) - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
 
+    @property
+    def generated_content(self):
+        """The resume text, decompressed on access (use ``with_content()`` to avoid extra queries)."""
+        return self.content.text if self.content_id else self.legacy_content
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a user's list
+            models.Index(fields=['user', '-created_at', '-id'], name='resume_user_created_idx'),
+        ]
+
+class CompositionJob(models.Model):
+    """A queued request to compose a resume, executed by the background workers."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='composition_jobs')
+    job_description = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name='composition_jobs')
+    force_refresh = models.BooleanField(default=False, help_text="Bypass the compose cache for this job.")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    generated_resume = models.ForeignKey(GeneratedResume, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Composition job {self.id} for {self.user.username} (JD: {self.job_description_id}) - {self.status}"
+
+    class Meta:
+        ordering = ['created_at']
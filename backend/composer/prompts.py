@@ -0,0 +1,335 @@
+"""
+Prompt construction for AI resume composition.
+
+Resumes are composed section by section (``build_section_prompts``): each
+section prompt carries only the profile fields that section depends on,
+plus the JD. Only the profile items most relevant to the JD are kept (see
+ranking.py), sent as compact JSON without ids, foreign keys or empty
+fields, and each section prompt is kept under
+``COMPOSE_PROMPT['MAX_INPUT_TOKENS']`` by trimming the lowest-value
+content first (see ``REDUCTION_STEPS``). A composition therefore sends at
+most one budget per section.
+"""
+import copy
+import json
+import math
+from typing import NamedTuple
+
+from django.conf import settings
+
+from .ranking import select_relevant_items
+
+# Bump whenever the prompt below changes so stale cached compositions are not reused.
+PROMPT_VERSION = 4
+
+DEFAULTS = {
+    'MAX_INPUT_TOKENS': 6000,
+    'JD_SHARE': 0.6, # Share of the remaining budget the JD may keep while the profile is trimmed
+    'CHARS_PER_TOKEN': 4,
+}
+
+# Keys that carry no information for the model
+OMITTED_KEYS = {'id', 'profile', 'user'}
+# Dropped first when over budget
+LOW_VALUE_KEYS = {
+    'education': ('description',),
+    'projects': ('project_url',),
+    'certifications': ('credential_id', 'credential_url', 'expiration_date'),
+}
+DESCRIPTION_LIMITS = (400, 200, 100) # Characters, applied in turn
+# Items kept per section when dropping the least relevant ones (oldest first for dated sections)
+ITEM_LIMITS = {'experiences': 4, 'projects': 3, 'education': 2, 'certifications': 3}
+
+SYSTEM_PROMPT = "You are an expert resume writer, skilled at tailoring resume content to specific job descriptions based on a user's profile."
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'COMPOSE_PROMPT', {})}
+
+
+def estimate_tokens(text, chars_per_token=None):
+    """Rough token count for budgeting; good enough without the model's tokenizer."""
+    chars_per_token = chars_per_token or get_config()['CHARS_PER_TOKEN']
+    return math.ceil(len(text) / chars_per_token)
+
+
+def _is_empty(value):
+    return value is None or value == '' or value == [] or value == {}
+
+
+def _compact_item(item):
+    return {key: value for key, value in item.items() if key not in OMITTED_KEYS and not _is_empty(value)}
+
+
+def compact_profile(profile_data):
+    """
+    Reduce serialized profile data (ProfileDetailSerializer output) to the
+    fields useful to the model: no ids/foreign keys, no empty values, skills
+    as a flat list of names, dated items newest first.
+    """
+    profile = _compact_item(profile_data)
+    user = profile_data.get('user') or {}
+    if not profile.get('full_name'):
+        full_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
+        if full_name:
+            profile['full_name'] = full_name
+    if not profile.get('email') and user.get('email'):
+        profile['email'] = user['email']
+
+    for section in ('education', 'experiences', 'projects', 'certifications'):
+        items = [_compact_item(item) for item in profile_data.get(section) or []]
+        if section in ('education', 'experiences'):
+            items.sort(key=lambda item: item.get('start_date', ''), reverse=True)
+        if items:
+            profile[section] = items
+        else:
+            profile.pop(section, None)
+
+    skills = [skill['name'] for skill in profile_data.get('skills') or [] if skill.get('name')]
+    if skills:
+        profile['skills'] = skills
+    else:
+        profile.pop('skills', None)
+    return profile
+
+
+def to_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def truncate_text(text, max_chars):
+    """Cut ``text`` to at most ``max_chars`` characters on a word boundary."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(' ', 1)[0] if ' ' in text[:max_chars] else text[:max_chars]
+    return cut.rstrip() + '…'
+
+
+class _PromptState:
+    """Mutable profile/JD pair trimmed step by step until the prompt of ``section`` fits the budget."""
+
+    def __init__(self, profile, jd_text, config, section):
+        self.profile = profile
+        self.jd_text = jd_text
+        self.config = config
+        self.section = section
+        self.overhead = sum(
+            estimate_tokens(m['content'], config['CHARS_PER_TOKEN']) for m in _section_messages(section, '', '')
+        )
+
+    def tokens(self):
+        return self.overhead + self.profile_tokens() + self.jd_tokens()
+
+    def profile_tokens(self):
+        return estimate_tokens(to_json(section_inputs(self.section, self.profile)), self.config['CHARS_PER_TOKEN'])
+
+    def jd_tokens(self):
+        return estimate_tokens(self.jd_text, self.config['CHARS_PER_TOKEN'])
+
+    def fits(self):
+        return self.tokens() <= self.config['MAX_INPUT_TOKENS']
+
+    def truncate_jd(self, max_tokens):
+        max_chars = max(0, int(max_tokens * self.config['CHARS_PER_TOKEN']))
+        self.jd_text = truncate_text(self.jd_text, max_chars)
+
+
+def _drop_low_value_fields(state):
+    for section, keys in LOW_VALUE_KEYS.items():
+        for item in state.profile.get(section, []):
+            for key in keys:
+                item.pop(key, None)
+
+
+def _cap_jd_share(state):
+    available = state.config['MAX_INPUT_TOKENS'] - state.overhead
+    state.truncate_jd(available * state.config['JD_SHARE'])
+
+
+def _shorten_descriptions(max_chars):
+    def step(state):
+        for section in ('projects', 'experiences', 'education'):
+            for item in state.profile.get(section, []):
+                if 'description' in item:
+                    item['description'] = truncate_text(item['description'], max_chars)
+    return step
+
+
+def _drop_extra_items(state):
+    # Least valuable sections first; stop as soon as the prompt fits.
+    for section in ('certifications', 'education', 'projects', 'experiences'):
+        items = state.profile.get(section, [])
+        while len(items) > ITEM_LIMITS[section] and not state.fits():
+            items.pop()
+
+
+def _truncate_profile_summary(state):
+    if 'summary' in state.profile:
+        state.profile['summary'] = truncate_text(state.profile['summary'], DESCRIPTION_LIMITS[-1] * 3)
+
+
+def _fill_jd_remainder(state):
+    available = state.config['MAX_INPUT_TOKENS'] - state.overhead - state.profile_tokens()
+    state.truncate_jd(available)
+
+
+# Applied in order until the prompt fits, lowest-value content first
+REDUCTION_STEPS = (
+    _drop_low_value_fields,
+    _cap_jd_share,
+    *(_shorten_descriptions(limit) for limit in DESCRIPTION_LIMITS),
+    _drop_extra_items,
+    _truncate_profile_summary,
+    _fill_jd_remainder,
+)
+
+
+def _fit_budget(state):
+    """Apply ``REDUCTION_STEPS`` until ``state`` fits; returns whether anything was trimmed."""
+    trimmed = False
+    for step in REDUCTION_STEPS:
+        if state.fits():
+            break
+        step(state)
+        trimmed = True
+    return trimmed
+
+
+# --- Per-section composition ---
+
+# Sections composed by separate model calls, in resume order: name -> (header, instructions).
+# Each call only sees the profile fields its inputs function returns, so a
+# cached section stays valid until one of those fields (or the JD) changes.
+SECTIONS = {
+    'summary': ("Professional Summary", """
+        - 3-4 sentences highlighting years of experience, core competencies, and alignment with the job's mission.
+        - Example: *"Results-driven [Job Title] with [X] years of experience in [Key Skill 1] and [Key Skill 2], seeking to leverage [Achievement] at [Target Company]."*"""),
+    'experience': ("Work Experience", """
+        - For each role, generate 2-3 bullet points using the STAR method:
+        - **Situation/Task:** Brief context.
+        - **Action:** Strong action verbs (*Optimized, Led, Implemented*).
+        - **Result:** Quantifiable outcomes (*"Improved performance by 30%"*).
+        - Example: *"Led a cross-functional team to migrate legacy systems to AWS, reducing downtime by 40%."*"""),
+    'projects': ("Projects", """
+        - Include 1-2 projects relevant to the job. For each:
+        - **Title:** Project name + timeframe.
+        - **Description:** Problem solved, tools used, and measurable impact.
+        - Example: *"Inventory Management System (Python/Django, 2023): Developed a cloud-based system reducing stock discrepancies by 25%."*"""),
+    'skills': ("Skills", """
+        - Group into: *Technical Skills (Programming, Tools), Soft Skills, Certifications*.
+        - Match exact terms from the job description (e.g., "React" vs. "JavaScript")."""),
+    'education': ("Education", """
+        - One line per degree: degree, field of study, institution and years.
+        - Mention coursework or honors only when relevant to the job."""),
+}
+# Experience fields the summary depends on; descriptions only feed the experience section
+SUMMARY_EXPERIENCE_KEYS = ('job_title', 'company_name', 'start_date', 'end_date')
+
+
+def section_inputs(name, profile):
+    """The part of a compact profile that section ``name`` is generated from (empty values dropped)."""
+    if name == 'summary':
+        inputs = {
+            'summary': profile.get('summary'),
+            'experiences': [
+                {key: item[key] for key in SUMMARY_EXPERIENCE_KEYS if key in item}
+                for item in profile.get('experiences', [])
+            ],
+            'skills': profile.get('skills'),
+        }
+    elif name == 'experience':
+        inputs = {'experiences': profile.get('experiences')}
+    elif name == 'projects':
+        inputs = {'projects': profile.get('projects')}
+    elif name == 'skills':
+        inputs = {
+            'skills': profile.get('skills'),
+            'certifications': profile.get('certifications'),
+            'technologies': [item['technologies_used'] for item in profile.get('projects', []) if 'technologies_used' in item],
+        }
+    elif name == 'education':
+        inputs = {'education': profile.get('education')}
+    else:
+        raise ValueError(f"Unknown resume section '{name}'.")
+    return {key: value for key, value in inputs.items() if not _is_empty(value)}
+
+
+def build_section_prompt(header, instructions, inputs_json, jd_text):
+    """Build the user prompt for one resume section."""
+    return f"""
+    **Goal:** Write the "{header}" section of an ATS-optimized resume tailored to the job description below. The other sections are written separately.
+
+    **Profile Data:**
+    ```json
+    {inputs_json}
+    ```
+
+    **Job Description:**
+    ```text
+    {jd_text}
+    ```
+
+    **Instructions:**{instructions}
+        - Prioritize keywords from the job description (skills, tools, certifications).
+        - Start with the Markdown header "## {header}". Bold key achievements (**$2M cost savings**). Keep bullets concise (1 line each). Avoid graphics/tables.
+
+    **Output:**
+    Generate only this section. Do not include greetings, introductory phrases or other sections.
+    """
+
+
+def _section_messages(name, inputs_json, jd_text):
+    header, instructions = SECTIONS[name]
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_section_prompt(header, instructions, inputs_json, jd_text)},
+    ]
+
+
+class SectionPrompt(NamedTuple):
+    name: str
+    inputs: dict # Exactly what the section depends on (besides the JD text)
+    jd_text: str # Job description text actually sent
+    messages: list
+    estimated_input_tokens: int # Within MAX_INPUT_TOKENS
+
+
+class SectionedPrompt(NamedTuple):
+    sections: list # SectionPrompt, in resume order; sections without inputs are left out
+    estimated_input_tokens: int # All sections together
+    trimmed: bool
+    selected_items: dict
+
+
+def build_section_prompts(profile_data, jd_text, max_input_tokens=None):
+    """
+    Build one prompt per resume section that has inputs, each within the
+    token budget on its own: the lowest-value content of that section (or
+    the JD) is trimmed first (see ``REDUCTION_STEPS``).
+
+    ``profile_data`` is ProfileDetailSerializer output; ``max_input_tokens``
+    overrides ``COMPOSE_PROMPT['MAX_INPUT_TOKENS']``.
+    """
+    config = get_config()
+    if max_input_tokens is not None:
+        config['MAX_INPUT_TOKENS'] = max_input_tokens
+    profile_data, selected_items = select_relevant_items(profile_data, jd_text)
+    profile = compact_profile(profile_data)
+    sections = []
+    trimmed = False
+    for name in SECTIONS:
+        if not section_inputs(name, profile):
+            continue
+        state = _PromptState(copy.deepcopy(profile), jd_text.strip(), config, name)
+        trimmed = _fit_budget(state) or trimmed
+        inputs = section_inputs(name, state.profile)
+        messages = _section_messages(name, to_json(inputs), state.jd_text)
+        estimated = sum(estimate_tokens(m['content'], config['CHARS_PER_TOKEN']) for m in messages)
+        sections.append(SectionPrompt(name, inputs, state.jd_text, messages, estimated))
+    total = sum(section.estimated_input_tokens for section in sections)
+    return SectionedPrompt(sections, total, trimmed, selected_items)
+
+
+def stitch_sections(texts):
+    """Assemble section outputs into one resume."""
+    return "\n\n".join(text.strip() for text in texts if text.strip())
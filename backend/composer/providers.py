@@ -0,0 +1,162 @@
+"""
+LLM provider backends for resume composition.
+
+The backend is selected by ``settings.LLM_PROVIDER['BACKEND']`` (a dotted
+path, like cache backends) and built once per process by ``get_provider()``:
+
+* ``OpenAICompatibleProvider`` talks to OpenRouter (or any OpenAI-compatible
+  API) through the pooled clients in composer/llm.py.
+* ``FakeProvider`` runs fully offline with configurable latency, token rate
+  and failure injection, so the compose pipeline can be load-tested and our
+  own overhead measured without a network or provider latency.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import llm
+
+DEFAULTS = {
+    'BACKEND': 'composer.providers.OpenAICompatibleProvider',
+    'MODEL': 'mistralai/mistral-7b-instruct:free',
+    'OPTIONS': {},
+}
+
+
+class ProviderError(Exception):
+    """Raised by providers when a completion fails."""
+
+
+class BaseProvider(ABC):
+    """Interface every provider backend implements."""
+
+    def __init__(self, model, **options):
+        self.model = model
+
+    def check_configured(self):
+        """Raise ImproperlyConfigured if the provider cannot be used."""
+
+    @abstractmethod
+    def complete(self, messages):
+        """Return the full completion text for the chat ``messages``."""
+
+    @abstractmethod
+    def astream(self, messages):
+        """Return an async iterator of completion text chunks as they are produced (an async generator)."""
+
+
+class OpenAICompatibleProvider(BaseProvider):
+    """Chat completions over an OpenAI-compatible HTTP API (OpenRouter by default)."""
+
+    def __init__(self, model, **options):
+        super().__init__(model)
+        self.options = {key.lower(): value for key, value in options.items()} # e.g. max_tokens, temperature
+
+    def check_configured(self):
+        llm.get_client()
+
+    def complete(self, messages):
+        client = llm.get_client()
+        with llm.request_slot():
+            completion = client.chat.completions.create(model=self.model, messages=messages, **self.options)
+        return completion.choices[0].message.content
+
+    async def astream(self, messages):
+        client = llm.get_async_client()
+        async with llm.async_request_slot():
+            stream = await client.chat.completions.create(
+                model=self.model, messages=messages, stream=True, **self.options
+            )
+            async for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    yield content
+
+
+class FakeProvider(BaseProvider):
+    """
+    Deterministic offline provider for tests and load tests.
+
+    Options: ``LATENCY`` (seconds before the first token), ``TOKENS_PER_SECOND``,
+    ``OUTPUT_TOKENS`` (length of the generated text), ``FAILURE_RATE``
+    (0..1, share of calls that raise) and ``SEED`` for the failure sequence.
+    The same messages always produce the same text.
+    """
+    VOCABULARY = (
+        "delivered", "scalable", "services", "improving", "reliability", "by", "30%", "led",
+        "cross-functional", "team", "designed", "APIs", "reduced", "latency", "automated",
+        "deployments", "mentored", "engineers", "optimized", "queries", "shipped", "features",
+    )
+
+    def __init__(self, model, LATENCY=0.0, TOKENS_PER_SECOND=0, OUTPUT_TOKENS=300, FAILURE_RATE=0.0, SEED=0, **options):
+        super().__init__(model)
+        self.latency = LATENCY
+        self.tokens_per_second = TOKENS_PER_SECOND # 0 means no delay between tokens
+        self.output_tokens = OUTPUT_TOKENS
+        self.failure_rate = FAILURE_RATE
+        self._random = random.Random(SEED)
+        self._lock = threading.Lock()
+
+    def _should_fail(self):
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def _tokens(self, messages):
+        digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode('utf-8')).digest()
+        words = [self.VOCABULARY[digest[i % len(digest)] % len(self.VOCABULARY)] for i in range(self.output_tokens)]
+        header = ["## Professional Summary\n", f"Fake resume {digest.hex()[:12]}.\n\n", "## Work Experience\n", "- "]
+        return header + [word + " " for word in words[:-1]] + words[-1:]
+
+    def _token_delay(self):
+        return 1 / self.tokens_per_second if self.tokens_per_second else 0
+
+    def complete(self, messages):
+        if self._should_fail():
+            raise ProviderError("Injected failure from FakeProvider.")
+        tokens = self._tokens(messages)
+        time.sleep(self.latency + self._token_delay() * len(tokens))
+        return ''.join(tokens)
+
+    async def astream(self, messages):
+        if self._should_fail():
+            raise ProviderError("Injected failure from FakeProvider.")
+        await asyncio.sleep(self.latency)
+        delay = self._token_delay()
+        for token in self._tokens(messages):
+            if delay:
+                await asyncio.sleep(delay)
+            yield token
+
+
+_lock = threading.Lock()
+_provider = None
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'LLM_PROVIDER', {})}
+
+
+def get_provider():
+    """Return the process-wide provider configured in ``settings.LLM_PROVIDER``."""
+    global _provider
+    if _provider is None:
+        with _lock:
+            if _provider is None:
+                config = get_config()
+                provider_class = import_string(config['BACKEND'])
+                _provider = provider_class(config['MODEL'], **config['OPTIONS'])
+    return _provider
+
+
+def reset():
+    """Drop the configured provider, e.g. after settings changed in tests."""
+    global _provider
+    with _lock:
+        _provider = None
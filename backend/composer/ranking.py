@@ -0,0 +1,97 @@
+"""
+Local relevance ranking of profile items against a job description.
+
+Items are scored with BM25 (computed with NumPy, no network) using the JD
+as the query, and only the best ``COMPOSE_RANKING['MAX_ITEMS']`` items per
+section are kept for the prompt. Profiles at or under the caps are sent
+unchanged.
+"""
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+
+from jd_parser.tokens import tokenize
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Maximum items per section sent to the model
+    'MAX_ITEMS': {'experiences': 5, 'projects': 3, 'certifications': 3},
+    'K1': 1.5,
+    'B': 0.75,
+}
+
+# Fields whose text represents each ranked section
+SECTION_FIELDS = {
+    'experiences': ('job_title', 'company_name', 'description'),
+    'projects': ('project_name', 'description', 'technologies_used'),
+    'certifications': ('name', 'issuing_organization'),
+}
+
+
+def get_config():
+    config = {**DEFAULTS, **getattr(settings, 'COMPOSE_RANKING', {})}
+    config['MAX_ITEMS'] = {**DEFAULTS['MAX_ITEMS'], **config['MAX_ITEMS']}
+    return config
+
+
+def bm25_scores(documents, query_tokens, k1=DEFAULTS['K1'], b=DEFAULTS['B']):
+    """
+    Score tokenized ``documents`` against ``query_tokens`` with BM25.
+    Returns an array with one score per document.
+    """
+    query_counts = Counter(query_tokens)
+    if not documents or not query_counts:
+        return np.zeros(len(documents))
+
+    vocabulary = {term: column for column, term in enumerate(query_counts)}
+    tf = np.zeros((len(documents), len(vocabulary)))
+    for row, tokens in enumerate(documents):
+        for token in tokens:
+            column = vocabulary.get(token)
+            if column is not None:
+                tf[row, column] += 1
+
+    doc_lengths = np.array([len(tokens) for tokens in documents], dtype=float)
+    avg_length = doc_lengths.mean() or 1.0
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * doc_lengths / avg_length)
+    term_scores = idf * tf * (k1 + 1) / (tf + norm[:, None])
+    # Terms repeated in the JD matter more, with diminishing returns
+    query_weights = np.log1p(np.fromiter(query_counts.values(), dtype=float))
+    return term_scores @ query_weights
+
+
+def item_text(section, item):
+    return ' '.join(str(item.get(field) or '') for field in SECTION_FIELDS[section])
+
+
+def select_relevant_items(profile_data, jd_text):
+    """
+    Keep only the top-ranked items of each section that exceeds its cap.
+
+    Returns ``(profile_data, selection)`` where ``selection`` maps each ranked
+    section to the kept items' ids and scores, best first. Kept items stay in
+    their original order in the returned profile data.
+    """
+    config = get_config()
+    if not config['ENABLED']:
+        return profile_data, {}
+
+    query = tokenize(jd_text)
+    selected_profile = dict(profile_data)
+    selection = {}
+    for section, max_items in config['MAX_ITEMS'].items():
+        items = list(profile_data.get(section) or [])
+        if len(items) <= max_items:
+            continue
+        scores = bm25_scores([tokenize(item_text(section, item)) for item in items], query, config['K1'], config['B'])
+        # Stable sort: ties keep profile order
+        top = sorted(np.argsort(-scores, kind='stable')[:max_items])
+        selected_profile[section] = [items[index] for index in top]
+        selection[section] = [
+            {'id': items[index].get('id'), 'score': round(float(scores[index]), 4)}
+            for index in sorted(top, key=lambda index: -scores[index])
+        ]
+    return selected_profile, selection
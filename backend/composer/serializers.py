@@ -1,13 +1,65 @@
+from django.urls import reverse
 from rest_framework import serializers
-from .models import GeneratedResume
+from .models import GeneratedResume, CompositionJob
+from .storage import update_content
 
 class GeneratedResumeSerializer(serializers.ModelSerializer):
     """Serializer for the GeneratedResume model."""
     # Optionally include related data like job description title
     job_description_title = serializers.CharField(source='job_description.title', read_only=True)
-    job_description_id = serializers.IntegerField(source='job_description.id', read_only=True)
+    job_description_id = serializers.IntegerField(read_only=True) # The FK column; no join needed
+    # Stored compressed (composer/storage.py); decompressed by the model on read
+    generated_content = serializers.CharField()
 
     class Meta:
         model = GeneratedResume
-        fields = ['id', 'job_description_id', 'job_description_title', 'generated_content', 'created_at']
-        read_only_fields = ['id', 'created_at'] # User, JD are implicitly set
+        fields = ['id', 'job_description_id', 'job_description_title', 'generated_content', 'selected_items', 'created_at']
+        read_only_fields = ['id', 'selected_items', 'created_at'] # User, JD are implicitly set
+
+    def update(self, instance, validated_data):
+        text = validated_data.pop('generated_content', None)
+        if text is not None and text != instance.generated_content:
+            update_content(instance, text)
+        return super().update(instance, validated_data)
+
+class GeneratedResumeListSerializer(serializers.ModelSerializer):
+    """
+    List-mode representation: a preview and the length of generated_content
+    (annotated by the list view) instead of the full body.
+    """
+    job_description_title = serializers.CharField(source='job_description.title', read_only=True)
+    job_description_id = serializers.IntegerField(read_only=True)
+    content_preview = serializers.CharField(read_only=True)
+    content_length = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = GeneratedResume
+        fields = ['id', 'job_description_id', 'job_description_title', 'content_preview', 'content_length', 'created_at']
+        read_only_fields = fields
+
+class GeneratedResumeSearchResultSerializer(GeneratedResumeSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(GeneratedResumeSerializer.Meta):
+        fields = GeneratedResumeSerializer.Meta.fields + ['rank']
+
+class CompositionJobSerializer(serializers.ModelSerializer):
+    """Serializer for polling the status of a CompositionJob."""
+    job_description_id = serializers.IntegerField(read_only=True)
+    generated_resume_id = serializers.IntegerField(read_only=True)
+    generated_resume_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CompositionJob
+        fields = [
+            'id', 'job_description_id', 'status', 'generated_resume_id', 'generated_resume_url',
+            'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_generated_resume_url(self, obj):
+        if not obj.generated_resume_id:
+            return None
+        url = reverse('generated-resume-detail', kwargs={'pk': obj.generated_resume_id})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
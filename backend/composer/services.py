@@ -0,0 +1,152 @@
+"""
+Resume composition shared by the compose endpoints and the background workers.
+"""
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from users.snapshots import get_profile_snapshot
+from . import cache as compose_cache
+from . import storage
+from .providers import get_provider
+from .models import GeneratedResume
+from .prompts import PROMPT_VERSION, build_section_prompts, stitch_sections
+
+logger = logging.getLogger(__name__)
+
+class ComposeError(Exception):
+    """Raised when resume content could not be generated by the AI model."""
+
+
+JD_NOT_READY_ERROR = "Text extraction for this job description has not completed yet."
+EMPTY_PROFILE_ERROR = "Your profile has nothing to compose a resume from: add a summary, experience, projects, skills or education."
+
+
+class ComposeResult(NamedTuple):
+    content: str
+    cached: bool # No section needed a model call
+    estimated_input_tokens: int
+    selected_items: dict
+    regenerated_sections: tuple = () # Sections the model was called for
+
+
+def get_profile_data(user):
+    """
+    Serialize the user's profile with all nested items for prompting.
+    Raises Profile.DoesNotExist if the user has no profile.
+    """
+    return get_profile_snapshot(user)
+
+
+def generate_content(messages):
+    """Call the configured AI provider with the prompt messages and return the generated resume content."""
+    provider = get_provider()
+    try:
+        provider.check_configured()
+    except ImproperlyConfigured as e:
+        raise ComposeError(str(e)) from e
+
+    try:
+        return provider.complete(messages)
+    except Exception as e:
+        # Handle potential API errors (rate limits, invalid key, model not found, etc.)
+        raise ComposeError(f"Error calling AI model: {e}") from e
+
+
+def prepare_prompt(profile_data, jd):
+    """
+    Build the budgeted section prompts for a profile/JD pair and one cache key per section.
+    Raises ComposeError if no section has anything to be composed from.
+    """
+    prompt = build_section_prompts(profile_data, jd.raw_text)
+    if not prompt.sections:
+        raise ComposeError(EMPTY_PROFILE_ERROR)
+    logger.info(
+        "Compose prompts for JD %s: %d sections, ~%d input tokens%s",
+        jd.pk, len(prompt.sections), prompt.estimated_input_tokens, " (trimmed to budget)" if prompt.trimmed else "",
+    )
+    # Keyed on what is actually sent, so budget changes do not reuse stale results.
+    model = get_provider().model
+    cache_keys = [
+        compose_cache.make_key(section.name, section.inputs, section.jd_text, PROMPT_VERSION, model)
+        for section in prompt.sections
+    ]
+    return prompt, cache_keys
+
+
+def cached_sections(cache_keys, force_refresh=False):
+    """Cached text of each section, None for those to generate."""
+    if force_refresh:
+        return [None] * len(cache_keys)
+    return [compose_cache.get(key) for key in cache_keys]
+
+
+def compose(profile_data, jd, force_refresh=False):
+    """
+    Return a ComposeResult for a profile/JD pair. Only sections whose inputs
+    changed since they were last composed (or all, with ``force_refresh``)
+    call the model, concurrently; the others come from the cache.
+    """
+    prompt, cache_keys = prepare_prompt(profile_data, jd)
+    texts = cached_sections(cache_keys, force_refresh)
+    missing = [index for index, text in enumerate(texts) if text is None]
+
+    def generate(index):
+        text = generate_content(prompt.sections[index].messages)
+        compose_cache.set(cache_keys[index], text) # Kept even if another section fails
+        return text
+
+    if missing:
+        max_workers = min(len(missing), settings.COMPOSE_SECTION_CONCURRENCY)
+        # Each call runs in a copy of the caller's context, so context variables reach the section threads
+        contexts = [contextvars.copy_context() for _ in missing]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='compose-section') as executor:
+            futures = [executor.submit(context.run, generate, index) for context, index in zip(contexts, missing)]
+        # The pool has let every section finish, so one failure does not discard the others' cached text
+        for index, future in zip(missing, futures):
+            texts[index] = future.result()
+    regenerated = tuple(prompt.sections[index].name for index in missing)
+    return ComposeResult(
+        stitch_sections(texts), not missing, prompt.estimated_input_tokens, prompt.selected_items, regenerated,
+    )
+
+
+def compose_many(profile_data, jds, force_refresh=False, max_workers=None):
+    """
+    Compose resumes for several JDs concurrently from one profile snapshot.
+
+    Returns a list of ``(jd, ComposeResult or ComposeError)`` in input order.
+    Only the model calls run in the pool; nothing here touches the database.
+    """
+    max_workers = max_workers or settings.COMPOSE_BATCH_CONCURRENCY
+
+    def run(jd):
+        if not jd.is_ready:
+            return ComposeError(JD_NOT_READY_ERROR)
+        try:
+            return compose(profile_data, jd, force_refresh=force_refresh)
+        except ComposeError as e:
+            return e
+
+    if not jds:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jds)), thread_name_prefix='compose-batch') as executor:
+        return list(zip(jds, executor.map(run, jds)))
+
+
+def save_result(user, jd, generated_content, selected_items=None):
+    resume = GeneratedResume(user=user, job_description=jd, selected_items=selected_items or {})
+    return storage.create_resumes([resume], [generated_content])[0]
+
+
+def save_results(user, results):
+    """Store successful compositions from ``compose_many`` with a single bulk insert."""
+    succeeded = [(jd, result) for jd, result in results if isinstance(result, ComposeResult)]
+    return storage.create_resumes(
+        [GeneratedResume(user=user, job_description=jd, selected_items=result.selected_items or {}) for jd, result in succeeded],
+        [result.content for _jd, result in succeeded],
+    )
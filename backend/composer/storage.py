@@ -0,0 +1,224 @@
+"""
+Compressed, deduplicated storage of generated resume text.
+
+Each distinct text is stored once in ``ResumeContent``, keyed by its
+SHA-256 and compressed with ``GENERATED_CONTENT_STORAGE['CODEC']`` (zlib,
+or zstd with the optional ``zstandard`` package). Versions composed for a
+JD that already has a stored resume are compressed with that first
+version (the ``base``) as a preset dictionary, so near-identical versions
+cost little more than their differences. The smaller of the plain and the
+delta encoding is kept, and bases are always plain, so reading any
+content decompresses at most two rows.
+
+``GeneratedResume.generated_content`` decompresses on access. Resumes
+written before this layer keep their text in ``legacy_content`` until
+``manage.py compress_generated_resumes`` moves them, in resumable batches;
+search only matches the indexed ``ResumeContent.search_vector``, so run it
+once after deploying.
+
+A reused content is locked until the transaction saving the resumes that
+point at it commits, and ``prune_contents`` skips locked rows, so pruning
+never deletes a content a concurrent compose is about to use.
+"""
+import hashlib
+import importlib
+import zlib
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import TextField, Value
+
+from jd_parser.models import SEARCH_CONFIG
+from .models import GeneratedResume, ResumeContent
+
+DEFAULTS = {
+    'CODEC': 'zlib',
+    'LEVEL': 6,
+    # Compress later versions for the same JD against the first one
+    'DELTA': True,
+}
+
+PREVIEW_CHARS = 280
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'GENERATED_CONTENT_STORAGE', {})}
+
+
+def _zstandard():
+    try:
+        return importlib.import_module('zstandard')
+    except ImportError as e:
+        raise ImproperlyConfigured(f"The 'zstd' codec needs the 'zstandard' package: {e}")
+
+
+def compress(text, codec, level, base_text=None):
+    raw = text.encode('utf-8')
+    base = base_text.encode('utf-8') if base_text else None
+    if codec == 'zlib':
+        compressor = zlib.compressobj(level, zdict=base) if base else zlib.compressobj(level)
+        return compressor.compress(raw) + compressor.flush()
+    if codec == 'zstd':
+        zstandard = _zstandard()
+        dictionary = zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT) if base else None
+        return zstandard.ZstdCompressor(level=level, dict_data=dictionary).compress(raw)
+    raise ImproperlyConfigured(f"Unknown generated content codec '{codec}'. Choose from: zlib, zstd.")
+
+
+def decompress(data, codec, base_text=None):
+    base = base_text.encode('utf-8') if base_text else None
+    if codec == 'zlib':
+        decompressor = zlib.decompressobj(zdict=base) if base else zlib.decompressobj()
+        raw = decompressor.decompress(data) + decompressor.flush()
+    elif codec == 'zstd':
+        zstandard = _zstandard()
+        dictionary = zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT) if base else None
+        raw = zstandard.ZstdDecompressor(dict_data=dictionary).decompress(data)
+    else:
+        raise ValueError(f"Unknown generated content codec '{codec}'.")
+    return raw.decode('utf-8')
+
+
+def content_sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _build_content(text, digest, base, config):
+    content = ResumeContent(
+        sha256=digest,
+        codec=config['CODEC'],
+        data=compress(text, config['CODEC'], config['LEVEL']),
+        length=len(text),
+        preview=text[:PREVIEW_CHARS],
+        search_vector=SearchVector(Value(text, output_field=TextField()), config=SEARCH_CONFIG),
+    )
+    if base is not None:
+        delta = compress(text, config['CODEC'], config['LEVEL'], base.text)
+        if len(delta) < len(content.data):
+            content.data, content.base = delta, base
+    content.text = text # Seed the cached_property; no need to decompress what we just wrote
+    return content
+
+
+def store_contents(items, config=None):
+    """
+    Return a ``ResumeContent`` for each ``(text, base)`` pair, reusing the
+    stored row of texts seen before and inserting the rest in one query.
+    Must run in the transaction that saves the resumes using them: reused
+    rows stay locked against ``prune_contents`` until it commits.
+    """
+    config = config or get_config()
+    digests = [content_sha256(text) for text, _base in items]
+    # Locked in a fixed order so concurrent writers cannot deadlock; a row pruned meanwhile is skipped and re-inserted
+    reused = ResumeContent.objects.filter(sha256__in=digests).order_by('sha256').select_for_update(no_key=True)
+    stored = {content.sha256: content for content in reused}
+    new = {}
+    for (text, base), digest in zip(items, digests):
+        if digest not in stored and digest not in new:
+            new[digest] = _build_content(text, digest, base, config)
+    if new:
+        # A concurrent writer may have stored the same text: keep its row
+        ResumeContent.objects.bulk_create(new.values(), ignore_conflicts=True)
+        for content in ResumeContent.objects.filter(sha256__in=new).order_by('sha256').select_for_update(no_key=True):
+            content.text = new[content.sha256].text
+            stored[content.sha256] = content
+    return [stored[digest] for digest in digests]
+
+
+def _latest_bases(jd_ids):
+    """Base content of each JD's latest stored resume, keyed by JD id."""
+    latest = (
+        GeneratedResume.objects
+        .filter(job_description_id__in=jd_ids, content__isnull=False)
+        .order_by('job_description_id', '-created_at', '-id')
+        .distinct('job_description_id')
+        .values_list('job_description_id', 'content__base_id', 'content_id')
+    )
+    base_ids = {jd_id: base_id or content_id for jd_id, base_id, content_id in latest}
+    contents = ResumeContent.objects.in_bulk(set(base_ids.values()))
+    return {jd_id: contents[content_id] for jd_id, content_id in base_ids.items()}
+
+
+def attach_contents(resumes, texts):
+    """
+    Store ``texts`` and point each of the (unsaved or migrating) ``resumes``
+    at its content. The first resume of a JD without stored versions becomes
+    the base of the JD's other resumes in the same call.
+    """
+    config = get_config()
+    bases = _latest_bases({resume.job_description_id for resume in resumes}) if config['DELTA'] else {}
+    first, rest = [], []
+    for index, resume in enumerate(resumes):
+        jd_id = resume.job_description_id
+        if config['DELTA'] and jd_id not in bases:
+            bases[jd_id] = None # Stored plain below, then used as the base
+            first.append(index)
+        else:
+            rest.append(index)
+    with transaction.atomic():
+        for index, content in zip(first, store_contents([(texts[index], None) for index in first], config)):
+            resume = resumes[index]
+            resume.content = content
+            if bases[resume.job_description_id] is None:
+                bases[resume.job_description_id] = content.base or content
+        items = [(texts[index], bases.get(resumes[index].job_description_id)) for index in rest]
+        for index, content in zip(rest, store_contents(items, config)):
+            resumes[index].content = content
+    for resume in resumes:
+        resume.legacy_content = ''
+    return resumes
+
+
+def create_resumes(resumes, texts):
+    """Store the texts of unsaved ``resumes`` and insert them with one query."""
+    with transaction.atomic():
+        attach_contents(resumes, texts)
+        return GeneratedResume.objects.bulk_create(resumes)
+
+
+def update_content(resume, text):
+    """Replace the text of a saved resume."""
+    with transaction.atomic():
+        attach_contents([resume], [text])
+        resume.save(update_fields=['content', 'legacy_content', 'updated_at'])
+    return resume
+
+
+def compress_legacy_batch(batch_size):
+    """
+    Move up to ``batch_size`` resumes still holding ``legacy_content`` into
+    ``ResumeContent``; returns how many were moved and their text size in bytes.
+    Versions of a JD are taken oldest first so the first becomes the base.
+    """
+    with transaction.atomic():
+        batch = list(
+            GeneratedResume.objects
+            .filter(content__isnull=True)
+            .order_by('job_description_id', 'created_at', 'id')
+            .only('id', 'job_description_id', 'legacy_content')
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        texts = [resume.legacy_content for resume in batch]
+        attach_contents(batch, texts)
+        GeneratedResume.objects.bulk_update(batch, ['content', 'legacy_content'])
+    return len(batch), sum(len(text.encode('utf-8')) for text in texts)
+
+
+def prune_contents():
+    """
+    Delete stored contents no resume uses (e.g. after resumes were deleted); returns how many.
+    Contents a concurrent writer has locked for reuse are left alone.
+    """
+    removed = 0
+    while True:
+        with transaction.atomic():
+            unused = ResumeContent.objects.filter(resumes__isnull=True, deltas__isnull=True)
+            ids = list(unused.select_for_update(skip_locked=True, of=('self',)).values_list('pk', flat=True))
+            # Re-checked under the lock: a writer that committed meanwhile has made its row used again
+            count, _ = unused.filter(pk__in=ids).delete() if ids else (0, {})
+        # Bases go once their last delta has gone
+        if not count:
+            return removed
+        removed += count
@@ -1,3 +1,585 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+import threading
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from jd_parser.models import JobDescription
+from users.models import Profile, Experience, Project, Skill
+from . import cache as compose_cache
+from . import jobs, providers, storage
+from .models import CompositionJob, GeneratedResume, ResumeContent
+from .ranking import bm25_scores, select_relevant_items, tokenize
+from .prompts import SECTIONS, build_section_prompts, estimate_tokens
+from .services import ComposeError, compose, get_profile_data, prepare_prompt
+
+
+class ComposeTestCase(TestCase):
+    """
+    Composes offline: FakeProvider instead of the model API and a compose
+    cache in a temporary directory. Gives ``self.user`` a small profile and
+    one ready job description, ``self.jd``.
+    """
+    PROVIDER_OPTIONS = {}
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(
+            LLM_PROVIDER={'BACKEND': 'composer.providers.FakeProvider', 'MODEL': 'fake', 'OPTIONS': self.PROVIDER_OPTIONS},
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                compose_cache.CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir},
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        providers.reset()
+        self.addCleanup(providers.reset)
+
+        self.user = User.objects.create_user('composer', 'composer@example.com', 'password')
+        self.profile = Profile.objects.create(user=self.user, full_name="Ada Dev", summary="Backend engineer.")
+        Experience.objects.create(
+            profile=self.profile, company_name="Acme", job_title="Backend Engineer", start_date=date(2019, 1, 1),
+            description="Built Django services on PostgreSQL.",
+        )
+        Skill.objects.create(profile=self.profile, name="Python")
+        self.jd = JobDescription.objects.create(
+            user=self.user, title="Platform Engineer", raw_text="We need a Python and Django engineer for our platform.",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class GeneratedResumeQueryCountTests(TestCase):
+    """Listing and reading resumes costs the same number of queries whatever the row count."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('writer', 'writer@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_resumes(self, count):
+        jds = JobDescription.objects.bulk_create(
+            JobDescription(user=self.user, title=f"Role {i}", raw_text=f"Job {i}") for i in range(count)
+        )
+        return storage.create_resumes(
+            [GeneratedResume(user=self.user, job_description=jd) for jd in jds],
+            [f"Resume for role {i}" for i in range(count)],
+        )
+
+    def test_list_query_count_does_not_grow(self):
+        self.add_resumes(1)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/generated/')
+        self.assertEqual(len(response.data['results']), 1)
+
+        self.add_resumes(30)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/generated/')
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertTrue(all(item['job_description_title'].startswith("Role ") for item in response.data['results']))
+
+    def test_latest_and_detail_join_the_job_description(self):
+        resumes = self.add_resumes(3)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/generated-resumes/latest/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], max(resume.pk for resume in resumes)) # Same created_at: newest id wins
+        self.assertEqual(response.data['job_description_title'], "Role 2")
+
+        with self.assertNumQueries(2): # ETag check + the joined read
+            response = self.client.get(f'/api/generated/{resumes[0].pk}/')
+        self.assertEqual(response.data['job_description_title'], "Role 0")
+
+    def test_latest_without_resumes_is_404(self):
+        response = self.client.get('/api/generated-resumes/latest/')
+        self.assertEqual(response.status_code, 404)
+
+
+class ResumeContentStorageTests(TestCase):
+    """Legacy resumes are moved into indexed content; pruning removes only unused contents."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('writer', 'writer@example.com', 'password')
+        self.jd = JobDescription.objects.create(user=self.user, title="SRE", raw_text="Site reliability.")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_legacy_resumes_are_searchable_once_moved(self):
+        legacy = GeneratedResume.objects.create(
+            user=self.user, job_description=self.jd, legacy_content="Ran Kubernetes clusters on call.",
+        )
+        self.assertEqual(self.client.get('/api/generated/search/', {'q': 'kubernetes'}).data['results'], [])
+        call_command('compress_generated_resumes', '--batch-size', '1', stdout=io.StringIO())
+
+        legacy = GeneratedResume.objects.with_content().get(pk=legacy.pk)
+        self.assertEqual(legacy.legacy_content, '')
+        self.assertEqual(legacy.generated_content, "Ran Kubernetes clusters on call.")
+        response = self.client.get('/api/generated/search/', {'q': 'kubernetes'})
+        self.assertEqual([item['id'] for item in response.data['results']], [legacy.pk])
+
+    def test_prune_keeps_used_contents(self):
+        kept, dropped = storage.create_resumes(
+            [GeneratedResume(user=self.user, job_description=self.jd) for _ in range(2)], ["Kept.", "Dropped."],
+        )
+        dropped.delete()
+        self.assertEqual(storage.prune_contents(), 1)
+        self.assertEqual(list(ResumeContent.objects.values_list('pk', flat=True)), [kept.content_id])
+
+
+class ResumeContentPruneRaceTests(TransactionTestCase):
+    """A content being reused by an uncommitted compose is not pruned from under it."""
+
+    def test_prune_skips_contents_locked_for_reuse(self):
+        user = User.objects.create_user('writer', 'writer@example.com', 'password')
+        jd = JobDescription.objects.create(user=user, title="SRE", raw_text="Site reliability.")
+        old = storage.create_resumes([GeneratedResume(user=user, job_description=jd)], ["Same text."])[0]
+        old.delete() # Its content is now unused, until the compose below reuses it
+
+        locked, release = threading.Event(), threading.Event()
+
+        def compose_again():
+            try:
+                with transaction.atomic():
+                    resume = GeneratedResume(user=user, job_description=jd)
+                    storage.attach_contents([resume], ["Same text."])
+                    locked.set()
+                    release.wait(10)
+                    resume.save()
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=compose_again)
+        writer.start()
+        self.assertTrue(locked.wait(10))
+        self.assertEqual(storage.prune_contents(), 0)
+        release.set()
+        writer.join()
+
+        self.assertEqual(GeneratedResume.objects.with_content().get().generated_content, "Same text.")
+
+
+class GeneratedResumeConditionalGetTests(TestCase):
+    """Polling an unchanged resume answers 304 from one small query; edits change its validators."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('poller', 'poller@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.jd = JobDescription.objects.create(user=self.user, title="Role", raw_text="Job")
+        self.resume, = storage.create_resumes([GeneratedResume(user=self.user, job_description=self.jd)], ["Resume"])
+        self.url = f'/api/generated/{self.resume.pk}/'
+
+    def test_unchanged_resume_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(f'/api/generated/{self.resume.pk}/preview/')
+        response = self.client.get(
+            f'/api/generated/{self.resume.pk}/preview/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_edits_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.patch(self.url, {'generated_content': "Edited"}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['generated_content'], "Edited")
+
+        etag = response['ETag']
+        self.jd.title = "Renamed role"
+        self.jd.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['job_description_title'], "Renamed role")
+
+    def test_other_users_get_no_validators(self):
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user('other', 'other@example.com', 'password'))
+        response = other.get(self.url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+
+
+class ComposeCacheTests(ComposeTestCase):
+    """Sections are composed once and then reused, by any process sharing the cache."""
+
+    def test_miss_then_hit(self):
+        profile_data = get_profile_data(self.user)
+        first = compose(profile_data, self.jd)
+        self.assertFalse(first.cached)
+        self.assertEqual(set(first.regenerated_sections), set(SECTIONS) - {'projects', 'education'}) # No such items
+
+        second = compose(profile_data, self.jd)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.regenerated_sections, ())
+        self.assertEqual(second.content, first.content)
+        stats = compose_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (len(first.regenerated_sections), len(first.regenerated_sections)))
+
+    def test_force_refresh_regenerates_every_section(self):
+        profile_data = get_profile_data(self.user)
+        first = compose(profile_data, self.jd)
+        refreshed = compose(profile_data, self.jd, force_refresh=True)
+        self.assertFalse(refreshed.cached)
+        self.assertEqual(refreshed.regenerated_sections, first.regenerated_sections)
+
+    def test_entries_are_shared_through_the_backend(self):
+        profile_data = get_profile_data(self.user)
+        compose(profile_data, self.jd)
+        _prompt, cache_keys = prepare_prompt(profile_data, self.jd)
+        # A separate cache instance on the same location, as another process would open
+        other = FileBasedCache(settings.CACHES[compose_cache.CACHE_ALIAS]['LOCATION'], {})
+        self.assertTrue(all(other.get(key) for key in cache_keys))
+
+    def test_only_changed_sections_are_regenerated(self):
+        compose(get_profile_data(self.user), self.jd)
+        Project.objects.create(profile=self.profile, project_name="Billing", description="Invoicing service.")
+        profile_data = get_profile_data(self.user)
+        result = compose(profile_data, self.jd)
+        self.assertEqual(result.regenerated_sections, ('projects',))
+
+        # Stitched in resume order, whichever sections came from the cache
+        prompt, cache_keys = prepare_prompt(profile_data, self.jd)
+        self.assertEqual([section.name for section in prompt.sections], ['summary', 'experience', 'projects', 'skills'])
+        self.assertEqual(result.content, "\n\n".join(compose_cache.get(key).strip() for key in cache_keys))
+
+    def test_failed_section_fails_the_composition_and_is_retried_alone(self):
+        complete = providers.FakeProvider.complete
+
+        def fail_experience(provider, messages):
+            if '"Work Experience"' in messages[1]['content']:
+                raise providers.ProviderError("Experience failed.")
+            return complete(provider, messages)
+
+        profile_data = get_profile_data(self.user)
+        with mock.patch.object(providers.FakeProvider, 'complete', fail_experience):
+            with self.assertRaisesMessage(ComposeError, "Experience failed."):
+                compose(profile_data, self.jd)
+        # The sections that succeeded were cached
+        result = compose(profile_data, self.jd)
+        self.assertEqual(result.regenerated_sections, ('experience',))
+
+    def test_profile_without_inputs_is_an_error(self):
+        Experience.objects.filter(profile=self.profile).delete()
+        Skill.objects.filter(profile=self.profile).delete()
+        self.profile.summary = ''
+        self.profile.save()
+        response = self.client.post('/api/compose/', {'job_description_id': self.jd.pk}, format='json')
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("nothing to compose", response.data['error'])
+        self.assertFalse(GeneratedResume.objects.exists())
+
+
+def parse_events(body):
+    """``(event, data)`` pairs of a server-sent event stream."""
+    events = []
+    for block in body.decode('utf-8').split("\n\n"):
+        if block:
+            event, data = block.split("\n")
+            events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+class ComposeStreamTests(ComposeTestCase):
+    """compose/stream/ sends the resume as token events and saves it once done."""
+
+    async def stream(self, token=True, **data):
+        client = AsyncClient()
+        headers = {'Authorization': f"Bearer {AccessToken.for_user(self.user)}"} if token else {}
+        response = await client.post(
+            '/api/compose/stream/', {'job_description_id': self.jd.pk, **data}, content_type='application/json', headers=headers,
+        )
+        if not response.streaming:
+            return response, None
+        return response, parse_events(b''.join([chunk async for chunk in response.streaming_content]))
+
+    async def test_tokens_then_done(self):
+        response, events = await self.stream()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        *tokens, (last_event, done) = events
+        self.assertEqual({event for event, _data in tokens}, {'token'})
+        self.assertEqual(last_event, 'done')
+        self.assertFalse(done['cached'])
+        self.assertEqual(done['regenerated_sections'], ['summary', 'experience', 'skills'])
+        saved = await GeneratedResume.objects.with_content().aget(pk=done['id'])
+        self.assertEqual(saved.generated_content, ''.join(data['content'] for _event, data in tokens))
+
+    async def test_cached_sections_are_replayed(self):
+        _response, first = await self.stream()
+        _response, second = await self.stream()
+        self.assertTrue(second[-1][1]['cached'])
+        self.assertEqual(second[-1][1]['regenerated_sections'], [])
+        stitched = lambda events: ''.join(data['content'] for event, data in events if event == 'token')
+        self.assertEqual(stitched(second), stitched(first))
+
+        _response, refreshed = await self.stream(force_refresh=True)
+        self.assertFalse(refreshed[-1][1]['cached'])
+
+    async def test_requires_a_token(self):
+        response, _events = await self.stream(token=False)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_missing_job_description_id(self):
+        response, _events = await self.stream(job_description_id=None)
+        self.assertEqual(response.status_code, 400)
+
+
+class ComposeStreamFailureTests(ComposeTestCase):
+    PROVIDER_OPTIONS = {'FAILURE_RATE': 1.0}
+
+    async def test_provider_failure_ends_with_an_error_event(self):
+        client = AsyncClient()
+        response = await client.post(
+            '/api/compose/stream/', {'job_description_id': self.jd.pk}, content_type='application/json',
+            headers={'Authorization': f"Bearer {AccessToken.for_user(self.user)}"},
+        )
+        events = parse_events(b''.join([chunk async for chunk in response.streaming_content]))
+        self.assertEqual(events[-1][0], 'error')
+        self.assertIn("Injected failure", events[-1][1]['error'])
+        self.assertFalse(await GeneratedResume.objects.filter(user=self.user).aexists())
+
+
+class CompositionJobTests(ComposeTestCase):
+    """compose/jobs/ queues work for the workers: claim, run, and requeue after a crash."""
+
+    def test_enqueue_returns_accepted(self):
+        response = self.client.post('/api/compose/jobs/', {'job_description_id': self.jd.pk}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(response['Location'], f"/api/compose/jobs/{response.data['job_id']}/")
+
+    def test_claim_run_and_poll(self):
+        job = jobs.enqueue(self.user, self.jd)
+        claimed = jobs.claim_next_job()
+        self.assertEqual((claimed.pk, claimed.status), (job.pk, 'running'))
+        self.assertIsNotNone(claimed.started_at)
+        self.assertIsNone(jobs.claim_next_job()) # Running jobs are not handed out twice
+
+        jobs.run_job(claimed)
+        response = self.client.get(f'/api/compose/jobs/{job.pk}/')
+        self.assertEqual(response.data['status'], 'succeeded')
+        resume = GeneratedResume.objects.with_content().get(pk=response.data['generated_resume_id'])
+        self.assertIn("Fake resume", resume.generated_content)
+
+    def test_jobs_are_claimed_oldest_first(self):
+        first, second = jobs.enqueue(self.user, self.jd), jobs.enqueue(self.user, self.jd)
+        self.assertEqual([jobs.claim_next_job().pk, jobs.claim_next_job().pk], [first.pk, second.pk])
+
+    def test_requeue_stale_jobs(self):
+        job = jobs.enqueue(self.user, self.jd)
+        jobs.claim_next_job()
+        self.assertEqual(jobs.requeue_stale_jobs(timeout=60), 0) # Still within its timeout
+
+        CompositionJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(jobs.requeue_stale_jobs(timeout=60), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.started_at), ('pending', None))
+        self.assertEqual(jobs.claim_next_job().pk, job.pk)
+
+    def test_other_users_jobs_are_hidden(self):
+        job = jobs.enqueue(self.user, self.jd)
+        other = User.objects.create_user('other', 'other@example.com', 'password')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(f'/api/compose/jobs/{job.pk}/').status_code, 404)
+
+
+class CompositionJobFailureTests(ComposeTestCase):
+    PROVIDER_OPTIONS = {'FAILURE_RATE': 1.0}
+
+    def test_failed_composition_is_recorded(self):
+        jobs.enqueue(self.user, self.jd)
+        job = jobs.run_job(jobs.claim_next_job())
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("Injected failure", job.error)
+        self.assertIsNone(job.generated_resume_id)
+        self.assertIsNotNone(job.finished_at)
+
+
+def profile_data(experiences=1, description="Built Django services on PostgreSQL.", education_description=""):
+    """ProfileDetailSerializer-shaped data."""
+    return {
+        'id': 1, 'user': {'id': 1, 'email': 'ada@example.com'}, 'full_name': "Ada Dev", 'summary': "Backend engineer.",
+        'phone': '', 'experiences': [
+            {'id': i, 'profile': 1, 'company_name': f"Company {i}", 'job_title': "Engineer",
+             'start_date': f"{2000 + i}-01-01", 'description': description}
+            for i in range(experiences)
+        ],
+        'education': [{'id': 1, 'profile': 1, 'institution': "MIT", 'degree': "BSc", 'description': education_description}],
+        'projects': [], 'certifications': [], 'skills': [{'id': 1, 'name': "Python"}],
+    }
+
+
+REALISTIC_JD = "\n\n".join([
+    "Senior Backend Engineer, Payments Platform",
+    "About us: we build the payment infrastructure that thousands of online stores rely on every day. "
+    "Our platform processes millions of transactions a month across Europe and North America.",
+    "What you will do: design, build and operate the Python and Django services behind card payments, "
+    "payouts and reconciliation; own features from design document to production; improve the reliability, "
+    "latency and observability of our APIs; review code and mentor engineers; work with product, risk and "
+    "finance teams to ship changes safely; take part in a fair on-call rotation.",
+    "What you bring: 5+ years building backend systems in Python; solid experience with Django or a similar "
+    "framework; PostgreSQL schema design, query tuning and migrations on large tables; message queues such as "
+    "RabbitMQ or Kafka; Docker and Kubernetes in production; AWS or GCP; a habit of writing tests and "
+    "clear documentation.",
+    "Nice to have: PCI DSS or other compliance work, event sourcing, Go, Terraform, experience with "
+    "payment networks, ledgers or double-entry accounting.",
+    "What we offer: a competitive salary and equity, remote-first teams across two time zones, a yearly "
+    "learning budget, 28 days of paid holiday, parental leave and a modern equipment allowance.",
+] * 4) # About 5,000 characters, a long but ordinary posting
+
+
+@override_settings(COMPOSE_RANKING={'ENABLED': False})
+class PromptBudgetTests(SimpleTestCase):
+    """Every section prompt fits MAX_INPUT_TOKENS on its own, losing its lowest-value content first."""
+    JD = "We need a Python and Django engineer."
+
+    def sections(self, *args, **kwargs):
+        prompt = build_section_prompts(*args, **kwargs)
+        return prompt, {section.name: section for section in prompt.sections}
+
+    def test_small_prompt_is_sent_compact_and_untrimmed(self):
+        prompt, sections = self.sections(profile_data(), self.JD, max_input_tokens=6000)
+        self.assertFalse(prompt.trimmed)
+        self.assertTrue(all(section.jd_text == self.JD for section in prompt.sections))
+        self.assertNotIn('id', sections['experience'].inputs['experiences'][0])
+        self.assertNotIn('phone', sections['summary'].inputs)
+        self.assertEqual(sections['skills'].inputs['skills'], ["Python"])
+        for section in prompt.sections:
+            self.assertEqual(section.estimated_input_tokens, sum(estimate_tokens(m['content']) for m in section.messages))
+        self.assertEqual(prompt.estimated_input_tokens, sum(section.estimated_input_tokens for section in prompt.sections))
+
+    def test_low_value_fields_go_first(self):
+        data = profile_data(education_description="Coursework. " * 200)
+        _untrimmed, untrimmed = self.sections(data, self.JD, max_input_tokens=100_000)
+        prompt, sections = self.sections(data, self.JD, max_input_tokens=untrimmed['education'].estimated_input_tokens - 100)
+        self.assertTrue(prompt.trimmed)
+        self.assertNotIn('description', sections['education'].inputs['education'][0])
+        # Nothing more valuable was touched, and the other sections were not trimmed at all
+        self.assertEqual(sections['education'].jd_text, self.JD)
+        self.assertEqual(sections['experience'].inputs, untrimmed['experience'].inputs)
+
+    def test_large_profile_and_jd_fit_the_budget(self):
+        data = profile_data(experiences=12, description="Shipped features across the stack. " * 60)
+        jd = "Python Django PostgreSQL Kubernetes. " * 2000
+        prompt, sections = self.sections(data, jd, max_input_tokens=1200)
+        self.assertTrue(prompt.trimmed)
+        for section in prompt.sections:
+            self.assertLessEqual(section.estimated_input_tokens, 1200, section.name)
+            self.assertTrue(section.jd_text.endswith('…'))
+            self.assertTrue(jd.startswith(section.jd_text[:-1]))
+        experiences = sections['experience'].inputs['experiences']
+        self.assertLess(len(experiences), 12) # The oldest were dropped
+        self.assertTrue(all(len(item['description']) <= 101 for item in experiences))
+        # Newest experiences are kept
+        self.assertEqual(experiences[0]['company_name'], "Company 11")
+
+    def test_realistic_jd_is_sent_whole_to_every_section(self):
+        data = profile_data(experiences=5, description="Built Django payment services on PostgreSQL and Kafka. " * 7)
+        prompt = build_section_prompts(data, REALISTIC_JD)
+        self.assertEqual([section.name for section in prompt.sections], ['summary', 'experience', 'skills', 'education'])
+        for section in prompt.sections:
+            self.assertEqual(section.jd_text, REALISTIC_JD.strip(), section.name)
+            self.assertIn(REALISTIC_JD.strip(), section.messages[1]['content'])
+
+    def test_sections_without_inputs_are_left_out(self):
+        data = {**profile_data(experiences=0), 'summary': '', 'skills': []}
+        prompt = build_section_prompts(data, self.JD)
+        self.assertEqual([section.name for section in prompt.sections], ['education'])
+        self.assertEqual(prompt.estimated_input_tokens, prompt.sections[0].estimated_input_tokens)
+
+
+class RelevanceRankingTests(SimpleTestCase):
+    """Only the items most relevant to the JD are kept once a section is over its cap."""
+
+    def test_tokenize_keeps_technical_terms(self):
+        self.assertEqual(tokenize("We use C++, C# and Node.js on .NET with the team"), ['use', 'c++', 'c#', 'node.js', '.net', 'team'])
+
+    def test_bm25_prefers_matching_documents(self):
+        documents = [tokenize("django python postgres"), tokenize("marketing brand campaigns"), tokenize("python scripts")]
+        scores = bm25_scores(documents, tokenize("python django"))
+        self.assertEqual(scores[1], 0)
+        self.assertGreater(scores[0], scores[2])
+        self.assertFalse(bm25_scores(documents, []).any())
+
+    @override_settings(COMPOSE_RANKING={'MAX_ITEMS': {'experiences': 2}})
+    def test_top_items_are_kept_in_profile_order(self):
+        titles = ["Barista", "Django Developer", "Accountant", "Python Django Engineer"]
+        data = {'experiences': [{'id': i, 'job_title': title, 'company_name': "Co", 'description': ""} for i, title in enumerate(titles)]}
+        selected, selection = select_relevant_items(data, "Senior Python engineer to build Django APIs")
+        self.assertEqual([item['job_title'] for item in selected['experiences']], ["Django Developer", "Python Django Engineer"])
+        self.assertEqual([item['id'] for item in selection['experiences']], [3, 1]) # Best first
+        self.assertIs(data['experiences'][0]['job_title'], "Barista") # Input left untouched
+
+    @override_settings(COMPOSE_RANKING={'MAX_ITEMS': {'experiences': 2}})
+    def test_sections_under_the_cap_are_unchanged(self):
+        data = {'experiences': [{'id': 1, 'job_title': "Barista"}], 'projects': []}
+        selected, selection = select_relevant_items(data, "Python engineer")
+        self.assertEqual(selected, data)
+        self.assertEqual(selection, {})
+
+    @override_settings(COMPOSE_RANKING={'ENABLED': False, 'MAX_ITEMS': {'experiences': 1}})
+    def test_disabled(self):
+        data = {'experiences': [{'id': 1, 'job_title': "Barista"}, {'id': 2, 'job_title': "Engineer"}]}
+        self.assertEqual(select_relevant_items(data, "Python engineer"), (data, {}))
+
+
+class BatchComposeTests(ComposeTestCase):
+    """compose/batch/ composes every JD in one request; each item fails or succeeds on its own."""
+
+    def test_fan_out_with_partial_failure(self):
+        jds = [self.jd] + [
+            JobDescription.objects.create(user=self.user, title=f"Role {i}", raw_text=f"Go and Kubernetes engineer {i}.")
+            for i in range(2)
+        ]
+        pending = JobDescription.objects.create(user=self.user, title="Scan", raw_text="", extraction_status='pending')
+        foreign = JobDescription.objects.create(
+            user=User.objects.create_user('other', 'other@example.com', 'password'), title="Theirs", raw_text="Theirs.",
+        )
+        ids = [jd.pk for jd in jds] + [pending.pk, foreign.pk, jds[0].pk]
+        response = self.client.post('/api/compose/batch/', {'job_description_ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([item['job_description_id'] for item in results], ids[:-1]) # Request order, duplicates dropped
+        self.assertEqual([item['status'] for item in results], ['succeeded'] * 3 + ['failed'] * 2)
+        self.assertIn("has not completed", results[3]['error'])
+        self.assertIn("not found", results[4]['error'])
+
+        saved = GeneratedResume.objects.with_content().in_bulk([item['generated_resume_id'] for item in results[:3]])
+        self.assertEqual([saved[item['generated_resume_id']].job_description_id for item in results[:3]], ids[:3])
+        self.assertEqual(len({resume.generated_content for resume in saved.values()}), 3)
+
+    def test_validation(self):
+        for ids in ([], "1", [1, "x"]):
+            response = self.client.post('/api/compose/batch/', {'job_description_ids': ids}, format='json')
+            self.assertEqual(response.status_code, 400, ids)
+        with self.settings(COMPOSE_BATCH_MAX_SIZE=2):
+            response = self.client.post('/api/compose/batch/', {'job_description_ids': [1, 2, 3]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class BatchComposeFailureTests(ComposeTestCase):
+    PROVIDER_OPTIONS = {'FAILURE_RATE': 1.0}
+
+    def test_model_failures_are_reported_per_item(self):
+        response = self.client.post('/api/compose/batch/', {'job_description_ids': [self.jd.pk]}, format='json')
+        self.assertEqual(response.data['results'][0]['status'], 'failed')
+        self.assertIn("Injected failure", response.data['results'][0]['error'])
+        self.assertFalse(GeneratedResume.objects.exists())
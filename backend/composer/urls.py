@@ -1,10 +1,19 @@
 from django.urls import path
-from .views import ComposeResumeView, GeneratedResumeListView, GeneratedResumeDetailView, LatestGeneratedResumeView, GeneratedResumePreviewView
+from django.views.decorators.csrf import csrf_exempt
+from .views import ComposeResumeView, BatchComposeResumeView, ComposeResumeStreamView, ComposeCacheStatsView, CompositionJobCreateView, CompositionJobDetailView, GeneratedResumeListView, GeneratedResumeSearchView, GeneratedResumeDetailView, LatestGeneratedResumeView, GeneratedResumePreviewView, GeneratedResumeExportView
 
 urlpatterns = [
     path('compose/', ComposeResumeView.as_view(), name='compose-resume'),
+    path('compose/batch/', BatchComposeResumeView.as_view(), name='compose-resume-batch'),
+    # Token-authenticated like the DRF views, so CSRF does not apply
+    path('compose/stream/', csrf_exempt(ComposeResumeStreamView.as_view()), name='compose-resume-stream'),
+    path('compose/cache-stats/', ComposeCacheStatsView.as_view(), name='compose-cache-stats'),
+    path('compose/jobs/', CompositionJobCreateView.as_view(), name='composition-job-create'),
+    path('compose/jobs/<int:pk>/', CompositionJobDetailView.as_view(), name='composition-job-detail'),
     path('generated-resumes/latest/', LatestGeneratedResumeView.as_view(), name='latest-generated-resume'),
     path('generated/', GeneratedResumeListView.as_view(), name='list-generated-resumes'), 
+    path('generated/search/', GeneratedResumeSearchView.as_view(), name='generated-resume-search'),
     path('generated/<int:pk>/', GeneratedResumeDetailView.as_view(), name='generated-resume-detail'),
     path('generated/<int:pk>/preview/', GeneratedResumePreviewView.as_view(), name='generated-resume-preview'),
+    path('generated/<int:pk>/export/<str:file_format>/', GeneratedResumeExportView.as_view(), name='generated-resume-export'),
 ]
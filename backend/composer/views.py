@@ -1,29 +1,63 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, generics # Add generics
-from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.shortcuts import get_object_or_404, redirect
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views import View
 from django.conf import settings # To potentially load settings if needed, though we'll use os.environ directly for the key
-from .models import GeneratedResume
-import os
-from dotenv import load_dotenv
-from openai import OpenAI # Use OpenAI library for OpenRouter
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import IntegerField, TextField
+from django.db.models.functions import Coalesce, Left, Length
+from .models import GeneratedResume, CompositionJob
+import json
+from asgiref.sync import sync_to_async
 
-from users.serializers import ProfileDetailSerializer # To get profile data
 from jd_parser.models import JobDescription
-from .serializers import GeneratedResumeSerializer # Add serializer import
-
-# Load environment variables from .env file
-load_dotenv()
+from jd_parser.search import SearchPagination, get_search_text, search
+from users.conditional import conditional_get, version_tag
+from users.models import Profile
+from resume import artifacts, rendering
+from resume.models import ResumeTemplate
+from .serializers import GeneratedResumeSerializer, GeneratedResumeListSerializer, GeneratedResumeSearchResultSerializer, CompositionJobSerializer # Add serializer import
+from . import cache as compose_cache
+from . import jobs
+from .providers import get_provider
+from .storage import PREVIEW_CHARS
+from .prompts import stitch_sections
+from .services import (
+    JD_NOT_READY_ERROR, ComposeError, ComposeResult, cached_sections, compose, compose_many,
+    get_profile_data, prepare_prompt, save_result, save_results,
+)
+
+
+def is_truthy(value):
+    """Interpret a request flag sent as JSON boolean, form value or query param."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
 
 class ComposeResumeView(APIView):
     """
     API endpoint to compose resume content based on a user's profile 
     and a specific job description using an AI model via OpenRouter.
+
+    Resumes are composed section by section and each section is cached by
+    exactly the profile fields it uses and the JD, so after an edit only the
+    affected sections call the model; pass ``force_refresh=true`` to
+    regenerate every section.
+
+    The model is called within the request, holding a web worker for its
+    whole duration; the frontend uses compose/jobs/ instead.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
         job_description_id = request.data.get('job_description_id')
+        force_refresh = is_truthy(request.data.get('force_refresh', False))
 
         if not job_description_id:
             return Response({"error": "'job_description_id' is required."}, status=status.HTTP_400_BAD_REQUEST)
@@ -41,133 +75,283 @@ class ComposeResumeView(APIView):
             
             # Fetch the user's profile data using the existing serializer
             # Note: ProfileDetailSerializer includes nested data (Edu, Exp, etc.)
-            profile_serializer = ProfileDetailSerializer(user.profile) # Assuming user.profile exists
-            profile_data = profile_serializer.data
+            profile_data = get_profile_data(user)
             
         except JobDescription.DoesNotExist:
              return Response({"error": "Job description not found or you do not have permission to access it."}, status=status.HTTP_404_NOT_FOUND)
-        except AttributeError:
+        except Profile.DoesNotExist:
              # This might happen if user.profile doesn't exist, though RegisterView should create it.
              return Response({"error": "User profile not found."}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             # Catch other potential errors during data fetching
             return Response({"error": f"Error fetching data: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        if not jd.is_ready:
+            return Response({"error": JD_NOT_READY_ERROR}, status=status.HTTP_409_CONFLICT)
 
-        # --- Prepare for AI Call ---
-        api_key = os.getenv('OPENROUTER_API_KEY')
-        if not api_key:
-            return Response({"error": "OpenRouter API key not configured in environment."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-        )
-
-        # --- Construct the Prompt ---
-        # This is a crucial part and may need significant refinement.
-        prompt = f"""
-        **Goal:** Generate an ATS-optimized, tailored resume for a specific job application, based on the provided user profile and job description.
-
-        **User Profile:**
-        ```json
-        {profile_data}
-        ```
-
-        **Job Description:**
-        ```text
-        {jd.raw_text}
-        ```
-
-        **Instructions:**
-            1. **ATS Optimization:** 
-            - Prioritize keywords from the job description (skills, tools, certifications).
-            - Use standard section headers (e.g., "Work Experience," "Projects," "Skills").
-            - Avoid graphics/tables to ensure ATS readability.
-
-            2. **Content Generation:**
-            - **Professional Summary (3-4 sentences):** 
-                - Highlight years of experience, core competencies, and alignment with the job’s mission.
-                - Example: *"Results-driven [Job Title] with [X] years of experience in [Key Skill 1] and [Key Skill 2], seeking to leverage [Achievement] at [Target Company]."*
-
-            - **Work Experience (STAR Method):**
-                - For each role, generate 2-3 bullet points using: 
-                - **Situation/Task:** Brief context.
-                - **Action:** Strong action verbs (*Optimized, Led, Implemented*).
-                - **Result:** Quantifiable outcomes (*"Improved performance by 30%"*).
-                - Example: *"Led a cross-functional team to migrate legacy systems to AWS, reducing downtime by 40%."*
-
-            - **Projects Section:**
-                - Include 1-2 projects relevant to the job. For each:
-                - **Title:** Project name + timeframe.
-                - **Description:** Problem solved, tools used, and measurable impact.
-                - Example: *"Inventory Management System (Python/Django, 2023): Developed a cloud-based system reducing stock discrepancies by 25%."*
-
-            - **Skills (Categorized):**
-                - Group into: *Technical Skills (Programming, Tools), Soft Skills, Certifications*.
-                - Match exact terms from the job description (e.g., "React" vs. "JavaScript").
-
-            3. **Formatting Rules:**
-            - Use Markdown headers (## Work Experience, ### Projects).
-            - Bold key achievements (**$2M cost savings**).
-            - Keep bullets concise (1 line each).
-
-        **Output:**
-        Generate only the tailored resume content as requested above. Do not include greetings or introductory phrases.
-        """
-
-        # --- Make API Call ---
+        # --- Compose (cached unless force_refresh) ---
         try:
-            completion = client.chat.completions.create(
-                model='mistralai/mistral-7b-instruct:free',
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert resume writer, skilled at tailoring resume content to specific job descriptions based on a user's profile.",
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    },
-                ],
-                # max_tokens=1500, # Optional: Adjust as needed
-                # temperature=0.7, # Optional: Adjust creativity
-            )
-            
-            generated_content = completion.choices[0].message.content
-
-        except Exception as e:
-            # Handle potential API errors (rate limits, invalid key, model not found, etc.)
-            # Consider logging the error e
-            return Response({"error": f"Error calling AI model: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            result = compose(profile_data, jd, force_refresh=force_refresh)
+        except ComposeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         # --- Save Result ---
+        # Cache hits are recorded too so "latest" reflects this request.
         try:
-            GeneratedResume.objects.create(
-                user=user,
-                job_description=jd,
-                generated_content=generated_content
-            )
+            save_result(user, jd, result.content, result.selected_items)
         except Exception as e:
             # Optionally log this error, but still return the content to the user
             print(f"Error saving generated resume to database: {e}") # Simple print logging
 
         # --- Return Result ---
-        return Response({"generated_content": generated_content}, status=status.HTTP_200_OK)
+        return Response({
+            "generated_content": result.content,
+            "cached": result.cached,
+            "regenerated_sections": result.regenerated_sections,
+            "estimated_input_tokens": result.estimated_input_tokens,
+        }, status=status.HTTP_200_OK)
+
+
+class BatchComposeResumeView(APIView):
+    """
+    API endpoint to compose resumes for several job descriptions at once.
+
+    Expects ``job_description_ids`` (a list) and optionally ``force_refresh``.
+    The profile is loaded once and the model calls run concurrently (at most
+    ``COMPOSE_BATCH_CONCURRENCY`` at a time); each item reports its own
+    success or failure.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        job_description_ids = request.data.get('job_description_ids')
+        if not isinstance(job_description_ids, list) or not job_description_ids:
+            return Response({"error": "'job_description_ids' must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(job_description_ids) > settings.COMPOSE_BATCH_MAX_SIZE:
+            return Response({"error": f"At most {settings.COMPOSE_BATCH_MAX_SIZE} job descriptions can be composed at once."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Preserve request order, ignore duplicates
+            job_description_ids = list(dict.fromkeys(int(jd_id) for jd_id in job_description_ids))
+        except (TypeError, ValueError):
+            return Response({"error": "'job_description_ids' must contain integers."}, status=status.HTTP_400_BAD_REQUEST)
+        force_refresh = is_truthy(request.data.get('force_refresh', False))
+
+        user = request.user
+        try:
+            profile_data = get_profile_data(user)
+        except Profile.DoesNotExist:
+            return Response({"error": "User profile not found."}, status=status.HTTP_404_NOT_FOUND)
+        jds = JobDescription.objects.filter(user=user).in_bulk(job_description_ids)
+
+        results = compose_many(profile_data, [jds[pk] for pk in job_description_ids if pk in jds], force_refresh=force_refresh)
+        saved = iter(save_results(user, results))
+        outcomes = {}
+        for jd, result in results:
+            if isinstance(result, ComposeResult):
+                outcomes[jd.pk] = {
+                    "status": "succeeded",
+                    "generated_resume_id": next(saved).id,
+                    "cached": result.cached,
+                    "regenerated_sections": result.regenerated_sections,
+                    "estimated_input_tokens": result.estimated_input_tokens,
+                }
+            else:
+                outcomes[jd.pk] = {"status": "failed", "error": str(result)}
+
+        not_found = {"status": "failed", "error": "Job description not found or you do not have permission to access it."}
+        return Response({
+            "results": [{"job_description_id": pk, **outcomes.get(pk, not_found)} for pk in job_description_ids],
+        }, status=status.HTTP_200_OK)
+
+
+def sse_event(event, data):
+    """Format a single server-sent event; data is JSON-encoded so newlines survive."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class ComposeResumeStreamView(View):
+    """
+    Streaming variant of ComposeResumeView.
+
+    Forwards tokens to the client as server-sent events while the model is
+    still generating, then saves the full text as a GeneratedResume. Sections
+    are sent in resume order: cached ones at once, the others streamed from
+    the model. Must be served through the ASGI application (backend/asgi.py)
+    so that no worker thread is held while waiting on the model.
+
+    Events: ``token`` ({"content": ...}) for each chunk, then either
+    ``done`` ({"id": ..., "cached": ..., "regenerated_sections": [...],
+    "estimated_input_tokens": ...}) or ``error`` ({"error": ...}).
+    """
+
+    async def post(self, request, *args, **kwargs):
+        # DRF authentication does not run for plain async Django views.
+        try:
+            auth = await sync_to_async(JWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({"error": str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+        if auth is None:
+            return JsonResponse({"error": "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED)
+        user = auth[0]
+
+        try:
+            data = json.loads(request.body or b'{}') if request.content_type == 'application/json' else request.POST
+            job_description_id = int(data.get('job_description_id'))
+        except (TypeError, ValueError):
+            return JsonResponse({"error": "'job_description_id' is required and must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        force_refresh = is_truthy(data.get('force_refresh', False))
+
+        # --- Fetch Data ---
+        try:
+            jd, profile_data = await sync_to_async(self.fetch_data)(user, job_description_id)
+        except JobDescription.DoesNotExist:
+            return JsonResponse({"error": "Job description not found or you do not have permission to access it."}, status=status.HTTP_404_NOT_FOUND)
+        except Profile.DoesNotExist:
+            return JsonResponse({"error": "User profile not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not jd.is_ready:
+            return JsonResponse({"error": JD_NOT_READY_ERROR}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            prompt, cache_keys = prepare_prompt(profile_data, jd)
+        except ComposeError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        texts = await sync_to_async(cached_sections)(cache_keys, force_refresh)
+
+        provider = get_provider()
+        if None in texts:
+            try:
+                provider.check_configured()
+            except ImproperlyConfigured as e:
+                return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        async def event_stream():
+            regenerated = []
+            for index, section in enumerate(prompt.sections):
+                if index:
+                    yield sse_event('token', {"content": "\n\n"})
+                if texts[index] is not None:
+                    yield sse_event('token', {"content": texts[index].strip()})
+                    continue
+                chunks = []
+                try:
+                    async for content in provider.astream(section.messages):
+                        chunks.append(content)
+                        yield sse_event('token', {"content": content})
+                except Exception as e:
+                    yield sse_event('error', {"error": f"Error calling AI model: {e}"})
+                    return
+                texts[index] = ''.join(chunks)
+                regenerated.append(section.name)
+                await sync_to_async(compose_cache.set)(cache_keys[index], texts[index])
+
+            generated = await sync_to_async(save_result)(user, jd, stitch_sections(texts), prompt.selected_items)
+            yield sse_event('done', {
+                "id": generated.id,
+                "cached": not regenerated,
+                "regenerated_sections": regenerated,
+                "estimated_input_tokens": prompt.estimated_input_tokens,
+            })
+
+        response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no' # Disable proxy buffering (nginx)
+        return response
+
+    @staticmethod
+    def fetch_data(user, job_description_id):
+        jd = JobDescription.objects.get(pk=job_description_id, user=user)
+        return jd, get_profile_data(user)
+
+
+class CompositionJobCreateView(APIView):
+    """
+    API endpoint to enqueue a composition job instead of waiting on the model.
+
+    Returns 202 Accepted with the job id; poll the status URL until the job
+    has succeeded and links to its GeneratedResume. Jobs are executed by
+    ``manage.py run_compose_workers``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        job_description_id = request.data.get('job_description_id')
+        if not job_description_id:
+            return Response({"error": "'job_description_id' is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            job_description_id = int(job_description_id)
+        except (TypeError, ValueError):
+            return Response({"error": "'job_description_id' must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        jd = get_object_or_404(JobDescription, pk=job_description_id, user=request.user)
+        if not jd.is_ready:
+            return Response({"error": JD_NOT_READY_ERROR}, status=status.HTTP_409_CONFLICT)
+        job = jobs.enqueue(
+            request.user,
+            jd,
+            force_refresh=is_truthy(request.data.get('force_refresh', False)),
+        )
+        status_url = reverse('composition-job-detail', kwargs={'pk': job.pk})
+        return Response(
+            {"job_id": job.id, "status": job.status, "status_url": request.build_absolute_uri(status_url)},
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": status_url},
+        )
+
+
+class CompositionJobDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint to poll the status of a composition job.
+    """
+    serializer_class = CompositionJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return CompositionJob.objects.filter(user=self.request.user)
+
+
+class ComposeCacheStatsView(APIView):
+    """
+    API endpoint exposing hit/miss counters of the compose cache (staff only).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(compose_cache.stats())
 
 
+
+class GeneratedResumeCursorPagination(CursorPagination):
+    """Keyset pagination: newest first, stable as new resumes are generated."""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
 class GeneratedResumeListView(generics.ListAPIView):
     """
     API endpoint to list generated resumes for the authenticated user.
     Optionally filter by job_description_id query parameter.
+    The list is cursor-paginated and returns a preview of each resume; the
+    full content comes from the detail endpoint.
     """
-    serializer_class = GeneratedResumeSerializer
+    serializer_class = GeneratedResumeListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = GeneratedResumeCursorPagination
 
     def get_queryset(self):
         """Filter resumes by the current user and optionally by job_description_id."""
         user = self.request.user
-        queryset = GeneratedResume.objects.filter(user=user)
+        queryset = (
+            GeneratedResume.objects
+            .filter(user=user)
+            .select_related('job_description')
+            .only('id', 'job_description', 'job_description__title', 'created_at')
+            .annotate(
+                # Stored with the compressed content; computed for rows not moved there yet
+                content_preview=Coalesce('content__preview', Left('legacy_content', PREVIEW_CHARS), output_field=TextField()),
+                content_length=Coalesce('content__length', Length('legacy_content'), output_field=IntegerField()),
+            )
+        )
 
         # Optional filtering by job description ID
         job_description_id = self.request.query_params.get('job_description_id')
@@ -179,8 +363,35 @@ class GeneratedResumeListView(generics.ListAPIView):
                 # Silently ignore invalid job_description_id
                 pass 
                 
-        return queryset.order_by('-created_at') # Already ordered in Meta, but explicit here
+        return queryset # Ordered by the pagination class
 
+class GeneratedResumeSearchView(generics.ListAPIView):
+    """
+    API endpoint for full-text search over the user's generated resumes, ranked
+    and paginated. Use ?q=...; optionally filter by job_description_id.
+    Resumes still in ``legacy_content`` are found once compress_generated_resumes has moved them.
+    """
+    serializer_class = GeneratedResumeSearchResultSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        queryset = GeneratedResume.objects.filter(user=self.request.user).select_related('job_description').with_content()
+        job_description_id = self.request.query_params.get('job_description_id')
+        if job_description_id and job_description_id.isdigit():
+            queryset = queryset.filter(job_description_id=int(job_description_id))
+        return search(queryset, get_search_text(self.request), field='content__search_vector')
+
+def generated_resume_validators(queryset):
+    """Validators of a resume in ``queryset``: it changes when its text is edited or its JD renamed."""
+    def validators(request, pk):
+        row = queryset(request).filter(pk=pk).values_list('updated_at', 'job_description__updated_at').first()
+        if row is None:
+            return None, None
+        return version_tag('generated', pk, *row), max(row)
+    return validators
+
+@conditional_get(generated_resume_validators(lambda request: GeneratedResume.objects.filter(user=request.user)))
 class GeneratedResumeDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, or delete a specific generated resume by ID.
@@ -192,7 +403,7 @@ class GeneratedResumeDetailView(generics.RetrieveUpdateDestroyAPIView):
         """Retrieve the generated resume by ID, ensuring it belongs to the current user."""
         user = self.request.user
         resume_id = self.kwargs.get('pk')
-        return get_object_or_404(GeneratedResume, pk=resume_id, user=user)
+        return get_object_or_404(GeneratedResume.objects.select_related('job_description').with_content(), pk=resume_id, user=user)
 
 class LatestGeneratedResumeView(generics.RetrieveAPIView):
     """
@@ -203,16 +414,59 @@ class LatestGeneratedResumeView(generics.RetrieveAPIView):
 
     def get_object(self):
         user = self.request.user
-        try:
-            return GeneratedResume.objects.filter(user=user).latest('created_at')
-        except GeneratedResume.DoesNotExist:
+        # Same order as the (user, -created_at, -id) index: one index probe, ties broken by id
+        resume = (
+            GeneratedResume.objects
+            .filter(user=user)
+            .select_related('job_description')
+            .with_content()
+            .order_by('-created_at', '-id')
+            .first()
+        )
+        if resume is None:
             raise NotFound('No generated resumes found for this user.')
+        return resume
 
+@conditional_get(generated_resume_validators(lambda request: GeneratedResume.objects.all()))
 class GeneratedResumePreviewView(generics.RetrieveAPIView):
-    queryset = GeneratedResume.objects.all()
+    queryset = GeneratedResume.objects.select_related('job_description').with_content()
     serializer_class = GeneratedResumeSerializer
     
     def get(self, request, *args, **kwargs):
         resume = self.get_object()
         serializer = self.get_serializer(resume)
-        return Response(serializer.data)
+        exports = artifacts.export_urls(request, {'pk': resume.pk}, 'generated-resume-export')
+        return Response({**serializer.data, 'exports': exports})
+
+class GeneratedResumeExportView(APIView):
+    """
+    Render one of the current user's generated resumes as HTML or PDF
+    (``?template=<id>`` picks the colors and style) and redirect to the
+    stored, long-cacheable file. A resume rendered before is not rendered again.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, file_format):
+        if file_format not in rendering.FORMATS:
+            raise NotFound(f"Unknown format '{file_format}'. Choose from: {', '.join(rendering.FORMATS)}.")
+        resume = get_object_or_404(
+            GeneratedResume.objects.select_related('job_description').with_content()
+            .defer('job_description__raw_text', 'job_description__search_vector'),
+            pk=pk, user=request.user,
+        )
+        template = None
+        template_id = request.query_params.get('template')
+        if template_id:
+            if not template_id.isdigit():
+                return Response({"error": "'template' must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+            template = get_object_or_404(ResumeTemplate, pk=template_id, is_active=True)
+        # The stored content's hash identifies the text without decompressing it
+        digest = resume.content.sha256 if resume.content_id else artifacts.text_digest(resume.legacy_content)
+        title = f"Resume - {resume.job_description.title or 'Untitled'}"
+        try:
+            key = artifacts.get_or_render(
+                digest, file_format, rendering.theme_for(template), title, lambda: resume.generated_content
+            )
+        except rendering.RenderError as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return redirect(artifacts.artifact_url(request, key))
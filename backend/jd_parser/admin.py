@@ -1,3 +1,6 @@
 from django.contrib import admin
+from .models import ExtractedText, JobDescriptionAnalysis
 
 # Register your models here.
+admin.site.register(JobDescriptionAnalysis)
+admin.site.register(ExtractedText)
@@ -0,0 +1,227 @@
+"""
+Structured analysis of job description text, computed once at ingest.
+
+``analyze()`` splits the text into sections (responsibilities, requirements,
+benefits) and derives the title, seniority, a normalized skill set and the
+most frequent keywords with local heuristics. The result is stored in
+``JobDescriptionAnalysis`` and only recomputed when the JD's text hash,
+its title or ``ANALYZER_VERSION`` changes, so consumers can read it instead of
+re-parsing ``raw_text`` on every request.
+"""
+import re
+from collections import Counter
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import JobDescription, JobDescriptionAnalysis
+from .tokens import tokenize
+
+# Bump when analyze() changes so stored analyses are recomputed
+ANALYZER_VERSION = 1
+
+MAX_KEYWORDS = 25
+
+SECTION_HEADINGS = {
+    'responsibilities': (
+        "responsibilities", "key responsibilities", "what you'll do", "what you will do", "duties",
+        "the role", "your role", "role overview", "day to day", "your impact",
+    ),
+    'requirements': (
+        "requirements", "qualifications", "minimum qualifications", "preferred qualifications",
+        "what we're looking for", "what we are looking for", "who you are", "must have", "must-have",
+        "nice to have", "nice-to-have", "skills", "required skills", "about you", "experience",
+    ),
+    'benefits': (
+        "benefits", "perks", "what we offer", "why join us", "compensation", "perks and benefits",
+        "benefits and perks",
+    ),
+}
+HEADING_TO_SECTION = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+HEADING_STRIP = " \t#*-•:"
+
+# Canonical skill -> aliases as they appear in postings (tokens from tokens.tokenize)
+SKILLS = {
+    'python': (), 'java': (), 'kotlin': (), 'scala': (), 'rust': (), 'ruby': (), 'php': (),
+    'c++': ('cpp',), 'c#': ('csharp',), 'swift': (),
+    'javascript': ('js', 'es6'), 'typescript': (), 'node.js': ('node', 'nodejs'),
+    'react': ('react.js', 'reactjs'), 'vue': ('vue.js', 'vuejs'), 'angular': ('angularjs',),
+    'django': (), 'flask': (), 'fastapi': (), 'spring': (), 'rails': (), '.net': ('dotnet',),
+    'html': ('html5',), 'css': ('css3',), 'sql': (), 'postgresql': ('postgres',), 'mysql': (),
+    'mongodb': ('mongo',), 'redis': (), 'elasticsearch': (), 'kafka': (), 'rabbitmq': (),
+    'graphql': (), 'grpc': (), 'docker': (), 'kubernetes': ('k8s',), 'terraform': (), 'ansible': (),
+    'aws': (), 'gcp': (), 'azure': (), 'linux': (), 'git': (), 'jenkins': (), 'spark': ('pyspark',),
+    'airflow': (), 'pandas': (), 'numpy': (), 'tensorflow': (), 'pytorch': (), 'scikit-learn': ('sklearn',),
+    'figma': (), 'jira': (), 'agile': (), 'scrum': (),
+}
+SKILL_ALIASES = {alias: skill for skill, aliases in SKILLS.items() for alias in (skill, *aliases)}
+# Skills that are ordinary words, letters or phrases in lowercase prose: matched on the raw text
+PATTERN_SKILLS = {
+    'c': re.compile(r"(?<![\w.+#/-])C(?![\w+#/-])"),
+    'r': re.compile(r"(?<![\w.&'-])R(?![\w&'-])"),
+    'go': re.compile(r"\b(?i:golang)\b|\bGo\b(?!\s+(?:to|through|beyond|above|live)\b)"),
+    'rest': re.compile(r"\bREST(?:ful)?\b"),
+    'ci/cd': re.compile(r"\bCI\s*/\s*CD\b", re.I),
+    'machine learning': re.compile(r"\bmachine[\s-]+learning\b", re.I),
+    'scikit-learn': re.compile(r"\bscikit[\s-]+learn\b", re.I),
+}
+
+SENIORITY_PATTERNS = (
+    ('intern', re.compile(r"\b(intern|internship|trainee)\b", re.I)),
+    ('executive', re.compile(r"\b(vp|vice president|director|head of|chief|cto)\b", re.I)),
+    ('lead', re.compile(r"\b(lead|staff|principal|architect|manager)\b", re.I)),
+    ('senior', re.compile(r"\b(senior|sr\.?)\b", re.I)),
+    ('junior', re.compile(r"\b(junior|jr\.?|entry[\s-]level|graduate)\b", re.I)),
+    ('mid', re.compile(r"\b(mid[\s-]?level|intermediate)\b", re.I)),
+)
+YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?years?", re.I)
+TITLE_RE = re.compile(r"^\s*(?:job\s+title|position|role|title)\s*:\s*(.+)$", re.I | re.M)
+
+
+def _heading_section(line):
+    """The section a heading line starts, or None for ordinary lines."""
+    candidate = line.strip(HEADING_STRIP).lower()
+    if not candidate or len(candidate) > 60:
+        return None
+    return HEADING_TO_SECTION.get(candidate)
+
+
+def split_sections(text):
+    """Map each known section to its lines; text before the first heading is 'overview'."""
+    sections = {}
+    current = 'overview'
+    for line in (text or '').splitlines():
+        section = _heading_section(line)
+        if section:
+            current = section
+            continue
+        line = line.strip(" \t•*-")
+        if line:
+            sections.setdefault(current, []).append(line)
+    return {section: "\n".join(lines) for section, lines in sections.items()}
+
+
+def extract_skills(text, tokens):
+    """Normalized, sorted skill names mentioned in the text."""
+    skills = {SKILL_ALIASES[token] for token in tokens if token in SKILL_ALIASES}
+    skills.update(skill for skill, pattern in PATTERN_SKILLS.items() if pattern.search(text))
+    return sorted(skills)
+
+
+def extract_keywords(tokens, limit=MAX_KEYWORDS):
+    counts = Counter(token for token in tokens if len(token) > 2 and not token.isdigit())
+    return [token for token, _count in counts.most_common(limit)]
+
+
+def extract_title(text, given_title=None):
+    if given_title:
+        return given_title.strip()
+    match = TITLE_RE.search(text or '')
+    if match:
+        return match.group(1).strip()[:255]
+    for line in (text or '').splitlines():
+        line = line.strip(HEADING_STRIP)
+        if line and len(line) <= 100 and not _heading_section(line):
+            return line[:255]
+    return ''
+
+
+def extract_seniority(title, text):
+    for source in (title, text):
+        for level, pattern in SENIORITY_PATTERNS:
+            if source and pattern.search(source):
+                return level
+    years = [int(value) for value in YEARS_RE.findall(text or '')]
+    if years:
+        return 'senior' if max(years) >= 5 else 'mid' if max(years) >= 2 else 'junior'
+    return ''
+
+
+def analyze(text, given_title=None):
+    """Structured features of a job description text."""
+    sections = split_sections(text)
+    tokens = tokenize("\n".join(sections.values())) # Without the heading lines
+    title = extract_title(text, given_title)
+    return {
+        'title': title,
+        'seniority': extract_seniority(title, text),
+        'sections': sections,
+        'skills': extract_skills(text or '', tokens),
+        'keywords': extract_keywords(tokens),
+    }
+
+
+def update_analysis(jd):
+    """
+    Make sure ``jd`` has an up-to-date analysis and return it (None while
+    its text is not extracted yet). Analyses are reused from any JD with the
+    same text and title, so re-uploads cost nothing.
+    """
+    if not jd.is_ready:
+        return None
+    try:
+        current = jd.analysis # Uses select_related('analysis') when the caller did
+    except JobDescriptionAnalysis.DoesNotExist:
+        current = None
+    source_title = jd.title or ''
+    if (
+        current and current.text_sha256 == jd.text_sha256 and current.source_title == source_title
+        and current.analyzer_version == ANALYZER_VERSION
+    ):
+        return current
+
+    features = (
+        JobDescriptionAnalysis.objects
+        .filter(text_sha256=jd.text_sha256, source_title=source_title, analyzer_version=ANALYZER_VERSION)
+        .exclude(job_description=jd)
+        .values('title', 'seniority', 'sections', 'skills', 'keywords')
+        .first()
+    ) if jd.text_sha256 else None
+    if features is None:
+        features = analyze(jd.raw_text, jd.title)
+
+    created = current is None
+    if created:
+        current = JobDescriptionAnalysis(job_description=jd)
+    for field, value in features.items():
+        setattr(current, field, value)
+    current.text_sha256 = jd.text_sha256
+    current.source_title = source_title
+    current.analyzer_version = ANALYZER_VERSION
+    current.analyzed_at = timezone.now()
+    current.save(force_insert=created)
+    jd.analysis = current
+    return current
+
+
+def create_analyses(jds):
+    """Analyze freshly inserted job descriptions with one insert; identical texts are analyzed once."""
+    now = timezone.now()
+    features = {}
+    analyses = []
+    for jd in jds:
+        if not jd.is_ready:
+            continue
+        key = (jd.text_sha256, jd.title)
+        if key not in features:
+            features[key] = analyze(jd.raw_text, jd.title)
+        analyses.append(JobDescriptionAnalysis(
+            job_description=jd,
+            **features[key],
+            text_sha256=jd.text_sha256,
+            source_title=jd.title or '',
+            analyzer_version=ANALYZER_VERSION,
+            analyzed_at=now,
+        ))
+    return JobDescriptionAnalysis.objects.bulk_create(analyses)
+
+
+def stale_job_descriptions():
+    """Ready job descriptions whose analysis is missing or out of date."""
+    return JobDescription.objects.filter(extraction_status='completed').filter(
+        Q(analysis__isnull=True)
+        | ~Q(analysis__text_sha256=F('text_sha256'))
+        | ~Q(analysis__source_title=Coalesce('title', Value('')))
+        | ~Q(analysis__analyzer_version=ANALYZER_VERSION)
+    )
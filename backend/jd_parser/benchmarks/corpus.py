@@ -0,0 +1,119 @@
+"""
+Synthetic job description documents for the extraction benchmark.
+
+The checked-in files in ``corpus/`` were written by ``build_corpus()``;
+``manage.py benchmark_extraction --rebuild-corpus`` regenerates them. The
+text is deterministic, so the expected words of every document are known.
+"""
+import random
+import zlib
+from pathlib import Path
+
+import docx # python-docx
+
+CORPUS_DIR = Path(__file__).resolve().parent / 'corpus'
+
+PDF_PAGES = (1, 10, 50, 200)
+DOCX_PARAGRAPHS = (20, 200, 1000, 5000, 20000)
+# Documents with a header and a requirements table every 20 paragraphs
+DOCX_TABLE_PARAGRAPHS = (200,)
+
+LINES_PER_PAGE = 50
+
+WORDS = (
+    "python", "django", "postgresql", "kubernetes", "aws", "react", "typescript", "engineer",
+    "senior", "backend", "platform", "team", "experience", "years", "design", "scalable",
+    "services", "apis", "ownership", "mentoring", "testing", "ci/cd", "docker", "latency",
+    "reliability", "customers", "product", "data", "pipelines", "security", "on-call", "remote",
+)
+
+
+def sentences(seed):
+    """Endless deterministic stream of job-posting-like lines."""
+    rng = random.Random(seed)
+    while True:
+        yield " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))).capitalize() + "."
+
+
+def _escape_pdf_text(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages, seed=0):
+    """Write a text-only PDF with ``pages`` pages of Helvetica lines."""
+    lines = sentences(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None, # Page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for _ in range(pages):
+        content = ["BT /F1 10 Tf 12 TL 50 790 Td"]
+        content += [f"({_escape_pdf_text(next(lines))}) '" for _ in range(LINES_PER_PAGE)]
+        content.append("ET")
+        stream = zlib.compress("\n".join(content).encode('latin-1'))
+        objects.append(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    Path(path).write_bytes(output)
+
+
+def write_docx(path, paragraphs, seed=0, tables=False):
+    """Write a DOCX with a heading every 20 paragraphs, optionally a header and tables too."""
+    lines = sentences(seed)
+    document = docx.Document()
+    if tables:
+        document.sections[0].header.paragraphs[0].text = "Acme Corp - Careers"
+    for index in range(paragraphs):
+        if index % 20 == 0:
+            document.add_heading(f"Section {index // 20 + 1}", level=2)
+            if tables:
+                table = document.add_table(rows=5, cols=3)
+                for row in table.rows:
+                    for cell in row.cells:
+                        cell.text = next(lines)
+        document.add_paragraph(next(lines))
+    document.save(path)
+
+
+def build_corpus(directory=CORPUS_DIR):
+    """(Re)write every corpus document and return their paths."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for pages in PDF_PAGES:
+        path = directory / f"jd-{pages:04d}-pages.pdf"
+        write_pdf(path, pages, seed=pages)
+        paths.append(path)
+    for paragraphs in DOCX_PARAGRAPHS:
+        path = directory / f"jd-{paragraphs:05d}-paragraphs.docx"
+        write_docx(path, paragraphs, seed=paragraphs)
+        paths.append(path)
+    for paragraphs in DOCX_TABLE_PARAGRAPHS:
+        path = directory / f"jd-{paragraphs:05d}-paragraphs-tables.docx"
+        write_docx(path, paragraphs, seed=paragraphs, tables=True)
+        paths.append(path)
+    return paths
+
+
+def corpus_files(directory=CORPUS_DIR):
+    """Corpus documents ordered by kind and size."""
+    return sorted(Path(directory).glob('*.pdf')) + sorted(Path(directory).glob('*.docx'))
@@ -0,0 +1,70 @@
+"""
+Measurement side of ``manage.py benchmark_extraction``.
+
+Runs in spawned processes without a configured Django, so it must not
+import models.
+"""
+import re
+import resource
+import time
+import zipfile
+
+from jd_parser import engines, extraction
+
+
+def peak_rss_kb():
+    """
+    High-water RSS of this process in KB. ru_maxrss survives exec on Linux,
+    so a spawned process would report its parent's peak; VmHWM does not.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def reset_peak_rss():
+    """Reset VmHWM to the current RSS where the kernel allows it."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+
+
+def measure(path, kind, engine, workers, repeat):
+    """
+    Extract ``path`` ``repeat`` times and return the fastest time, the
+    processed pages (or paragraphs), peak RSS and the text. Meant to run in
+    a fresh process, so the peak belongs to this document and engine alone.
+    """
+    if kind == 'pdf':
+        pdf_engine = engines.get_pdf_engine(engine) # Import the library before the baseline
+        document = pdf_engine.load(path)
+        units = pdf_engine.page_count(document)
+        pdf_engine.close(document)
+    else:
+        engines.get_docx_engine(engine)
+        import docx # Both engines' imports belong in the baseline
+        with zipfile.ZipFile(path) as archive:
+            # Counted without building a tree, which would inflate the baseline RSS
+            units = len(re.findall(rb"<w:p[ >]", archive.read('word/document.xml')))
+    reset_peak_rss()
+    baseline = peak_rss_kb()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        if kind == 'pdf':
+            text = extraction.extract_text_from_pdf(path, engine=engine, workers=workers)
+        else:
+            with open(path, 'rb') as file_obj:
+                text = extraction.extract_text_from_docx(file_obj, engine=engine)
+        timings.append(time.perf_counter() - started)
+
+    peak = max(peak_rss_kb(), resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) # Children: per-page workers
+    return {'units': units, 'seconds': min(timings), 'peak_kb': peak, 'delta_kb': peak - baseline, 'text': text}
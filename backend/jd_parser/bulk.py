@@ -0,0 +1,228 @@
+"""
+Bulk ingest of job description files: several uploads or one zip archive.
+
+Zip entries are streamed one at a time to temporary files (never the whole
+archive into memory), with their size checked while copying; an entry
+that cannot be read fails on its own. Files seen before reuse their
+extracted text (``ExtractedText``); the rest are parsed in parallel in the
+extraction pool. All job descriptions, and their analyses, are then
+inserted with one ``bulk_create`` each, and every file gets a line in the
+returned report.
+"""
+import hashlib
+import os
+import tempfile
+import zipfile
+import zlib
+
+from django.db import transaction
+from django.db.models import Q
+
+from . import extraction, ingest
+from .analysis import create_analyses
+from .models import JobDescription
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class BulkIngestError(Exception):
+    """Raised when the request as a whole cannot be ingested (e.g. too many files)."""
+
+
+class _EntryTooLarge(Exception):
+    pass
+
+
+def _entry(filename):
+    return {'filename': filename, 'path': None, 'owned': False, 'kind': None, 'file_sha256': '', 'text': '', 'error': ''}
+
+
+def _is_hidden(name):
+    return name.startswith('__MACOSX/') or os.path.basename(name).startswith('.')
+
+
+def _copy_limited(source, destination, max_bytes):
+    """Copy ``source`` to ``destination`` in chunks, hashing on the way; stops past ``max_bytes``."""
+    digest = hashlib.sha256()
+    copied = 0
+    while chunk := source.read(COPY_CHUNK_SIZE):
+        copied += len(chunk)
+        if max_bytes and copied > max_bytes:
+            raise _EntryTooLarge()
+        digest.update(chunk)
+        destination.write(chunk)
+    return digest.hexdigest()
+
+
+def entries_from_uploads(files, config):
+    """Prepare uploaded files; Django's temporary files are used in place."""
+    if len(files) > config['BULK_MAX_FILES']:
+        raise BulkIngestError(f"At most {config['BULK_MAX_FILES']} files can be uploaded at once.")
+    entries = []
+    for file in files:
+        entry = _entry(file.name)
+        entries.append(entry)
+        if config['MAX_UPLOAD_BYTES'] and file.size > config['MAX_UPLOAD_BYTES']:
+            entry['error'] = "File too large."
+            continue
+        entry['kind'] = extraction.detect_kind(file)
+        if entry['kind'] is None:
+            entry['error'] = "Unsupported file type. Please upload a PDF or DOCX file."
+            continue
+        entry['file_sha256'] = ingest.file_sha256(file)
+        entry['path'], entry['owned'] = ingest.upload_path(file)
+    return entries
+
+
+def entries_from_archive(archive_file, config):
+    """Stream the PDF/DOCX entries of a zip archive to temporary files, one at a time."""
+    try:
+        archive = zipfile.ZipFile(archive_file)
+    except zipfile.BadZipFile:
+        raise BulkIngestError("The archive is not a valid zip file.")
+    with archive:
+        infos = [info for info in archive.infolist() if not info.is_dir() and not _is_hidden(info.filename)]
+        if len(infos) > config['BULK_MAX_FILES']:
+            raise BulkIngestError(f"The archive holds more than {config['BULK_MAX_FILES']} files.")
+        entries = []
+        remaining = config['BULK_MAX_BYTES']
+        try:
+            for info in infos:
+                entry = _entry(os.path.basename(info.filename))
+                entries.append(entry)
+                # Sizes in the archive's directory can lie, so the copy enforces them too
+                max_bytes = min(config['MAX_UPLOAD_BYTES'] or remaining, remaining)
+                if info.file_size > max_bytes:
+                    entry['error'] = "File too large." if info.file_size <= remaining else "The archive unpacks to more data than allowed."
+                    continue
+                spooled = tempfile.NamedTemporaryFile(suffix=os.path.splitext(info.filename)[1], delete=False)
+                entry['path'], entry['owned'] = spooled.name, True
+                try:
+                    with spooled, archive.open(info) as source:
+                        entry['file_sha256'] = _copy_limited(source, spooled, max_bytes)
+                    remaining -= os.path.getsize(entry['path'])
+                    with open(entry['path'], 'rb') as file_obj:
+                        entry['kind'] = extraction.detect_kind(file_obj)
+                    if entry['kind'] is None:
+                        entry['error'] = "Unsupported file type. Please upload a PDF or DOCX file."
+                except _EntryTooLarge:
+                    entry['error'] = "File too large."
+                # zlib.error: corrupt data, NotImplementedError: unsupported compression, RuntimeError: encrypted
+                except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, OSError, RuntimeError) as e:
+                    entry['error'] = f"Could not read the file from the archive: {e}"
+        except BaseException:
+            _remove_files(entries)
+            raise
+        return entries
+
+
+def _extract_all(entries):
+    """Fill in each entry's text, reusing earlier extractions and parsing the rest in parallel."""
+    valid = [entry for entry in entries if not entry['error']]
+    known = ingest.find_extracted_texts({entry['file_sha256'] for entry in valid})
+    futures = {}
+    for entry in valid:
+        digest = entry['file_sha256']
+        if digest not in known and digest not in futures:
+            # Identical files in one request are parsed once
+            futures[digest] = extraction.submit(entry['path'], entry['kind'])
+    extracted = {}
+    for digest, future in futures.items():
+        try:
+            known[digest] = extraction.result(future)
+        except extraction.ExtractionError as e:
+            known[digest] = e
+        else:
+            if known[digest]:
+                extracted[digest] = (known[digest], ingest.text_sha256(known[digest]))
+    ingest.remember_extracted_texts(extracted)
+    for entry in valid:
+        outcome = known[entry['file_sha256']]
+        if isinstance(outcome, extraction.ExtractionError):
+            entry['error'] = f"Error processing {entry['kind'].upper()} file: {outcome}"
+        elif not outcome:
+            entry['error'] = "Could not extract text from file."
+        else:
+            entry['text'] = outcome
+
+
+def _remove_files(entries):
+    for entry in entries:
+        if entry['owned'] and entry['path']:
+            try:
+                os.remove(entry['path'])
+            except OSError:
+                pass
+
+
+def ingest_entries(user, entries):
+    """Extract, deduplicate and insert prepared entries; return the per-file report."""
+    try:
+        _extract_all(entries)
+    finally:
+        _remove_files(entries)
+
+    ok = [entry for entry in entries if not entry['error']]
+    for entry in ok:
+        entry['text_sha256'] = ingest.text_sha256(entry['text'])
+
+    # Earliest existing job description per file and text hash, in one query
+    earlier = {}
+    file_hashes = {entry['file_sha256'] for entry in ok}
+    text_hashes = {entry['text_sha256'] for entry in ok}
+    existing = (
+        JobDescription.objects
+        .filter(Q(file_sha256__in=file_hashes) | Q(text_sha256__in=text_hashes), user=user)
+        .order_by('-uploaded_at', '-id')
+        .values_list('pk', 'file_sha256', 'text_sha256')
+    )
+    for pk, file_digest, text_digest in existing:
+        earlier[file_digest] = earlier[text_digest] = pk
+
+    jds = [
+        JobDescription(
+            user=user,
+            original_filename=entry['filename'],
+            raw_text=entry['text'],
+            file_sha256=entry['file_sha256'],
+            text_sha256=entry['text_sha256'],
+            duplicate_of_id=earlier.get(entry['file_sha256']) or earlier.get(entry['text_sha256']),
+        )
+        for entry in ok
+    ]
+    with transaction.atomic():
+        JobDescription.objects.bulk_create(jds)
+        # Duplicates within this request point at their first copy
+        first = {}
+        repeated = []
+        for jd in jds:
+            original = first.get(jd.file_sha256) or first.get(jd.text_sha256)
+            if jd.duplicate_of_id is None and original is not None:
+                jd.duplicate_of_id = original
+                repeated.append(jd)
+            first.setdefault(jd.file_sha256, jd.pk)
+            first.setdefault(jd.text_sha256, jd.pk)
+        JobDescription.objects.bulk_update(repeated, ['duplicate_of'])
+        create_analyses(jds)
+
+    created = iter(jds)
+    report = []
+    for entry in entries:
+        if entry['error']:
+            report.append({'filename': entry['filename'], 'status': 'failed', 'error': entry['error']})
+        else:
+            jd = next(created)
+            report.append({
+                'filename': entry['filename'],
+                'status': 'created',
+                'job_description_id': jd.pk,
+                'duplicate_of': jd.duplicate_of_id,
+            })
+    return report
+
+
+def bulk_ingest(user, files=(), archive=None):
+    """Ingest uploaded ``files`` or the entries of a zip ``archive`` for ``user``."""
+    config = extraction.get_config()
+    entries = entries_from_archive(archive, config) if archive else entries_from_uploads(files, config)
+    return ingest_entries(user, entries)
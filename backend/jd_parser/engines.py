@@ -0,0 +1,267 @@
+"""
+Pluggable text extraction engines for job description documents.
+
+PDF engines are selected by ``JD_EXTRACTION['PDF_ENGINE']``:
+
+* ``pypdf2`` (default) - pure Python, always installed.
+* ``pdfminer`` - pdfminer.six, slower but with better layout handling.
+* ``pymupdf`` - PyMuPDF (MuPDF bindings), much faster.
+
+DOCX engines are selected by ``JD_EXTRACTION['DOCX_ENGINE']``:
+
+* ``streaming`` (default) - parses the document, header and footer XML
+  incrementally, including tables and text boxes, with flat memory use.
+* ``python-docx`` - body paragraphs only, via the full python-docx tree.
+
+Optional engines are imported on first use. Pages are extracted one at a
+time and joined once at the end. Large PDFs can be split into page ranges
+extracted by several processes (``PARALLEL_PAGES``).
+
+Run ``manage.py benchmark_extraction`` to compare engines on the corpus in
+jd_parser/benchmarks/corpus.
+"""
+import importlib
+import multiprocessing
+import re
+import zipfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+class PDFEngine(ABC):
+    """Interface of a PDF engine: load a document, count and extract pages."""
+    name = None
+    module = None # Import required by the engine
+
+    def check_available(self):
+        try:
+            importlib.import_module(self.module)
+        except ImportError as e:
+            raise ImproperlyConfigured(f"PDF engine '{self.name}' needs the '{self.module}' package: {e}")
+
+    @abstractmethod
+    def load(self, source):
+        """Open ``source`` (a path or binary file object)."""
+
+    @abstractmethod
+    def page_count(self, document):
+        """Number of pages of a loaded document."""
+
+    @abstractmethod
+    def page_texts(self, document, start, stop):
+        """Yield the text of pages ``start`` to ``stop - 1``."""
+
+    def close(self, document):
+        """Release what ``load`` opened."""
+
+
+class PyPDF2Engine(PDFEngine):
+    name = 'pypdf2'
+    module = 'PyPDF2'
+
+    def load(self, source):
+        import PyPDF2
+        return PyPDF2.PdfReader(source)
+
+    def page_count(self, document):
+        return len(document.pages)
+
+    def page_texts(self, document, start, stop):
+        for index in range(start, stop):
+            yield document.pages[index].extract_text() or "" # Add fallback for empty pages
+
+
+class PdfMinerEngine(PDFEngine):
+    name = 'pdfminer'
+    module = 'pdfminer'
+
+    def load(self, source):
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfparser import PDFParser
+        owned = isinstance(source, str)
+        file_obj = open(source, 'rb') if owned else source
+        return file_obj, PDFDocument(PDFParser(file_obj)), owned
+
+    def page_count(self, document):
+        from pdfminer.pdfpage import PDFPage
+        return sum(1 for _ in PDFPage.create_pages(document[1]))
+
+    def page_texts(self, document, start, stop):
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        file_obj = document[0]
+        file_obj.seek(0)
+        for layout in extract_pages(file_obj, page_numbers=range(start, stop)):
+            yield "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+
+    def close(self, document):
+        file_obj, _, owned = document
+        if owned:
+            file_obj.close()
+
+
+class PyMuPDFEngine(PDFEngine):
+    name = 'pymupdf'
+    module = 'pymupdf'
+
+    def load(self, source):
+        import pymupdf
+        if isinstance(source, str):
+            return pymupdf.open(source)
+        return pymupdf.open(stream=source.read(), filetype='pdf')
+
+    def page_count(self, document):
+        return document.page_count
+
+    def page_texts(self, document, start, stop):
+        for index in range(start, stop):
+            yield document[index].get_text()
+
+    def close(self, document):
+        document.close()
+
+
+PDF_ENGINES = {engine.name: engine for engine in (PyPDF2Engine, PdfMinerEngine, PyMuPDFEngine)}
+
+
+def get_pdf_engine(name):
+    """Return an instance of the PDF engine called ``name``."""
+    try:
+        engine = PDF_ENGINES[name]()
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown PDF engine '{name}'. Choose from: {', '.join(PDF_ENGINES)}.")
+    engine.check_available()
+    return engine
+
+
+def _extract_page_range(path, engine_name, start, stop):
+    engine = get_pdf_engine(engine_name)
+    document = engine.load(path)
+    try:
+        return list(engine.page_texts(document, start, stop))
+    finally:
+        engine.close(document)
+
+
+def page_ranges(count, parts):
+    size = -(-count // parts) # Ceiling division
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def extract_pdf_pages(engine, document, count, path=None, workers=1):
+    """
+    Return the text of every page of ``document``.
+
+    With ``workers > 1`` and a file ``path``, the pages are split into
+    contiguous ranges extracted by that many processes, in page order.
+    """
+    if workers <= 1 or path is None or count < 2:
+        return list(engine.page_texts(document, 0, count))
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        futures = [
+            executor.submit(_extract_page_range, path, engine.name, start, stop)
+            for start, stop in page_ranges(count, workers)
+        ]
+        return [text for future in futures for text in future.result()]
+    finally:
+        # Do not wait for stragglers if we were interrupted (e.g. by the timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def join_pages(texts):
+    """Assemble page texts in one pass, one line break between non-empty pages."""
+    return "\n".join(text.rstrip("\n") for text in texts if text.strip())
+
+
+# --- DOCX ---
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+HEADER_FOOTER_RE = re.compile(r"^word/(header|footer)\d*\.xml$")
+
+
+def extract_docx_python_docx(file_obj):
+    import docx # python-docx
+    document = docx.Document(file_obj)
+    return "\n".join([paragraph.text for paragraph in document.paragraphs])
+
+
+def _stream_part_lines(xml_file):
+    """
+    Yield the text lines of one WordprocessingML part: one per paragraph,
+    table rows as cells joined by " | ". Elements are removed from the tree
+    as soon as they are consumed, so memory does not grow with the part.
+    """
+    stack = [] # Open elements
+    buffers = [] # Text collected for the enclosing open table row / cell
+    skip = 0 # Depth inside mc:Fallback (duplicate copies of text boxes)
+    for event, element in ElementTree.iterparse(xml_file, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            stack.append(element)
+            if tag == MC_FALLBACK:
+                skip += 1
+            elif tag in (W + 'tr', W + 'tc'):
+                buffers.append([])
+            continue
+
+        stack.pop()
+        line = None
+        if tag == W + 'p':
+            parts = []
+            for node in element.iter():
+                if node.tag == W + 't':
+                    parts.append(node.text or '')
+                elif node.tag == W + 'tab':
+                    parts.append('\t')
+                elif node.tag in (W + 'br', W + 'cr'):
+                    parts.append('\n')
+            line = ''.join(parts)
+        elif tag == W + 'tc':
+            line = ' '.join(text for text in buffers.pop() if text.strip())
+        elif tag == W + 'tr':
+            line = ' | '.join(cell for cell in buffers.pop() if cell)
+        elif tag == MC_FALLBACK:
+            skip -= 1
+
+        if line is not None and not skip:
+            if buffers:
+                buffers[-1].append(line)
+            elif line.strip():
+                yield line
+        if tag in (W + 'p', W + 'tbl', W + 'tr', W + 'tc', MC_FALLBACK) and stack:
+            # Consumed: drop it from its parent so the tree never holds more than the open path
+            stack[-1].remove(element)
+
+
+def extract_docx_streaming(file_obj):
+    with zipfile.ZipFile(file_obj) as archive:
+        names = archive.namelist()
+        parts = ['word/document.xml'] + sorted(name for name in names if HEADER_FOOTER_RE.match(name))
+        sections = []
+        for name in parts:
+            if name not in names:
+                continue
+            with archive.open(name) as xml_file:
+                text = "\n".join(_stream_part_lines(xml_file))
+            if text and text not in sections: # Default/first/even headers often repeat
+                sections.append(text)
+    return "\n".join(sections)
+
+
+DOCX_ENGINES = {
+    'streaming': extract_docx_streaming,
+    'python-docx': extract_docx_python_docx,
+}
+
+
+def get_docx_engine(name):
+    """Return the DOCX extraction function called ``name``."""
+    try:
+        return DOCX_ENGINES[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown DOCX engine '{name}'. Choose from: {', '.join(DOCX_ENGINES)}.")
@@ -0,0 +1,152 @@
+"""
+Text extraction from uploaded job description documents.
+
+Parsing is CPU-bound and holds the GIL, so it runs in a bounded pool of
+worker processes (``settings.JD_EXTRACTION``, see backend/process_pool.py)
+instead of the request thread. Each document gets a time limit and every
+worker process an address-space cap, so one huge or malicious file cannot
+stall or exhaust the web worker.
+
+The functions executed in the pool must not touch Django models: the
+workers are spawned processes without a configured Django.
+"""
+import os
+import zipfile
+
+from backend.process_pool import WorkerPool
+from . import engines
+
+DEFAULTS = {
+    'MAX_WORKERS': 2,
+    'TIMEOUT': 60, # Seconds per document
+    'MEMORY_LIMIT_MB': 512, # Address-space cap per worker process
+    'ASYNC_THRESHOLD_BYTES': 2 * 1024 * 1024, # Larger uploads are extracted in the background
+    'MAX_UPLOAD_BYTES': 10 * 1024 * 1024,
+    'MAX_PAGES': 50, # PDF pages
+    'MAX_UNCOMPRESSED_BYTES': 50 * 1024 * 1024, # Total unpacked size of a DOCX archive
+    'PDF_ENGINE': 'pypdf2', # See jd_parser/engines.py
+    'DOCX_ENGINE': 'streaming',
+    'PARALLEL_PAGES': 1, # Processes per large PDF (1 = no per-page parallelism)
+    'PARALLEL_MIN_PAGES': 40,
+    'BULK_MAX_FILES': 50,
+    'BULK_MAX_BYTES': 100 * 1024 * 1024,
+    'PENDING_DIR': None, # Uploads awaiting background extraction; None = a directory in the system temp dir
+}
+
+PDF_MAGIC = b'%PDF-'
+ZIP_MAGIC = b'PK\x03\x04'
+
+
+class ExtractionError(Exception):
+    """Raised when text could not be extracted from a document."""
+
+
+class ExtractionTimeout(ExtractionError):
+    """Raised when extracting a document took longer than allowed."""
+
+
+def detect_kind(file_obj):
+    """
+    Identify a PDF or DOCX document from its content rather than its name.
+    Returns 'pdf', 'docx' or None; the file position is restored.
+    """
+    position = file_obj.tell()
+    try:
+        header = file_obj.read(len(PDF_MAGIC))
+        if header.startswith(PDF_MAGIC):
+            return 'pdf'
+        if header.startswith(ZIP_MAGIC):
+            file_obj.seek(position)
+            try:
+                # Only reads the archive's central directory
+                with zipfile.ZipFile(file_obj) as archive:
+                    names = set(archive.namelist())
+            except zipfile.BadZipFile:
+                return None
+            if 'word/document.xml' in names:
+                return 'docx'
+        return None
+    finally:
+        file_obj.seek(position)
+
+
+def extract_text_from_pdf(file_obj, max_pages=None, engine=DEFAULTS['PDF_ENGINE'], workers=1, min_parallel_pages=None):
+    """
+    Extracts text from a PDF file object or path with the named engine.
+    Given a path, documents of ``min_parallel_pages`` or more pages are
+    extracted by ``workers`` processes.
+    """
+    pdf_engine = engines.get_pdf_engine(engine)
+    document = pdf_engine.load(file_obj)
+    try:
+        count = pdf_engine.page_count(document)
+        if max_pages and count > max_pages:
+            raise ExtractionError(f"The PDF has {count} pages; at most {max_pages} are allowed.")
+        path = file_obj if isinstance(file_obj, str) else None
+        if min_parallel_pages and count < min_parallel_pages:
+            workers = 1
+        return engines.join_pages(engines.extract_pdf_pages(pdf_engine, document, count, path, workers))
+    finally:
+        pdf_engine.close(document)
+
+
+def extract_text_from_docx(file_obj, max_uncompressed_bytes=None, engine=DEFAULTS['DOCX_ENGINE']):
+    """Extracts text from a DOCX file object with the named engine."""
+    if max_uncompressed_bytes:
+        with zipfile.ZipFile(file_obj) as archive:
+            if sum(info.file_size for info in archive.infolist()) > max_uncompressed_bytes:
+                raise ExtractionError("The DOCX file unpacks to more data than allowed.")
+        file_obj.seek(0)
+    return engines.get_docx_engine(engine)(file_obj)
+
+
+
+# --- Worker process side ---
+
+def _extract_file(source, kind, config):
+    """Run in a pool process: extract text from a file path."""
+    # Extractors read the file from disk; it is never loaded whole into memory here
+    if kind == 'pdf':
+        return extract_text_from_pdf(
+            source,
+            max_pages=config['MAX_PAGES'],
+            engine=config['PDF_ENGINE'],
+            workers=config['PARALLEL_PAGES'],
+            min_parallel_pages=config['PARALLEL_MIN_PAGES'],
+        )
+    with open(source, 'rb') as file_obj:
+        return extract_text_from_docx(
+            file_obj, max_uncompressed_bytes=config['MAX_UNCOMPRESSED_BYTES'], engine=config['DOCX_ENGINE']
+        )
+
+
+# --- Web process side ---
+
+def get_config():
+    from django.conf import settings
+    return {**DEFAULTS, **getattr(settings, 'JD_EXTRACTION', {})}
+
+
+_pool = WorkerPool(get_config, ExtractionError, ExtractionTimeout, {
+    'timeout': "Timed out extracting text from the document.",
+    'memory': "The document needs more memory than allowed to extract.",
+    'crash': "The extraction worker crashed, likely exceeding its memory limit.",
+})
+
+
+def submit(path, kind):
+    """
+    Start extracting the file at ``path`` (``kind`` is 'pdf' or 'docx') in the
+    pool and return a Future resolving to the text.
+    """
+    return _pool.submit(_extract_file, os.fspath(path), kind, get_config())
+
+
+def result(future):
+    """Wait for an extraction Future and translate failures into ExtractionError."""
+    return _pool.result(future)
+
+
+def extract(path, kind):
+    """Extract text from the file at ``path`` in the pool, waiting for the result."""
+    return result(submit(path, kind))
@@ -0,0 +1,222 @@
+"""
+Ingest of uploaded job description files.
+
+The extraction pool reads uploads from disk. Uploads Django already
+streamed to a temporary file are handed over by path without another copy;
+only small in-memory uploads are written out. Small files are extracted
+while the request waits; files above
+``JD_EXTRACTION['ASYNC_THRESHOLD_BYTES']`` are saved with
+``extraction_status='pending'`` and completed in the background; their
+upload is kept in ``JD_EXTRACTION['PENDING_DIR']`` under the row's id until
+then, so ``recover_pending`` can restart extractions a stopped web process
+left unfinished.
+
+Files and texts are identified by SHA-256, so a file that was extracted
+before is not parsed again and re-uploads are marked as duplicates.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from . import extraction
+from .analysis import update_analysis
+from .models import ExtractedText, JobDescription
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(file):
+    """SHA-256 of an uploaded file, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def normalize_text(text):
+    """Collapse whitespace and case so trivially different copies hash the same."""
+    return ' '.join((text or '').split()).casefold()
+
+
+def text_sha256(text):
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest() if text else ''
+
+
+def find_extracted_text(file_digest):
+    """Return ``(text, text_sha256)`` already extracted from a file with this hash, or None."""
+    # Never a job description's raw_text: that belongs to its user, who may have edited it
+    return ExtractedText.objects.filter(file_sha256=file_digest).values_list('text', 'text_sha256').first()
+
+
+def find_extracted_texts(file_digests):
+    """Map each of ``file_digests`` already extracted to its text, in one query."""
+    return dict(ExtractedText.objects.filter(file_sha256__in=file_digests).values_list('file_sha256', 'text'))
+
+
+def remember_extracted_text(file_digest, text, text_digest):
+    """Keep the text extracted from a file for identical uploads; the first stored copy wins."""
+    remember_extracted_texts({file_digest: (text, text_digest)})
+
+
+def remember_extracted_texts(extracted):
+    """Store ``{file_sha256: (text, text_sha256)}`` with one insert; hashes already stored are kept."""
+    ExtractedText.objects.bulk_create(
+        [ExtractedText(file_sha256=digest, text=text, text_sha256=text_digest) for digest, (text, text_digest) in extracted.items()],
+        ignore_conflicts=True,
+    )
+
+
+def find_duplicate(user_id, file_digest='', text_digest='', exclude=None):
+    """Return the id of the user's earliest job description with the same file or text, or None."""
+    conditions = Q()
+    if file_digest:
+        conditions |= Q(file_sha256=file_digest)
+    if text_digest:
+        conditions |= Q(text_sha256=text_digest)
+    if not conditions:
+        return None
+    return (
+        JobDescription.objects
+        .filter(conditions, user_id=user_id)
+        .exclude(pk=exclude)
+        .order_by('uploaded_at', 'id')
+        .values_list('pk', flat=True)
+        .first()
+    )
+
+
+def spool_upload(file, path=None):
+    """Copy an uploaded file in chunks to ``path`` (or a new temporary file) and return its path."""
+    if path is None:
+        suffix = os.path.splitext(file.name)[1]
+        spooled = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    else:
+        spooled = open(path, 'wb')
+    with spooled:
+        for chunk in file.chunks():
+            spooled.write(chunk)
+    return spooled.name
+
+
+def upload_path(file, keep_as=None):
+    """
+    Return ``(path, owned)`` for reading ``file`` from disk.
+
+    ``owned`` means the path is ours to remove. Without ``keep_as`` the
+    upload's own temporary file is used directly; with ``keep_as`` the file
+    is placed at that path, which stays valid after the request (which
+    deletes the upload's file), using a hard link where possible instead of
+    copying the data.
+    """
+    if hasattr(file, 'temporary_file_path'):
+        path = file.temporary_file_path()
+        if keep_as is None:
+            return path, False
+        try:
+            os.link(path, keep_as)
+            return keep_as, True
+        except OSError:
+            pass
+    return spool_upload(file, keep_as), True
+
+
+def pending_path(jd_id, kind):
+    """Where the upload of a pending job description is kept until extracted."""
+    directory = extraction.get_config()['PENDING_DIR'] or os.path.join(tempfile.gettempdir(), 'jd-pending')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{jd_id}.{kind}")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def extract_now(path, kind, owned=True):
+    """Extract text in the pool and wait for it; an ``owned`` file is removed afterwards."""
+    try:
+        return extraction.extract(path, kind)
+    finally:
+        if owned:
+            _remove(path)
+
+
+def extract_in_background(jd, file, kind):
+    """Keep the upload of a pending ``jd`` and extract its text once the row is committed."""
+    path, _ = upload_path(file, keep_as=pending_path(jd.pk, kind))
+    transaction.on_commit(lambda: _start(jd.pk, jd.user_id, path, kind))
+
+
+def _start(jd_id, user_id, path, kind):
+    future = extraction.submit(path, kind)
+    future.add_done_callback(lambda done: _on_done(jd_id, user_id, path, done))
+
+
+def _on_done(jd_id, user_id, path, future):
+    # Runs on the pool's result thread of the web process, with its own connection.
+    try:
+        _finish(jd_id, user_id, path, future)
+    finally:
+        connection.close()
+
+
+def _finish(jd_id, user_id, path, future):
+    """Store the outcome of extracting a pending job description and remove its kept upload."""
+    try:
+        text = extraction.result(future)
+        if not text:
+            raise extraction.ExtractionError("Could not extract text from file.")
+        text_digest = text_sha256(text)
+        file_digest = JobDescription.objects.filter(pk=jd_id).values_list('file_sha256', flat=True).first()
+        if file_digest:
+            remember_extracted_text(file_digest, text, text_digest)
+        JobDescription.objects.filter(pk=jd_id).update(
+            raw_text=text, text_sha256=text_digest, extraction_status='completed', extraction_error=''
+        )
+        JobDescription.objects.filter(pk=jd_id, duplicate_of__isnull=True).update(
+            duplicate_of=find_duplicate(user_id, text_digest=text_digest, exclude=jd_id)
+        )
+        update_analysis(JobDescription.objects.get(pk=jd_id))
+    except JobDescription.DoesNotExist:
+        pass # Deleted while extracting
+    except extraction.ExtractionError as e:
+        JobDescription.objects.filter(pk=jd_id).update(extraction_status='failed', extraction_error=str(e))
+    except Exception:
+        logger.exception("Background extraction of job description %s failed", jd_id)
+    finally:
+        _remove(path)
+
+
+LOST_UPLOAD_ERROR = "The upload was lost before its text was extracted. Please upload the file again."
+
+
+def recover_pending(older_than):
+    """
+    Finish extractions a stopped web process left pending (their completion
+    callback died with it). Only rows pending since before the datetime
+    ``older_than`` are touched, so extractions still running are left alone;
+    rows whose kept upload is gone are marked failed. Extracts in this
+    process, one document at a time, and returns ``(restarted, failed)``.
+    """
+    restarted = failed = 0
+    stale = JobDescription.objects.filter(extraction_status='pending', updated_at__lt=older_than)
+    for jd_id, user_id in stale.values_list('pk', 'user_id'):
+        kept = [(pending_path(jd_id, kind), kind) for kind in ('pdf', 'docx')]
+        kept = [(path, kind) for path, kind in kept if os.path.exists(path)]
+        if not kept:
+            JobDescription.objects.filter(pk=jd_id, extraction_status='pending').update(
+                extraction_status='failed', extraction_error=LOST_UPLOAD_ERROR
+            )
+            failed += 1
+            continue
+        path, kind = kept[0]
+        _finish(jd_id, user_id, path, extraction.submit(path, kind))
+        restarted += 1
+    return restarted, failed
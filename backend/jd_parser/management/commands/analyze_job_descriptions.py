@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jd_parser.analysis import stale_job_descriptions, update_analysis
+
+
+class Command(BaseCommand):
+    help = "Compute missing or outdated job description analyses (e.g. after upgrading the analyzer)."
+
+    def handle(self, *args, **options):
+        count = 0
+        for jd in stale_job_descriptions().iterator():
+            update_analysis(jd)
+            count += 1
+        self.stdout.write(f"Analyzed {count} job description(s).")
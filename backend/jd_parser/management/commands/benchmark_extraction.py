@@ -0,0 +1,87 @@
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from jd_parser import engines
+from jd_parser.benchmarks import corpus
+from jd_parser.benchmarks.measure import measure
+from jd_parser.ingest import normalize_text
+
+
+def word_overlap(text, reference):
+    """Share of words two extractions have in common (1.0 = same words, any order)."""
+    words, reference_words = Counter(normalize_text(text).split()), Counter(normalize_text(reference).split())
+    total = max(sum(words.values()), sum(reference_words.values()))
+    return sum((words & reference_words).values()) / total if total else 1.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark text extraction engines on the synthetic corpus in jd_parser/benchmarks/corpus: "
+        "pages (or paragraphs) per second, peak memory and output parity with the first engine."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--engines', default=','.join(engines.PDF_ENGINES),
+            help="Comma-separated PDF engines; the first is the parity reference. Unavailable ones are skipped.",
+        )
+        parser.add_argument(
+            '--docx-engines', default=','.join(engines.DOCX_ENGINES),
+            help="Comma-separated DOCX engines; the first is the parity reference.",
+        )
+        parser.add_argument('--corpus', default=str(corpus.CORPUS_DIR), help="Directory of .pdf/.docx files.")
+        parser.add_argument('--rebuild-corpus', action='store_true', help="Regenerate the synthetic corpus first.")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per document; the fastest is reported.")
+        parser.add_argument('--workers', type=int, default=1, help="Processes per PDF for per-page parallelism.")
+
+    def handle(self, *args, **options):
+        if options['rebuild_corpus']:
+            corpus.build_corpus(options['corpus'])
+        files = corpus.corpus_files(options['corpus'])
+        if not files:
+            raise CommandError(f"No .pdf or .docx files in {options['corpus']}.")
+
+        pdf_engines = []
+        for name in options['engines'].split(','):
+            try:
+                engines.get_pdf_engine(name.strip())
+                pdf_engines.append(name.strip())
+            except ImproperlyConfigured as e:
+                self.stderr.write(f"Skipping engine: {e}")
+        if not pdf_engines:
+            raise CommandError("None of the requested PDF engines is available.")
+        try:
+            docx_engines = [name.strip() for name in options['docx_engines'].split(',')]
+            for name in docx_engines:
+                engines.get_docx_engine(name)
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{'document':<28} {'engine':<12} {'units':>6} {'seconds':>9} {'units/s':>9} "
+            f"{'peak MB':>8} {'+MB':>7} {'parity':>7}"
+        )
+        context = multiprocessing.get_context('spawn')
+        for path in files:
+            kind = path.suffix.lstrip('.').lower()
+            reference = None
+            for engine in (pdf_engines if kind == 'pdf' else docx_engines):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    sample = executor.submit(
+                        measure, str(path), kind, engine, options['workers'], options['repeat']
+                    ).result()
+                if reference is None:
+                    reference = sample['text']
+                self.report(path, engine, sample, word_overlap(sample['text'], reference))
+
+    def report(self, path, engine, sample, parity):
+        rate = sample['units'] / sample['seconds'] if sample['seconds'] else float('inf')
+        self.stdout.write(
+            f"{Path(path).name:<28} {engine:<12} {sample['units']:>6} {sample['seconds']:>9.4f} {rate:>9.1f} "
+            f"{sample['peak_kb'] / 1024:>8.1f} {sample['delta_kb'] / 1024:>7.1f} {parity:>7.3f}"
+        )
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jd_parser import ingest
+
+
+class Command(BaseCommand):
+    help = (
+        "Finish background text extractions left pending by a web process that stopped or restarted. "
+        "Run at deploy/startup, or periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=600,
+            help="Only recover job descriptions pending for at least this many seconds (default: 600).",
+        )
+
+    def handle(self, *args, **options):
+        restarted, failed = ingest.recover_pending(timezone.now() - timedelta(seconds=options['min_age']))
+        self.stdout.write(f"Extracted {restarted} pending job description(s); {failed} had lost their upload.")
@@ -0,0 +1,109 @@
+"""
+Local profile-to-JD fit scores, computed for all of a user's job
+descriptions in one pass (no LLM call).
+
+The profile becomes two term sets: normalized skills and keywords, both
+taken from ``Skill`` names, ``Project.technologies_used`` and the
+experience, project and summary text (a skill only described in a project
+still counts). Each job description is read from its stored analysis:
+skills and top keywords, a few dozen terms each, so coverage is a set
+intersection per JD:
+
+* skill score - share of the JD's skills the profile has,
+* keyword score - share of the JD's top keywords found in the profile,
+* score - their weighted mean (``JD_MATCHING``); keywords alone for JDs
+  that name no known skill.
+"""
+from django.conf import settings
+from django.db.models import F
+
+from .analysis import extract_skills
+from .models import JobDescription
+from .tokens import tokenize
+
+DEFAULTS = {
+    'SKILL_WEIGHT': 0.7,
+    'KEYWORD_WEIGHT': 0.3,
+}
+
+# Profile text the keyword set is built from, per section
+KEYWORD_FIELDS = {
+    'experiences': ('job_title', 'description'),
+    'projects': ('project_name', 'description', 'technologies_used'),
+    'certifications': ('name',),
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'JD_MATCHING', {})}
+
+
+def profile_terms(profile_data):
+    """The (skills, keywords) sets of a serialized profile (see ProfileDetailSerializer)."""
+    texts = [skill.get('name') or '' for skill in profile_data.get('skills') or []]
+    texts.append(profile_data.get('summary') or '')
+    for section, fields in KEYWORD_FIELDS.items():
+        for item in profile_data.get(section) or []:
+            texts.extend(str(item.get(field) or '') for field in fields)
+    text = "\n".join(texts)
+    tokens = tokenize(text)
+    return set(extract_skills(text, tokens)), set(tokens)
+
+
+def coverage(terms, profile_set):
+    """Share of the distinct ``terms`` that are in ``profile_set`` (0 without terms) and their count."""
+    distinct = set(terms)
+    if not distinct:
+        return 0.0, 0
+    return len(distinct & profile_set) / len(distinct), len(distinct)
+
+
+def score_job_description(row, skills, keywords, config=None):
+    """
+    Score an analysis ``row`` (a dict with 'skills' and 'keywords') against
+    the profile term sets. Returns (score, skill_score, keyword_score).
+    """
+    config = config or get_config()
+    skill_score, skill_count = coverage(row['skills'] or [], skills)
+    keyword_score, _count = coverage(row['keywords'] or [], keywords)
+    skill_weight = config['SKILL_WEIGHT'] if skill_count else 0.0
+    keyword_weight = config['KEYWORD_WEIGHT']
+    total_weight = skill_weight + keyword_weight
+    score = (skill_weight * skill_score + keyword_weight * keyword_score) / total_weight if total_weight else 0.0
+    return score, skill_score, keyword_score
+
+
+def rank_job_descriptions(user, profile_data):
+    """
+    All of ``user``'s analyzed job descriptions as dicts, best fit first
+    (newest first among ties), with scores and matched/missing skills.
+    One query; ``raw_text`` is never loaded.
+    """
+    rows = list(
+        JobDescription.objects
+        .filter(user=user, extraction_status='completed', analysis__isnull=False)
+        .order_by('-uploaded_at', '-id')
+        .values(
+            'id', 'title', 'original_filename', 'uploaded_at',
+            analysis_title=F('analysis__title'), seniority=F('analysis__seniority'),
+            skills=F('analysis__skills'), keywords=F('analysis__keywords'),
+        )
+    )
+    if not rows:
+        return []
+    skills, keywords = profile_terms(profile_data)
+    config = get_config()
+
+    for row in rows:
+        score, skill_score, keyword_score = score_job_description(row, skills, keywords, config)
+        jd_skills = row.pop('skills') or []
+        row.pop('keywords')
+        row.update(
+            score=round(score, 4),
+            skill_score=round(skill_score, 4),
+            keyword_score=round(keyword_score, 4),
+            matched_skills=[skill for skill in jd_skills if skill in skills],
+            missing_skills=[skill for skill in jd_skills if skill not in skills],
+        )
+    # Stable sort: newest first among ties
+    return sorted(rows, key=lambda row: -row['score'])
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jd_parser', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobdescription',
+            name='extraction_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='extraction_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], default='completed', help_text='Large uploads are extracted in the background; raw_text is empty until completed.', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='jobdescription',
+            name='raw_text',
+            field=models.TextField(blank=True, help_text='Raw text extracted from the file or submitted by the user.'),
+        ),
+    ]
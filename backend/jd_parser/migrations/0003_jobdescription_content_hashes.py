@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:55
+
+import hashlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def hash_existing_texts(apps, schema_editor):
+    JobDescription = apps.get_model('jd_parser', 'JobDescription')
+    batch = []
+    for jd in JobDescription.objects.exclude(raw_text='').only('id', 'raw_text').iterator():
+        normalized = ' '.join(jd.raw_text.split()).casefold()
+        jd.text_sha256 = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        batch.append(jd)
+    JobDescription.objects.bulk_update(batch, ['text_sha256'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jd_parser', '0002_jobdescription_extraction_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobdescription',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earlier job description of the same user with the same file or text.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='jd_parser.jobdescription'),
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='file_sha256',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the uploaded file, if any.', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='text_sha256',
+            field=models.CharField(blank=True, help_text='SHA-256 of the normalized raw text.', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='jobdescription',
+            index=models.Index(fields=['user', 'text_sha256'], name='jd_user_text_sha256_idx'),
+        ),
+        migrations.RunPython(hash_existing_texts, migrations.RunPython.noop),
+    ]
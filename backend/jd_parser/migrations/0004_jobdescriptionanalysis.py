@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jd_parser', '0003_jobdescription_content_hashes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobDescriptionAnalysis',
+            fields=[
+                ('job_description', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analysis', serialize=False, to='jd_parser.jobdescription')),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('seniority', models.CharField(blank=True, help_text='intern, junior, mid, senior, lead or executive; empty if unknown.', max_length=20)),
+                ('sections', models.JSONField(default=dict, help_text='Section name (overview, responsibilities, requirements, benefits) to its text.')),
+                ('skills', models.JSONField(default=list, help_text='Normalized skill names.')),
+                ('keywords', models.JSONField(default=list, help_text='Most frequent terms, most frequent first.')),
+                ('text_sha256', models.CharField(blank=True, help_text='text_sha256 of the job description when analyzed.', max_length=64)),
+                ('analyzer_version', models.PositiveIntegerField(default=0)),
+                ('analyzed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['text_sha256', 'analyzer_version'], name='jd_analysis_text_sha256_idx')],
+            },
+        ),
+    ]
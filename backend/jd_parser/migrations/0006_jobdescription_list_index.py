@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jd_parser', '0005_jobdescription_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobdescription',
+            index=models.Index(fields=['user', '-uploaded_at', '-id'], name='jd_user_uploaded_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jd_parser', '0006_jobdescription_list_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractedText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_sha256', models.CharField(help_text='SHA-256 of the uploaded file.', max_length=64, unique=True)),
+                ('text', models.TextField()),
+                ('text_sha256', models.CharField(help_text='SHA-256 of the normalized text.', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
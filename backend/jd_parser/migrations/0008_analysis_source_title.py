@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 21:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jd_parser', '0007_extracted_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobdescriptionanalysis',
+            name='source_title',
+            field=models.CharField(blank=True, help_text='Title of the job description when analyzed (empty if it had none).', max_length=255),
+        ),
+    ]
@@ -1,17 +1,96 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+
+SEARCH_CONFIG = 'english'
+
+
+class DeferSearchVectorManager(models.Manager):
+    """Default manager that leaves the (large) search_vector column out of queries unless asked for."""
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
 
 class JobDescription(models.Model):
     """Stores uploaded or submitted job descriptions and their parsed content."""
+    EXTRACTION_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_descriptions')
     title = models.CharField(max_length=255, blank=True, null=True, help_text="Optional title for the job description (e.g., Software Engineer at Google)")
     original_filename = models.CharField(max_length=255, blank=True, null=True, help_text="Original name of the uploaded file, if applicable.")
-    raw_text = models.TextField(help_text="Raw text extracted from the file or submitted by the user.")
+    raw_text = models.TextField(blank=True, help_text="Raw text extracted from the file or submitted by the user.")
+    extraction_status = models.CharField(max_length=20, choices=EXTRACTION_STATUS_CHOICES, default='completed', help_text="Large uploads are extracted in the background; raw_text is empty until completed.")
+    extraction_error = models.TextField(blank=True)
+    file_sha256 = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the uploaded file, if any.")
+    text_sha256 = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the normalized raw text.")
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates', help_text="Earlier job description of the same user with the same file or text.")
+    # Maintained by Postgres whenever the row is written
+    search_vector = models.GeneratedField(
+        expression=SearchVector('title', weight='A', config=SEARCH_CONFIG) + SearchVector('raw_text', weight='B', config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     uploaded_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DeferSearchVectorManager()
+
     def __str__(self):
         return f"JD for {self.user.username} - {self.title or self.original_filename or f'ID: {self.id}'}"
 
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['user', 'text_sha256'], name='jd_user_text_sha256_idx'),
+            GinIndex(fields=['search_vector'], name='jd_search_vector_idx'),
+            # Keyset pagination of a user's list
+            models.Index(fields=['user', '-uploaded_at', '-id'], name='jd_user_uploaded_idx'),
+        ]
+
+    @property
+    def is_ready(self):
+        """Whether raw_text is available for composing."""
+        return self.extraction_status == 'completed'
+
+
+class ExtractedText(models.Model):
+    """
+    Text extracted from an uploaded file, stored once per file content and
+    never edited. Identical uploads, by any user, reuse it instead of parsing
+    the file again; each job description copies it into its own raw_text,
+    which its owner may then edit.
+    """
+    file_sha256 = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the uploaded file.")
+    text = models.TextField()
+    text_sha256 = models.CharField(max_length=64, help_text="SHA-256 of the normalized text.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Text of file {self.file_sha256[:12]}"
+
+
+class JobDescriptionAnalysis(models.Model):
+    """Structured features of a job description, computed at ingest (see jd_parser/analysis.py)."""
+    job_description = models.OneToOneField(JobDescription, on_delete=models.CASCADE, primary_key=True, related_name='analysis')
+    title = models.CharField(max_length=255, blank=True)
+    seniority = models.CharField(max_length=20, blank=True, help_text="intern, junior, mid, senior, lead or executive; empty if unknown.")
+    sections = models.JSONField(default=dict, help_text="Section name (overview, responsibilities, requirements, benefits) to its text.")
+    skills = models.JSONField(default=list, help_text="Normalized skill names.")
+    keywords = models.JSONField(default=list, help_text="Most frequent terms, most frequent first.")
+    text_sha256 = models.CharField(max_length=64, blank=True, help_text="text_sha256 of the job description when analyzed.")
+    source_title = models.CharField(max_length=255, blank=True, help_text="Title of the job description when analyzed (empty if it had none).")
+    analyzer_version = models.PositiveIntegerField(default=0)
+    analyzed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Analysis of JD {self.job_description_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['text_sha256', 'analyzer_version'], name='jd_analysis_text_sha256_idx'),
+        ]
@@ -0,0 +1,51 @@
+"""
+Ranked full-text search over a model's ``search_vector`` column.
+
+Job descriptions store a tsvector maintained by Postgres (a generated
+column), generated resumes one per stored content (composer/storage.py),
+both with a GIN index. Queries use websearch syntax ("python -java",
+"\"data engineer\"", "aws or gcp").
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+
+from .models import SEARCH_CONFIG
+
+
+class SearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def get_search_text(request):
+    """The ``q`` query parameter; a 400 response if it is missing."""
+    text = request.query_params.get('q', '').strip()
+    if not text:
+        raise ValidationError({"q": "A search query is required."})
+    return text
+
+
+def search(queryset, text, field='search_vector'):
+    """
+    Filter ``queryset`` to rows matching ``text``, best match first (annotated with ``rank``).
+    ``field`` is the tsvector to match, on the model or on a related one
+    (``'content__search_vector'``); a related vector is matched in a subquery
+    on its own table, so that table's GIN index finds the rows.
+    """
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    relation, _, vector_field = field.rpartition('__')
+    if relation:
+        related = queryset.model._meta.get_field(relation).related_model
+        matches = related._base_manager.filter(**{vector_field: query}).values('pk')
+        condition = Q(**{f'{relation}__in': matches})
+    else:
+        condition = Q(**{field: query})
+    return (
+        queryset
+        .filter(condition)
+        .annotate(rank=SearchRank(F(field), query))
+        .order_by('-rank', '-pk')
+    )
@@ -1,37 +1,37 @@
+from django.template.defaultfilters import filesizeformat
 from rest_framework import serializers
-from .models import JobDescription
-import PyPDF2
-import docx # python-docx
-import io # To handle in-memory file operations
-
-def extract_text_from_pdf(file_obj):
-    """Extracts text from a PDF file object."""
-    pdf_reader = PyPDF2.PdfReader(file_obj)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() or "" # Add fallback for empty pages
-    return text
-
-def extract_text_from_docx(file_obj):
-    """Extracts text from a DOCX file object."""
-    document = docx.Document(file_obj)
-    text = "\n".join([paragraph.text for paragraph in document.paragraphs])
-    return text
+from .models import JobDescription, JobDescriptionAnalysis
+from . import extraction, ingest
+from .analysis import update_analysis
+# Re-exported for existing imports; the extractors now run in the extraction pool
+from .extraction import extract_text_from_pdf, extract_text_from_docx
+
+class JobDescriptionAnalysisSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobDescriptionAnalysis
+        fields = ['title', 'seniority', 'sections', 'skills', 'keywords', 'analyzed_at']
+
 
 class JobDescriptionSerializer(serializers.ModelSerializer):
     # Allow file upload, but it's not directly mapped to a model field
     file = serializers.FileField(write_only=True, required=False, allow_null=True)
     # Make raw_text optional during creation if a file is provided
     raw_text = serializers.CharField(required=False, allow_blank=True)
+    # Computed at ingest; null until the text is extracted
+    analysis = JobDescriptionAnalysisSerializer(read_only=True, allow_null=True)
 
     class Meta:
         model = JobDescription
         fields = [
             'id', 'user', 'title', 'original_filename', 
-            'raw_text', 'uploaded_at', 'updated_at', 
+            'raw_text', 'extraction_status', 'extraction_error', 'file_sha256', 'duplicate_of',
+            'analysis', 'uploaded_at', 'updated_at', 
             'file' # Include file field for input
         ]
-        read_only_fields = ['id', 'user', 'original_filename', 'uploaded_at', 'updated_at']
+        read_only_fields = [
+            'id', 'user', 'original_filename', 'extraction_status', 'extraction_error',
+            'file_sha256', 'duplicate_of', 'uploaded_at', 'updated_at',
+        ]
 
     def validate(self, data):
         """Ensure either raw_text or a file is provided."""
@@ -45,51 +45,88 @@ class JobDescriptionSerializer(serializers.ModelSerializer):
             # Alternatively, raise ValidationError("Provide either 'file' or 'raw_text', not both.")
             pass # If both provided, we'll process the file and ignore raw_text in create
         
-        # Validate file type if provided
+        # Validate file size and type (by content, not extension) if provided
         if file:
-            if not file.name.lower().endswith(('.pdf', '.docx')):
+            max_bytes = extraction.get_config()['MAX_UPLOAD_BYTES']
+            if max_bytes and file.size > max_bytes:
+                raise serializers.ValidationError(f"File too large. The maximum size is {filesizeformat(max_bytes)}.")
+            kind = extraction.detect_kind(file)
+            if kind is None:
                 raise serializers.ValidationError("Unsupported file type. Please upload a PDF or DOCX file.")
+            data['file_kind'] = kind
         
         return data
 
     def create(self, validated_data):
         """Handle file parsing and create JobDescription instance."""
         file = validated_data.pop('file', None)
+        file_kind = validated_data.pop('file_kind', None)
         raw_text_input = validated_data.pop('raw_text', None) # Get raw_text if provided
         parsed_text = ""
         original_filename = None
+        extraction_status = 'completed'
+        file_digest = ''
+        text_digest = ''
 
         if file:
             original_filename = file.name
-            # Use BytesIO to handle the InMemoryUploadedFile correctly
-            file_content = io.BytesIO(file.read())
-            if file.name.lower().endswith('.pdf'):
-                try:
-                    parsed_text = extract_text_from_pdf(file_content)
-                except Exception as e:
-                    raise serializers.ValidationError(f"Error processing PDF file: {e}")
-            elif file.name.lower().endswith('.docx'):
+            kind = file_kind
+            label = kind.upper()
+            file_digest = ingest.file_sha256(file)
+            extracted = ingest.find_extracted_text(file_digest)
+            if extracted:
+                # Same file seen before: reuse its text instead of parsing again
+                parsed_text, text_digest = extracted
+            elif file.size > extraction.get_config()['ASYNC_THRESHOLD_BYTES']:
+                # Large file: respond now, extract in the background
+                extraction_status = 'pending'
+            else:
+                path, owned = ingest.upload_path(file)
                 try:
-                    parsed_text = extract_text_from_docx(file_content)
-                except Exception as e:
-                    raise serializers.ValidationError(f"Error processing DOCX file: {e}")
+                    parsed_text = ingest.extract_now(path, kind, owned)
+                except extraction.ExtractionError as e:
+                    raise serializers.ValidationError(f"Error processing {label} file: {e}")
+                if parsed_text:
+                    text_digest = ingest.text_sha256(parsed_text)
+                    ingest.remember_extracted_text(file_digest, parsed_text, text_digest)
         elif raw_text_input:
              parsed_text = raw_text_input # Use provided text if no file
 
-        if not parsed_text:
+        if not parsed_text and extraction_status == 'completed':
              raise serializers.ValidationError("Could not extract text from file or no text provided.")
 
         # Get user from context (passed by the view)
         user = self.context['request'].user 
+        text_digest = text_digest or ingest.text_sha256(parsed_text)
         
         # Create the JobDescription instance
         jd = JobDescription.objects.create(
             user=user,
             raw_text=parsed_text,
             original_filename=original_filename,
-            title=validated_data.get('title'), # Get title if provided
+            extraction_status=extraction_status,
+            file_sha256=file_digest,
+            text_sha256=text_digest,
+            duplicate_of_id=ingest.find_duplicate(user.pk, file_digest, text_digest),
             **validated_data # Pass any other validated fields like title
         )
+        if extraction_status == 'pending':
+            ingest.extract_in_background(jd, file, kind)
+        else:
+            update_analysis(jd)
+        return jd
+
+    def update(self, instance, validated_data):
+        """Keep the text hash in sync when raw_text is edited; files are only accepted on create."""
+        validated_data.pop('file', None)
+        validated_data.pop('file_kind', None)
+        if 'raw_text' in validated_data:
+            validated_data['text_sha256'] = ingest.text_sha256(validated_data['raw_text'])
+            validated_data['duplicate_of_id'] = ingest.find_duplicate(
+                instance.user_id, instance.file_sha256, validated_data['text_sha256'], exclude=instance.pk
+            )
+        jd = super().update(instance, validated_data)
+        update_analysis(jd) # No-op unless the text or title changed
         return jd
 
     # Override to_representation to remove the 'file' field on output
@@ -99,3 +136,49 @@ class JobDescriptionSerializer(serializers.ModelSerializer):
         # Ensure raw_text is included in the representation
         representation['raw_text'] = instance.raw_text 
         return representation
+
+
+class JobDescriptionAnalysisSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobDescriptionAnalysis
+        fields = ['title', 'seniority', 'skills']
+
+
+class JobDescriptionListSerializer(serializers.ModelSerializer):
+    """
+    List-mode representation: no raw_text, only a preview and its length
+    (annotated by the list view). The full text comes from the detail endpoint.
+    """
+    raw_text_preview = serializers.CharField(read_only=True)
+    raw_text_length = serializers.IntegerField(read_only=True)
+    analysis = JobDescriptionAnalysisSummarySerializer(read_only=True, allow_null=True)
+
+    class Meta:
+        model = JobDescription
+        fields = [
+            'id', 'user', 'title', 'original_filename', 'raw_text_preview', 'raw_text_length',
+            'extraction_status', 'duplicate_of', 'analysis', 'uploaded_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class JobDescriptionSearchResultSerializer(JobDescriptionSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(JobDescriptionSerializer.Meta):
+        fields = JobDescriptionSerializer.Meta.fields + ['rank']
+
+
+class JobDescriptionMatchSerializer(serializers.Serializer):
+    """A job description ranked against the user's profile (see jd_parser/matching.py)."""
+    id = serializers.IntegerField()
+    title = serializers.CharField(allow_null=True)
+    analysis_title = serializers.CharField()
+    original_filename = serializers.CharField(allow_null=True)
+    seniority = serializers.CharField()
+    uploaded_at = serializers.DateTimeField()
+    score = serializers.FloatField()
+    skill_score = serializers.FloatField()
+    keyword_score = serializers.FloatField()
+    matched_skills = serializers.ListField(child=serializers.CharField())
+    missing_skills = serializers.ListField(child=serializers.CharField())
@@ -1,3 +1,459 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import Profile
+from . import extraction, ingest
+from .analysis import create_analyses, stale_job_descriptions, update_analysis
+from .benchmarks.corpus import sentences
+from .engines import extract_docx_streaming
+from .matching import coverage, profile_terms, score_job_description
+from .ingest import text_sha256
+from .models import ExtractedText, JobDescription
+
+CORPUS = Path(__file__).resolve().parent / 'benchmarks' / 'corpus'
+
+
+def corpus_upload(name):
+    return SimpleUploadedFile(name, (CORPUS / name).read_bytes())
+
+
+class JobDescriptionListQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_job_descriptions(self, count):
+        texts = [f"Backend Engineer {i}\nRequirements\nPython and PostgreSQL." for i in range(count)]
+        jds = JobDescription.objects.bulk_create(
+            JobDescription(user=self.user, title=f"Role {i}", raw_text=text, text_sha256=text_sha256(text))
+            for i, text in enumerate(texts)
+        )
+        create_analyses(jds)
+
+    def test_list_query_count_does_not_grow(self):
+        self.add_job_descriptions(1)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/job-descriptions/')
+        self.assertEqual(len(response.data['results']), 1)
+
+        self.add_job_descriptions(30)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/job-descriptions/')
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(response.data['results'][0]['analysis']['skills'], ['postgresql', 'python'])
+
+    def test_detail_query_count(self):
+        self.add_job_descriptions(1)
+        jd = JobDescription.objects.get()
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/job-descriptions/{jd.pk}/')
+        self.assertEqual(response.data['analysis']['title'], "Role 0")
+
+
+class PendingExtractionRecoveryTests(TestCase):
+    """Uploads left pending by a stopped web process are extracted by recover_pending."""
+
+    def setUp(self):
+        self.pending_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pending_dir, ignore_errors=True)
+        settings_override = override_settings(
+            JD_EXTRACTION={**settings.JD_EXTRACTION, 'ASYNC_THRESHOLD_BYTES': 0, 'PENDING_DIR': self.pending_dir},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user('uploader', 'uploader@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload_without_finishing(self):
+        # TestCase never commits, so the background extraction is never started: as after a restart
+        response = self.client.post('/api/job-descriptions/', {'file': corpus_upload('jd-00020-paragraphs.docx')})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['extraction_status'], 'pending')
+        return JobDescription.objects.get(pk=response.data['id'])
+
+    def test_recovers_kept_upload(self):
+        jd = self.upload_without_finishing()
+        path = ingest.pending_path(jd.pk, 'docx')
+        self.assertTrue(os.path.exists(path))
+
+        self.assertEqual(ingest.recover_pending(timezone.now() + timedelta(seconds=1)), (1, 0))
+        jd.refresh_from_db()
+        self.assertEqual(jd.extraction_status, 'completed')
+        self.assertTrue(jd.raw_text)
+        self.assertEqual(jd.text_sha256, text_sha256(jd.raw_text))
+        self.assertFalse(os.path.exists(path))
+
+    def test_recent_rows_are_left_alone(self):
+        jd = self.upload_without_finishing()
+        self.assertEqual(ingest.recover_pending(timezone.now() - timedelta(minutes=10)), (0, 0))
+        jd.refresh_from_db()
+        self.assertEqual(jd.extraction_status, 'pending')
+
+    def test_lost_upload_is_marked_failed(self):
+        jd = self.upload_without_finishing()
+        os.remove(ingest.pending_path(jd.pk, 'docx'))
+        self.assertEqual(ingest.recover_pending(timezone.now() + timedelta(seconds=1)), (0, 1))
+        jd.refresh_from_db()
+        self.assertEqual((jd.extraction_status, jd.extraction_error), ('failed', ingest.LOST_UPLOAD_ERROR))
+
+
+class UploadValidationTests(TestCase):
+    """Uploads are accepted by their content, not their name, and within the size limit."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('validator', 'validator@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, content):
+        return self.client.post('/api/job-descriptions/', {'file': SimpleUploadedFile(name, content)})
+
+    def test_detect_kind_reads_magic_bytes(self):
+        pdf = io.BytesIO((CORPUS / 'jd-0001-pages.pdf').read_bytes())
+        self.assertEqual(extraction.detect_kind(pdf), 'pdf')
+        self.assertEqual(pdf.tell(), 0) # Position restored for the extractor
+        self.assertEqual(extraction.detect_kind(io.BytesIO((CORPUS / 'jd-00020-paragraphs.docx').read_bytes())), 'docx')
+
+        other_zip = io.BytesIO()
+        with zipfile.ZipFile(other_zip, 'w') as archive:
+            archive.writestr('xl/workbook.xml', '<workbook/>')
+        self.assertIsNone(extraction.detect_kind(other_zip))
+        self.assertIsNone(extraction.detect_kind(io.BytesIO(b'PK\x03\x04 truncated')))
+        self.assertIsNone(extraction.detect_kind(io.BytesIO(b'')))
+
+    def test_renamed_file_is_rejected(self):
+        response = self.upload('job.pdf', b'<html>Not a PDF</html>')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unsupported file type", str(response.data))
+        self.assertFalse(JobDescription.objects.exists())
+
+    def test_content_wins_over_name(self):
+        response = self.upload('job.txt', (CORPUS / 'jd-0001-pages.pdf').read_bytes())
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data['raw_text'])
+
+    def test_oversized_file_is_rejected(self):
+        content = (CORPUS / 'jd-0001-pages.pdf').read_bytes()
+        with self.settings(JD_EXTRACTION={**settings.JD_EXTRACTION, 'MAX_UPLOAD_BYTES': len(content) - 1}):
+            response = self.upload('job.pdf', content)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("File too large", str(response.data))
+
+
+class ExtractedTextReuseTests(TestCase):
+    """Identical uploads reuse the extracted text, never another user's edits."""
+
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'password')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'password')
+        self.client = APIClient()
+
+    def upload(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.post('/api/job-descriptions/', {'file': corpus_upload('jd-0001-pages.pdf')})
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def test_edited_text_does_not_leak_to_other_users(self):
+        original = self.upload(self.alice)
+        response = self.client.patch(
+            f"/api/job-descriptions/{original['id']}/", {'raw_text': "SECRET NOTES OF ALICE"}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        reused = self.upload(self.bob)
+        self.assertEqual(reused['raw_text'], original['raw_text'])
+        self.assertNotIn("SECRET", reused['raw_text'])
+        self.assertEqual(ExtractedText.objects.count(), 1) # Extracted once, reused for bob
+
+
+class AnalysisFreshnessTests(TestCase):
+    """An analysis is recomputed when the text or the title it was computed from changes."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('analyst', 'analyst@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            '/api/job-descriptions/', {'title': "Backend Engineer", 'raw_text': "Build APIs in Python."}, format='json',
+        )
+        self.jd = JobDescription.objects.get(pk=response.data['id'])
+
+    def test_title_change_reanalyzes(self):
+        response = self.client.patch(
+            f'/api/job-descriptions/{self.jd.pk}/', {'title': "Data Scientist", 'raw_text': "Build APIs in Python."}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.jd.refresh_from_db()
+        self.assertEqual(self.jd.analysis.title, "Data Scientist")
+        self.assertFalse(stale_job_descriptions().exists())
+
+    def test_out_of_date_title_is_stale(self):
+        JobDescription.objects.filter(pk=self.jd.pk).update(title="Data Scientist")
+        self.assertEqual(list(stale_job_descriptions()), [self.jd])
+        update_analysis(JobDescription.objects.get(pk=self.jd.pk))
+        self.assertFalse(stale_job_descriptions().exists())
+
+    def test_untitled_analysis_is_fresh(self):
+        JobDescription.objects.filter(pk=self.jd.pk).update(title=None)
+        update_analysis(JobDescription.objects.get(pk=self.jd.pk))
+        self.assertEqual(JobDescription.objects.get(pk=self.jd.pk).analysis.title, "Build APIs in Python.")
+        self.assertFalse(stale_job_descriptions().exists())
+
+
+class JobDescriptionSearchTests(TestCase):
+    """Full-text search ranks title matches above text matches and only sees the user's own rows."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('searcher', 'searcher@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.body_match = JobDescription.objects.create(user=self.user, title="Backend Engineer", raw_text="Python and Kafka pipelines.")
+        self.title_match = JobDescription.objects.create(user=self.user, title="Kafka Engineer", raw_text="Streaming with Java.")
+        JobDescription.objects.create(user=self.user, title="Designer", raw_text="Figma and branding.")
+        other = User.objects.create_user('other', 'other@example.com', 'password')
+        JobDescription.objects.create(user=other, title="Kafka Lead", raw_text="Kafka everywhere.")
+
+    def ids(self, q):
+        response = self.client.get('/api/job-descriptions/search/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_ranked_by_weight(self):
+        response = self.client.get('/api/job-descriptions/search/', {'q': "kafka"})
+        results = response.data['results']
+        self.assertEqual([item['id'] for item in results], [self.title_match.pk, self.body_match.pk])
+        self.assertGreater(results[0]['rank'], results[1]['rank'])
+
+    def test_websearch_syntax(self):
+        designer = JobDescription.objects.get(title="Designer")
+        self.assertEqual(self.ids("kafka -java"), [self.body_match.pk])
+        self.assertEqual(self.ids('"kafka pipelines"'), [self.body_match.pk])
+        self.assertEqual(set(self.ids("figma or java")), {designer.pk, self.title_match.pk})
+        self.assertEqual(set(self.ids("engineering")), {self.body_match.pk, self.title_match.pk}) # Stemmed
+
+    def test_query_is_required(self):
+        response = self.client.get('/api/job-descriptions/search/')
+        self.assertEqual(response.status_code, 400)
+
+
+def zip_archive(entries, compression=zipfile.ZIP_DEFLATED):
+    """Zip bytes holding ``{name: bytes}``."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression) as archive:
+        for name, content in entries.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def patch_central_directory(data, name, offset, fmt, value):
+    """Overwrite a field of ``name``'s central directory record, as a hand-crafted archive would."""
+    record = data.index(b'PK\x01\x02')
+    while data[record + 46:record + 46 + len(name)] != name.encode():
+        record = data.index(b'PK\x01\x02', record + 4)
+    data = bytearray(data)
+    struct.pack_into(fmt, data, record + offset, value)
+    return bytes(data)
+
+
+class BulkArchiveTests(TestCase):
+    """Zip archives are unpacked within the file, size and entry limits; bad entries fail alone."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('bulk', 'bulk@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.docx = (CORPUS / 'jd-00020-paragraphs.docx').read_bytes()
+        # Temporary files of the unpacked entries go here, so leaks show
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        patcher = mock.patch.object(tempfile, 'tempdir', self.spool_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, data, **config):
+        with self.settings(JD_EXTRACTION={**settings.JD_EXTRACTION, **config}):
+            return self.client.post('/api/job-descriptions/bulk/', {'archive': SimpleUploadedFile('jds.zip', data)})
+
+    def statuses(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(os.listdir(self.spool_dir), []) # Every unpacked entry was removed
+        return {item['filename']: item.get('error') or item['status'] for item in response.data['results']}
+
+    def test_entry_limit(self):
+        response = self.post(zip_archive({f'{i}.docx': self.docx for i in range(3)}), BULK_MAX_FILES=2)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("more than 2 files", response.data['error'])
+
+    def test_highly_compressed_entries_are_capped(self):
+        bomb = b'%PDF-' + bytes(2 * 1024 * 1024) # Compresses to a few KB
+        response = self.post(zip_archive({'bomb.pdf': bomb, 'ok.docx': self.docx}), MAX_UPLOAD_BYTES=1024 * 1024)
+        self.assertEqual(self.statuses(response), {'bomb.pdf': "File too large.", 'ok.docx': 'created'})
+
+        response = self.post(zip_archive({'ok.docx': self.docx, 'bomb.pdf': bomb}), BULK_MAX_BYTES=len(self.docx) + 1024)
+        self.assertEqual(self.statuses(response)['bomb.pdf'], "The archive unpacks to more data than allowed.")
+
+    def test_understated_size_is_caught_while_copying(self):
+        data = zip_archive({'bomb.pdf': b'%PDF-' + bytes(2 * 1024 * 1024)})
+        data = patch_central_directory(data, 'bomb.pdf', 24, '<I', 100) # Uncompressed size
+        result = self.statuses(self.post(data, MAX_UPLOAD_BYTES=1024 * 1024))['bomb.pdf']
+        self.assertTrue(result.startswith("Could not read the file from the archive"), result)
+
+    def test_unreadable_entries_fail_alone(self):
+        data = zip_archive({'corrupt.docx': b'x' * 1000, 'shrunk.docx': self.docx, 'ok.docx': self.docx})
+        data = patch_central_directory(data, 'shrunk.docx', 10, '<H', 1) # Compression method "shrink"
+        start = data.index(b'corrupt.docx') + len('corrupt.docx') # Entry data follows its local header
+        data = data[:start] + b'\xff' * 8 + data[start + 8:] # Invalid deflate block
+        results = self.statuses(self.post(data))
+        self.assertEqual(results['ok.docx'], 'created')
+        self.assertIn("Could not read the file from the archive", results['corrupt.docx'])
+        self.assertIn("compression method is not supported", results['shrunk.docx'])
+
+    def test_reused_text_is_never_another_users_edit(self):
+        alice = User.objects.create_user('alice', 'alice@example.com', 'password')
+        self.client.force_authenticate(alice)
+        original = self.client.post('/api/job-descriptions/', {'file': corpus_upload('jd-0001-pages.pdf')}).data
+        self.client.patch(f"/api/job-descriptions/{original['id']}/", {'raw_text': "SECRET NOTES OF ALICE"}, format='json')
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/job-descriptions/bulk/', {'files': [corpus_upload('jd-0001-pages.pdf')]})
+        jd = JobDescription.objects.get(pk=response.data['results'][0]['job_description_id'])
+        self.assertEqual(jd.raw_text, original['raw_text'])
+
+
+WORDPROCESSING_NS = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+)
+
+
+def docx_archive(body, headers=()):
+    """A minimal DOCX with ``body`` as its document XML and the given header part bodies."""
+    parts = {'word/document.xml': f'<w:document {WORDPROCESSING_NS}><w:body>{body}</w:body></w:document>'}
+    for index, header in enumerate(headers, start=1):
+        parts[f'word/header{index}.xml'] = f'<w:hdr {WORDPROCESSING_NS}>{header}</w:hdr>'
+    return io.BytesIO(zip_archive(parts))
+
+
+def paragraph(text):
+    return f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>'
+
+
+class StreamingDocxTests(TestCase):
+    """The streaming DOCX engine reads paragraphs, tables, text boxes and headers in document order."""
+
+    def expected_corpus_text(self, paragraphs, tables=False):
+        # Mirrors benchmarks.corpus.write_docx
+        lines = sentences(paragraphs)
+        expected = []
+        for index in range(paragraphs):
+            if index % 20 == 0:
+                expected.append(f"Section {index // 20 + 1}")
+                if tables:
+                    expected += [" | ".join(next(lines) for _cell in range(3)) for _row in range(5)]
+            expected.append(next(lines))
+        if tables:
+            expected.append("Acme Corp - Careers")
+        return "\n".join(expected)
+
+    def test_corpus_documents(self):
+        for name, paragraphs, tables in (
+            ('jd-00020-paragraphs.docx', 20, False),
+            ('jd-01000-paragraphs.docx', 1000, False),
+            ('jd-00200-paragraphs-tables.docx', 200, True),
+        ):
+            with self.subTest(name), open(CORPUS / name, 'rb') as file_obj:
+                self.assertEqual(extract_docx_streaming(file_obj), self.expected_corpus_text(paragraphs, tables))
+
+    def test_tabs_breaks_and_nested_tables(self):
+        body = (
+            '<w:p><w:r><w:t>Role:</w:t><w:tab/><w:t>Engineer</w:t><w:br/><w:t>Remote</w:t></w:r></w:p>'
+            '<w:tbl><w:tr>'
+            f'<w:tc>{paragraph("Python")}{paragraph("Django")}</w:tc>'
+            f'<w:tc><w:tbl><w:tr><w:tc>{paragraph("AWS")}</w:tc><w:tc>{paragraph("GCP")}</w:tc></w:tr></w:tbl></w:tc>'
+            '<w:tc><w:p/></w:tc>'
+            '</w:tr></w:tbl>'
+        )
+        self.assertEqual(extract_docx_streaming(docx_archive(body)), "Role:\tEngineer\nRemote\nPython Django | AWS | GCP")
+
+    def test_text_box_is_read_once(self):
+        text_box = (
+            '<w:p><w:r><mc:AlternateContent>'
+            f'<mc:Choice Requires="wps"><w:drawing><w:txbxContent>{paragraph("Apply by Friday")}</w:txbxContent></w:drawing></mc:Choice>'
+            f'<mc:Fallback><w:pict><w:txbxContent>{paragraph("Apply by Friday")}</w:txbxContent></w:pict></mc:Fallback>'
+            '</mc:AlternateContent></w:r></w:p>'
+        )
+        text = extract_docx_streaming(docx_archive(paragraph("Intro") + text_box + paragraph("Outro")))
+        self.assertEqual(text.count("Apply by Friday"), 1)
+        self.assertEqual(text.splitlines()[0], "Intro")
+        self.assertEqual(text.splitlines()[-1], "Outro")
+
+    def test_repeated_headers_are_kept_once(self):
+        headers = (paragraph("Acme Corp"), paragraph("Acme Corp"), paragraph("Page footer"))
+        text = extract_docx_streaming(docx_archive(paragraph("Body"), headers))
+        self.assertEqual(text, "Body\nAcme Corp\nPage footer")
+
+
+class ProfileMatchingTests(TestCase):
+    """Job descriptions are scored by the share of their skills and keywords the profile covers."""
+
+    def test_coverage(self):
+        self.assertEqual(coverage(['python', 'python', 'react', 'css', 'sql'], {'python', 'sql', 'go'}), (0.5, 4))
+        self.assertEqual(coverage([], {'python'}), (0.0, 0))
+
+    def test_profile_terms(self):
+        skills, keywords = profile_terms({
+            'skills': [{'name': "PostgreSQL"}], 'summary': "Backend developer.",
+            'projects': [{'project_name': "Shop", 'technologies_used': "React, Node.js"}],
+        })
+        self.assertEqual(skills, {'postgresql', 'react', 'node.js'})
+        self.assertTrue({'backend', 'developer', 'shop'} <= keywords)
+
+    def test_score_weights(self):
+        config = {'SKILL_WEIGHT': 0.7, 'KEYWORD_WEIGHT': 0.3}
+        row = {'skills': ['python', 'react'], 'keywords': ['python', 'apis', 'teams', 'scale']}
+        score, skill_score, keyword_score = score_job_description(row, {'python'}, {'python', 'apis'}, config)
+        self.assertEqual((skill_score, keyword_score), (0.5, 0.5))
+        self.assertAlmostEqual(score, 0.5)
+
+        score, skill_score, _ = score_job_description(row, {'python', 'react'}, set(), config)
+        self.assertAlmostEqual(score, 0.7)
+        # No known skills in the JD: keywords alone
+        score, _, _ = score_job_description({'skills': [], 'keywords': ['apis', 'teams']}, {'python'}, {'apis'}, config)
+        self.assertAlmostEqual(score, 0.5)
+
+    def test_ranked_endpoint(self):
+        user = User.objects.create_user('matcher', 'matcher@example.com', 'password')
+        Profile.objects.create(user=user, full_name="Ada Dev", summary="Python and Django developer.")
+        texts = {
+            'mid': "Requirements\nPython, React and CSS.",
+            'good': "Requirements\nPython and Django.",
+            'bad': "Requirements\nJava and Kotlin.",
+        }
+        jds = JobDescription.objects.bulk_create(
+            JobDescription(user=user, title=title, raw_text=text, text_sha256=text_sha256(text)) for title, text in texts.items()
+        )
+        create_analyses(jds)
+        client = APIClient()
+        client.force_authenticate(user)
+        results = client.get('/api/job-descriptions/ranked/').data['results']
+        self.assertEqual([item['title'] for item in results], ['good', 'mid', 'bad'])
+        self.assertEqual(results[0]['matched_skills'], ['django', 'python'])
+        self.assertEqual(results[1]['missing_skills'], ['css', 'react'])
+        self.assertEqual(results[2]['skill_score'], 0)
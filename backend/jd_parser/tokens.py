@@ -0,0 +1,21 @@
+"""
+Word tokens shared by job description analysis and matching
+(jd_parser/analysis.py, jd_parser/matching.py) and by the relevance ranking
+of profile items (composer/ranking.py).
+"""
+import re
+
+# Keeps terms such as "c++", "c#", "node.js" and ".net" intact
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*|\.[a-z][a-z0-9]*")
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being but by can could did do does
+for from had has have having he her his how i if in into is it its may more most must my no not
+of on or our out over own she should so some such than that the their them then there these they
+this those through to too under up us very was we were what when where which while who will with
+within would you your
+""".split())
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords."""
+    return [token for token in TOKEN_RE.findall((text or '').lower()) if token not in STOPWORDS]
@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import JobDescriptionListCreateView, JobDescriptionDetailView
+from .views import JobDescriptionListCreateView, JobDescriptionBulkCreateView, JobDescriptionDetailView, JobDescriptionSearchView, JobDescriptionRankView
 
 urlpatterns = [
     path('job-descriptions/', JobDescriptionListCreateView.as_view(), name='jobdescription-list-create'),
+    path('job-descriptions/bulk/', JobDescriptionBulkCreateView.as_view(), name='jobdescription-bulk-create'),
+    path('job-descriptions/search/', JobDescriptionSearchView.as_view(), name='jobdescription-search'),
+    path('job-descriptions/ranked/', JobDescriptionRankView.as_view(), name='jobdescription-ranked'),
     path('job-descriptions/<int:pk>/', JobDescriptionDetailView.as_view(), name='jobdescription-detail'),
 ]
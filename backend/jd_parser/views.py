@@ -1,19 +1,52 @@
-from rest_framework import generics, permissions
+from django.db.models.functions import Left, Length
+from rest_framework import generics, permissions, status
+from rest_framework.pagination import CursorPagination
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from users.models import Profile
+from users.snapshots import get_profile_snapshot
+from . import bulk
+from .matching import rank_job_descriptions
 from .models import JobDescription
-from .serializers import JobDescriptionSerializer
+from .serializers import JobDescriptionSerializer, JobDescriptionListSerializer, JobDescriptionSearchResultSerializer, JobDescriptionMatchSerializer
+from .search import SearchPagination, get_search_text, search
+
+PREVIEW_CHARS = 280
+
+class JobDescriptionCursorPagination(CursorPagination):
+    """Keyset pagination: newest first, stable under concurrent uploads."""
+    ordering = ('-uploaded_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
 
 class JobDescriptionListCreateView(generics.ListCreateAPIView):
-    """Allows authenticated users to list their job descriptions or upload/create new ones."""
+    """
+    Allows authenticated users to list their job descriptions or upload/create new ones.
+    The list is cursor-paginated and omits raw_text (see JobDescriptionListSerializer).
+    """
     serializer_class = JobDescriptionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = JobDescriptionCursorPagination
 
-    def get_queryset(self):
-        """Return job descriptions belonging to the current user."""
-        return JobDescription.objects.filter(user=self.request.user)
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return JobDescriptionListSerializer
+        return JobDescriptionSerializer
 
-    # perform_create is handled within the serializer's create method by getting user from context
-    # The serializer needs the request context, which ListCreateAPIView provides by default.
-    # No need to override perform_create here unless adding extra logic.
+    def get_queryset(self):
+        """Return job descriptions belonging to the current user, without their heavy text columns."""
+        return (
+            JobDescription.objects
+            .filter(user=self.request.user)
+            .select_related('analysis')
+            .only(
+                'id', 'user', 'title', 'original_filename', 'extraction_status', 'duplicate_of', 'uploaded_at', 'updated_at',
+                'analysis__title', 'analysis__seniority', 'analysis__skills',
+            )
+            .annotate(raw_text_preview=Left('raw_text', PREVIEW_CHARS), raw_text_length=Length('raw_text'))
+        )
 
 class JobDescriptionDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Allows authenticated users to retrieve, update, or delete their job descriptions."""
@@ -22,4 +55,54 @@ class JobDescriptionDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         """Return job descriptions belonging to the current user."""
-        return JobDescription.objects.filter(user=self.request.user)
+        return JobDescription.objects.filter(user=self.request.user).select_related('analysis')
+
+class JobDescriptionSearchView(generics.ListAPIView):
+    """Full-text search over the user's job descriptions (title and text), ranked and paginated. Use ?q=..."""
+    serializer_class = JobDescriptionSearchResultSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        queryset = JobDescription.objects.filter(user=self.request.user).select_related('analysis')
+        return search(queryset, get_search_text(self.request))
+
+class JobDescriptionRankView(APIView):
+    """
+    The user's job descriptions ranked by fit with their profile, best first,
+    with matched and missing skills. Scored locally from the stored analyses.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            profile_data = get_profile_snapshot(request.user)
+        except Profile.DoesNotExist:
+            return Response({"error": "User profile not found."}, status=status.HTTP_404_NOT_FOUND)
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(rank_job_descriptions(request.user, profile_data), request, view=self)
+        return paginator.get_paginated_response(JobDescriptionMatchSerializer(page, many=True).data)
+
+class JobDescriptionBulkCreateView(APIView):
+    """
+    Creates job descriptions from several uploaded files (``files``, repeated)
+    or from one zip archive (``archive``) in a single request. Files are parsed
+    in parallel and inserted together; each file gets its own status.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        files = request.FILES.getlist('files')
+        archive = request.FILES.get('archive')
+        if bool(files) == bool(archive):
+            return Response({"error": "Provide either 'files' or a zip 'archive'."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = bulk.bulk_ingest(request.user, files=files, archive=archive)
+        except bulk.BulkIngestError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "created": sum(1 for item in report if item['status'] == 'created'),
+            "failed": sum(1 for item in report if item['status'] == 'failed'),
+            "results": report,
+        }, status=status.HTTP_200_OK)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import ResumeTemplate, Resume
+from .models import ResumeTemplate, Resume, RenderedArtifact
 
 admin.site.register(ResumeTemplate)
 admin.site.register(Resume)
+admin.site.register(RenderedArtifact)
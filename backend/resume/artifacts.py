@@ -0,0 +1,103 @@
+"""
+Rendered resume files, stored once per rendering input.
+
+An artifact's key hashes everything its bytes depend on: the digest of the
+resume text, the format, the theme, the title, the PDF engine and
+``rendering.RENDERER_VERSION``. Generated resumes pass the SHA-256 their
+stored content already has, so a download that was rendered before costs
+one indexed lookup: no decompression and no rendering. A key never changes
+meaning, which is what lets ``RenderedArtifactView`` serve it as immutable
+for ``RESUME_RENDERING['CACHE_MAX_AGE']`` seconds; a changed resume or
+template yields a new key and URL.
+
+Artifact URLs are handed out by the export views after their ownership
+check, signed and valid for ``RESUME_RENDERING['URL_MAX_AGE']`` seconds:
+a key alone, or an expired link, does not fetch anyone's resume.
+
+Concurrent requests for the same missing artifact in one process share a
+single render.
+"""
+import hashlib
+import json
+import threading
+
+from django.core import signing
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from . import rendering
+from .models import RenderedArtifact
+
+_inflight_lock = threading.Lock()
+_inflight = {} # Key -> Future of a render in progress
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def artifact_key(source_digest, file_format, theme, title, engine):
+    payload = json.dumps([
+        rendering.RENDERER_VERSION, source_digest, file_format, list(theme), title,
+        engine if file_format == 'pdf' else None,
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_or_render(source_digest, file_format, theme, title, get_text):
+    """
+    Return the key of the artifact rendering the resume text whose SHA-256 is
+    ``source_digest``; ``get_text()`` is only called when it must be
+    rendered. Raises ``rendering.RenderError``.
+    """
+    key = artifact_key(source_digest, file_format, theme, title, rendering.get_config()['PDF_ENGINE'])
+    if RenderedArtifact.objects.filter(key=key).exists():
+        return key
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = rendering.submit(get_text(), file_format, theme, title)
+    try:
+        data = rendering.result(future)
+        # Waiters store it too: whichever insert comes first wins, the rest are no-ops
+        RenderedArtifact.objects.bulk_create(
+            [RenderedArtifact(key=key, format=file_format, data=data, size=len(data))], ignore_conflicts=True
+        )
+    finally:
+        if owner:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+    return key
+
+
+_signer = signing.TimestampSigner(salt='resume.artifacts')
+
+
+def artifact_url(request, key):
+    """Absolute URL of the artifact ``key``, signed for ``RESUME_RENDERING['URL_MAX_AGE']`` seconds."""
+    signature = _signer.sign(key).removeprefix(f"{key}{_signer.sep}")
+    return request.build_absolute_uri(f"{reverse('rendered-artifact', args=[key])}?{urlencode({'signature': signature})}")
+
+
+def check_signature(key, signature):
+    """Whether ``signature`` (from ``artifact_url``) is valid for ``key`` and not expired."""
+    try:
+        _signer.unsign(f"{key}{_signer.sep}{signature}", max_age=rendering.get_config()['URL_MAX_AGE'])
+    except signing.BadSignature: # Includes SignatureExpired
+        return False
+    return True
+
+
+def export_urls(request, kwargs, url_name):
+    """Export URLs of every format for the resume view ``url_name`` (with URL ``kwargs``)."""
+    return {
+        file_format: request.build_absolute_uri(reverse(url_name, kwargs={**kwargs, 'file_format': file_format}))
+        for file_format in rendering.FORMATS
+    }
+
+
+def prune_artifacts(older_than):
+    """Delete artifacts stored before the datetime ``older_than`` (they are re-rendered on demand); returns how many."""
+    count, _ = RenderedArtifact.objects.filter(created_at__lt=older_than).delete()
+    return count
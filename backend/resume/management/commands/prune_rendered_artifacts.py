@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from resume import artifacts
+from resume.models import RenderedArtifact
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete rendered resume files older than --days. Exports render them again on demand, "
+        "so this only trades storage for the CPU of re-rendering."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Keep files rendered within this many days.")
+
+    def handle(self, *args, **options):
+        removed = artifacts.prune_artifacts(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(f"Deleted {removed} rendered file(s).")
+        totals = RenderedArtifact.objects.aggregate(files=Count('id'), size=Sum('size'))
+        self.stdout.write(f"Stored rendered files: {totals['files']}, {(totals['size'] or 0) / 1024 / 1024:.1f} MB.")
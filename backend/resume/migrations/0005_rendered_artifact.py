@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0004_resume_personal_info'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('format', models.CharField(choices=[('html', 'HTML'), ('pdf', 'PDF')], max_length=4)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -52,3 +52,23 @@ class Resume(models.Model):
         return f"{self.user.username}'s Resume"
 
 
+
+
+class RenderedArtifact(models.Model):
+    """
+    A resume rendered to HTML or PDF, stored once per key: a hash of the
+    resume text, template theme and renderer (see resume/artifacts.py).
+    """
+    FORMAT_CHOICES = [
+        ('html', 'HTML'),
+        ('pdf', 'PDF')
+    ]
+
+    key = models.CharField(max_length=64, unique=True)
+    format = models.CharField(max_length=4, choices=FORMAT_CHOICES)
+    data = models.BinaryField()
+    size = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.format.upper()} {self.key[:12]} ({self.size} bytes)"
@@ -0,0 +1,660 @@
+"""
+Server-side rendering of resumes to HTML and PDF.
+
+Resume text is markdown: the stored text of a generated resume, or one
+built from a ``Resume``'s sections by ``resume_markdown()``. It is parsed
+into blocks once and written as a standalone HTML page or a PDF, styled
+with a ``ResumeTemplate``'s category and colors (a ``Theme``). Both
+outputs need only the standard library: the built-in PDF writer lays text
+out with the PDF base fonts. The optional 'pymupdf' engine lays out the
+HTML page instead, with embedded fonts and the full CSS; it also writes the
+PDFs whose text the base fonts cannot show (outside Windows-1252, e.g.
+Cyrillic or CJK names).
+
+Rendering is CPU-bound, so it runs in a bounded pool of worker processes
+(``settings.RESUME_RENDERING``, see backend/process_pool.py), like JD text
+extraction. The functions
+executed in the pool must not touch Django models: the workers are spawned
+processes without a configured Django. Rendered files are stored and
+served by ``resume/artifacts.py``.
+"""
+import html
+import importlib
+import io
+import re
+import zlib
+from collections import namedtuple
+
+from django.core.exceptions import ImproperlyConfigured
+
+from backend.process_pool import WorkerPool
+
+# Bump whenever the output for the same input changes, so stored renders are not reused
+RENDERER_VERSION = 2
+
+DEFAULTS = {
+    'MAX_WORKERS': 2,
+    'TIMEOUT': 30, # Seconds per render
+    'MEMORY_LIMIT_MB': 512, # Address-space cap per worker process
+    'PDF_ENGINE': 'builtin',
+    'CACHE_MAX_AGE': 365 * 24 * 60 * 60, # Seconds clients may keep a rendered file
+    'URL_MAX_AGE': 60 * 60, # Seconds a signed link to a rendered file stays valid
+}
+
+FORMATS = ('html', 'pdf')
+CONTENT_TYPES = {
+    'html': 'text/html; charset=utf-8',
+    'pdf': 'application/pdf',
+}
+
+
+class RenderError(Exception):
+    """Raised when a resume could not be rendered."""
+
+
+class RenderTimeout(RenderError):
+    """Raised when rendering a resume took longer than allowed."""
+
+
+# --- Themes ---
+
+Theme = namedtuple('Theme', 'category primary secondary')
+
+DEFAULT_THEME = Theme('minimal', '#1e88e5', '#43a047')
+HEX_COLOR = re.compile(r'^#(?:[0-9a-fA-F]{3}){1,2}$')
+
+
+def _color(value, default):
+    """``value`` as a ``#rrggbb`` color; anything else (it ends up in CSS and PDF operators) gives ``default``."""
+    value = (value or '').strip()
+    if not HEX_COLOR.match(value):
+        return default
+    if len(value) == 4:
+        value = '#' + ''.join(digit * 2 for digit in value[1:])
+    return value.lower()
+
+
+def theme_for(template):
+    """The ``Theme`` of a ``ResumeTemplate`` (the default theme for None)."""
+    if template is None:
+        return DEFAULT_THEME
+    return Theme(
+        template.category if template.category in CATEGORY_STYLES else DEFAULT_THEME.category,
+        _color(template.primary_color, DEFAULT_THEME.primary),
+        _color(template.secondary_color, DEFAULT_THEME.secondary),
+    )
+
+
+# --- Markdown ---
+
+Block = namedtuple('Block', 'kind level spans') # kind: heading, bullet, number, paragraph, rule
+Span = namedtuple('Span', 'text bold italic code href', defaults=(False, False, False, None))
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+RULE = re.compile(r'^\s*([-*_])(?:\s*\1){2,}\s*$')
+BULLET = re.compile(r'^(\s*)[-*+•]\s+(.*)$')
+NUMBER = re.compile(r'^(\s*)(\d{1,3})[.)]\s+(.*)$')
+INLINE = re.compile(
+    r'(?P<strong>\*\*|__)(?P<strong_text>.+?)(?P=strong)'
+    r'|(?<![\w*])\*(?!\s)(?P<em_text>.+?)(?<!\s)\*(?![\w*])'
+    r'|(?<!\w)_(?!\s)(?P<under_text>.+?)(?<!\s)_(?!\w)'
+    r'|`(?P<code_text>[^`]+)`'
+    r'|\[(?P<link_text>[^\]]+)\]\((?P<href>[^)\s]+)\)'
+)
+SAFE_LINK = re.compile(r'^(?:https?://|mailto:)', re.IGNORECASE)
+
+
+def parse_inline(text, bold=False, italic=False, href=None):
+    """Split one line of markdown into ``Span``s (bold, italic, code and links; no raw HTML)."""
+    spans, position = [], 0
+    for match in INLINE.finditer(text):
+        if match.start() > position:
+            spans.append(Span(text[position:match.start()], bold, italic, False, href))
+        if match.group('strong'):
+            spans += parse_inline(match.group('strong_text'), True, italic, href)
+        elif match.group('em_text') or match.group('under_text'):
+            spans += parse_inline(match.group('em_text') or match.group('under_text'), bold, True, href)
+        elif match.group('code_text'):
+            spans.append(Span(match.group('code_text'), bold, italic, True, href))
+        else:
+            # Only web and mail links become links; others keep their text
+            link = match.group('href') if SAFE_LINK.match(match.group('href')) else href
+            spans += parse_inline(match.group('link_text'), bold, italic, link)
+        position = match.end()
+    if position < len(text):
+        spans.append(Span(text[position:], bold, italic, False, href))
+    return spans
+
+
+def parse_markdown(text):
+    """
+    Parse the markdown subset models write resumes in into ``Block``s:
+    headings, bullet and numbered lists (two levels), rules and paragraphs.
+    List items and paragraphs continue over wrapped lines.
+    """
+    blocks, lines, current = [], [], None
+
+    def flush():
+        nonlocal current
+        if current is not None:
+            kind, level = current
+            blocks.append(Block(kind, level, parse_inline(" ".join(lines))))
+        current = None
+        lines.clear()
+
+    for raw in (text or '').splitlines():
+        line = raw.rstrip()
+        if not line.strip():
+            flush()
+        elif HEADING.match(line):
+            flush()
+            marks, title = HEADING.match(line).groups()
+            blocks.append(Block('heading', len(marks), parse_inline(title)))
+        elif RULE.match(line):
+            flush()
+            blocks.append(Block('rule', 0, []))
+        elif BULLET.match(line) or NUMBER.match(line):
+            flush()
+            bullet = BULLET.match(line)
+            if bullet:
+                indent, item = bullet.groups()
+                current = ('bullet', min(len(indent.expandtabs(4)) // 2, 1))
+            else:
+                indent, number, item = NUMBER.match(line).groups()
+                current = ('number', int(number))
+            lines.append(item.strip())
+        else:
+            if current is None:
+                current = ('paragraph', 0)
+            lines.append(line.strip())
+    flush()
+    return blocks
+
+
+def _line(label, value):
+    return f"**{label}:** {value}" if value else None
+
+
+def _dates(item):
+    start, end = item.get('start_date'), item.get('end_date')
+    if not start:
+        return ''
+    return f" ({start} - {end or 'Present'})"
+
+
+def resume_markdown(resume):
+    """
+    Markdown for a ``Resume``'s sections (a dict, e.g. serialized), laid out
+    like the frontend's manual resume preview.
+    """
+    info = resume.get('personal_info')
+    info = info if isinstance(info, dict) else {}
+    parts = [f"# {info.get('full_name') or resume.get('title') or 'Resume'}"]
+    contact = [str(value) for key, value in info.items() if key != 'full_name' and value]
+    if contact:
+        parts.append(" | ".join(contact))
+
+    def section(title, items, describe):
+        entries = [entry for entry in (describe(item) for item in items or [] if isinstance(item, dict)) if entry]
+        if entries:
+            parts.append(f"## {title}")
+            parts.append("\n".join(entries))
+
+    def experience(item):
+        heading = f"- **{item.get('position') or ''}** at {item.get('company') or ''}{_dates(item)}"
+        description = item.get('description')
+        return heading + (f"\n  {description}" if description else '')
+
+    def education(item):
+        field = item.get('field_of_study')
+        return (
+            f"- **{item.get('degree') or ''}** at {item.get('institution') or ''}{_dates(item)}"
+            + (f"\n  Field of Study: {field}" if field else '')
+        )
+
+    def project(item):
+        technologies = item.get('technologies')
+        if isinstance(technologies, list):
+            technologies = ", ".join(str(technology) for technology in technologies)
+        details = [item.get('description'), _line("Technologies", technologies), _line("Project Link", item.get('url'))]
+        return f"- **{item.get('name') or ''}**{_dates(item)}" + "".join(f"\n  {detail}" for detail in details if detail)
+
+    def skill(item):
+        proficiency = item.get('proficiency')
+        return f"- {item.get('name') or ''}" + (f" - {proficiency}" if proficiency else '')
+
+    def certification(item):
+        issued = item.get('issue_date')
+        validity = f" ({issued} - {item.get('expiration_date') or 'Valid'})" if issued else ''
+        credential = item.get('credential_id')
+        return (
+            f"- **{item.get('name') or ''}** - {item.get('issuing_organization') or ''}{validity}"
+            + (f"\n  Credential ID: {credential}" if credential else '')
+        )
+
+    def language(item):
+        proficiency = item.get('proficiency')
+        return f"- {item.get('name') or item.get('language') or ''}" + (f" - {proficiency}" if proficiency else '')
+
+    section("Work Experience", resume.get('work_experiences'), experience)
+    section("Education", resume.get('education'), education)
+    section("Projects", resume.get('projects'), project)
+    section("Skills", resume.get('skills'), skill)
+    section("Certifications", resume.get('certifications'), certification)
+    section("Languages", resume.get('languages'), language)
+    return "\n\n".join(parts)
+
+
+# --- HTML ---
+
+CATEGORY_STYLES = {
+    'minimal': {
+        'font': "'Helvetica Neue', Helvetica, Arial, sans-serif",
+        'h2': "color: {primary}; border-bottom: 1px solid {secondary}; padding-bottom: 2px;",
+    },
+    'creative': {
+        'font': "'Helvetica Neue', Helvetica, Arial, sans-serif",
+        'h2': "color: {primary}; border-left: 4px solid {secondary}; padding-left: 8px;",
+    },
+    'executive': {
+        'font': "Georgia, 'Times New Roman', Times, serif",
+        'h2': "color: {primary}; border-bottom: 2px solid {secondary}; text-transform: uppercase; letter-spacing: 0.05em;",
+    },
+}
+
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+{css}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def stylesheet(theme, screen=True):
+    """CSS of ``theme``; ``screen`` centers the page in a browser window (not wanted on paper)."""
+    style = CATEGORY_STYLES[theme.category]
+    page = " max-width: 800px; margin: 0 auto; padding: 36px;" if screen else ""
+    return "\n".join((
+        f"body {{ font-family: {style['font']}; font-size: 10.5pt; line-height: 1.45; color: #222;{page} }}",
+        f"h1 {{ color: {theme.primary}; font-size: 22pt; margin: 0 0 6px; }}",
+        "h2 { font-size: 13pt; margin: 18px 0 6px; " + style['h2'].format(**theme._asdict()) + " }",
+        "h3, h4, h5, h6 { font-size: 11pt; margin: 12px 0 4px; }",
+        "p { margin: 4px 0; }",
+        "ul, ol { margin: 4px 0; padding-left: 20px; }",
+        "li { margin: 2px 0; }",
+        f"hr {{ border: 0; border-top: 1px solid {theme.secondary}; margin: 12px 0; }}",
+        f"a {{ color: {theme.primary}; }}",
+        "code { font-family: 'Courier New', Courier, monospace; }",
+    ))
+
+
+def spans_html(spans):
+    parts = []
+    for span in spans:
+        text = html.escape(span.text)
+        if span.code:
+            text = f"<code>{text}</code>"
+        if span.italic:
+            text = f"<em>{text}</em>"
+        if span.bold:
+            text = f"<strong>{text}</strong>"
+        if span.href:
+            text = f'<a href="{html.escape(span.href)}">{text}</a>'
+        parts.append(text)
+    return "".join(parts)
+
+
+def blocks_html(blocks):
+    """The HTML body of ``blocks``: list items are grouped into (nested) lists."""
+    parts, open_lists = [], [] # Stack of (tag, level)
+
+    def close_lists(level=-1):
+        while open_lists and open_lists[-1][1] > level:
+            parts.append(f"</li></{open_lists.pop()[0]}>")
+
+    for block in blocks:
+        if block.kind in ('bullet', 'number'):
+            tag, level = ('ul', block.level) if block.kind == 'bullet' else ('ol', 0)
+            close_lists(level)
+            if open_lists and open_lists[-1][1] == level and open_lists[-1][0] != tag:
+                close_lists(level - 1)
+            if open_lists and open_lists[-1][1] == level:
+                parts.append("</li>")
+            else:
+                start = f' start="{block.level}"' if tag == 'ol' and block.level != 1 else ''
+                parts.append(f"<{tag}{start}>")
+                open_lists.append((tag, level))
+            parts.append(f"<li>{spans_html(block.spans)}")
+            continue
+        close_lists()
+        if block.kind == 'heading':
+            parts.append(f"<h{block.level}>{spans_html(block.spans)}</h{block.level}>")
+        elif block.kind == 'rule':
+            parts.append("<hr>")
+        else:
+            parts.append(f"<p>{spans_html(block.spans)}</p>")
+    close_lists()
+    return "\n".join(parts)
+
+
+def render_html(text, theme=DEFAULT_THEME, title="Resume"):
+    """A standalone, UTF-8 HTML page of resume markdown ``text``."""
+    page = HTML_PAGE.format(title=html.escape(title), css=stylesheet(theme), body=blocks_html(parse_markdown(text)))
+    return page.encode('utf-8')
+
+
+# --- PDF ---
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842 # A4 in points
+MARGIN = 54
+
+# Advance widths (1/1000 em) of ASCII 32-126 in Helvetica and Helvetica-Bold.
+# Times text is measured with these too: it is narrower on average, so lines never overflow.
+_REGULAR_WIDTHS = (
+    "278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 556 556 556 556 556 556 556 556 556 556 "
+    "278 278 584 584 584 556 1015 667 667 722 722 667 611 778 722 278 500 667 556 833 722 778 667 778 722 667 "
+    "611 722 667 944 667 667 611 278 278 278 469 556 333 556 556 500 556 556 278 556 556 222 222 500 222 833 "
+    "556 556 556 556 333 500 278 556 500 722 500 500 500 334 260 334 584"
+)
+_BOLD_WIDTHS = (
+    "278 333 474 556 556 889 722 238 333 333 389 584 278 333 278 278 556 556 556 556 556 556 556 556 556 556 "
+    "333 333 584 584 584 611 975 722 722 722 722 667 611 778 722 278 556 722 611 833 722 778 667 778 722 667 "
+    "611 722 667 944 667 667 611 333 278 333 584 556 333 556 611 556 611 556 333 611 611 278 278 556 278 889 "
+    "611 611 611 611 389 556 333 611 556 778 556 556 500 389 280 389 584"
+)
+WIDTHS = {
+    bold: dict(zip(map(chr, range(32, 127)), map(int, widths.split())))
+    for bold, widths in ((False, _REGULAR_WIDTHS), (True, _BOLD_WIDTHS))
+}
+WIDE_CHARACTERS = {'—': 1000, '…': 1000, '‰': 1000}
+CODE_WIDTH = 600 # Courier
+
+FONT_FAMILIES = {
+    'sans': ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique', 'Helvetica-BoldOblique'),
+    'serif': ('Times-Roman', 'Times-Bold', 'Times-Italic', 'Times-BoldItalic'),
+}
+CODE_FONT = 'F5' # Courier
+
+# Per block: (font size, leading, space before, bold, use the primary color)
+BLOCK_STYLES = {
+    1: (20, 24, 0, True, True),
+    2: (13, 17, 12, True, True),
+    3: (11, 15, 8, True, False),
+    'body': (10, 14, 3, False, False),
+}
+BULLET_INDENT = 12
+TEXT_COLOR = '#222222'
+
+
+def text_width(text, size, bold=False, code=False):
+    if code:
+        return len(text) * CODE_WIDTH * size / 1000
+    widths = WIDTHS[bold]
+    return sum(widths.get(char) or WIDE_CHARACTERS.get(char, 600) for char in text) * size / 1000
+
+
+def _font(span, bold):
+    if span.code:
+        return CODE_FONT
+    return 'F%d' % (1 + (span.bold or bold) + 2 * span.italic)
+
+
+def _pdf_string(text):
+    data = text.encode('cp1252') # render() sends text the base fonts cannot show to pymupdf
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _rgb(color):
+    return " ".join(f"{int(color[i:i + 2], 16) / 255:.3f}" for i in (1, 3, 5)).encode()
+
+
+def wrap_spans(spans, width, size, bold=False):
+    """
+    Greedily break ``spans`` into lines no wider than ``width`` points.
+    Returns lines as lists of (text, font, href, x offset, run width) runs.
+    """
+    lines, line, x = [], [], 0.0
+    space = text_width(" ", size, bold)
+    for span in spans:
+        for index, word in enumerate(re.split(r'(\s+)', span.text)):
+            if not word:
+                continue
+            is_space = index % 2 == 1
+            word = " " if is_space else word
+            run_width = space if is_space else text_width(word, size, bold or span.bold, span.code)
+            if is_space and not line:
+                continue
+            if not is_space and line and x + run_width > width:
+                if line[-1][0] == " ":
+                    line.pop()
+                lines.append(line)
+                line, x = [], 0.0
+            line.append((word, _font(span, bold), span.href, x, run_width))
+            x += run_width
+    if line:
+        if line[-1][0] == " ":
+            line.pop()
+        lines.append(line)
+    return lines
+
+
+class _PDFLayout:
+    """Places blocks top to bottom, starting new pages as needed; collects page streams and link rectangles."""
+
+    def __init__(self, theme):
+        self.theme = theme
+        self.pages = [] # (content stream bytes, [(rect, href)])
+        self.new_page()
+
+    def new_page(self):
+        self.content, self.links = [], []
+        self.pages.append((self.content, self.links))
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def ensure(self, height):
+        if self.y - height < MARGIN and self.y < PAGE_HEIGHT - MARGIN:
+            self.new_page()
+
+    def rule(self, space_before=6):
+        self.ensure(space_before + 6)
+        self.y -= space_before
+        self.content.append(
+            b"%s RG 0.75 w %d %.2f m %d %.2f l S" % (_rgb(self.theme.secondary), MARGIN, self.y, PAGE_WIDTH - MARGIN, self.y)
+        )
+        self.y -= 6
+
+    def text(self, spans, style, indent=0, marker=None):
+        size, leading, space_before, bold, colored = style
+        color = _rgb(self.theme.primary if colored else TEXT_COLOR)
+        link_color = _rgb(self.theme.primary)
+        lines = wrap_spans(spans, PAGE_WIDTH - 2 * MARGIN - indent, size, bold) or [[]]
+        self.ensure(space_before + leading)
+        self.y -= space_before
+        for number, line in enumerate(lines):
+            self.ensure(leading)
+            self.y -= leading
+            baseline = self.y + (leading - size) / 2
+            runs = [b"BT %s rg" % color]
+            if marker and number == 0:
+                runs.append(b"/F1 %d Tf %.2f %.2f Td %s Tj" % (size, MARGIN + indent - BULLET_INDENT, baseline, _pdf_string(marker)))
+                runs.append(b"%d 0 Td" % BULLET_INDENT)
+            else:
+                runs.append(b"%.2f %.2f Td" % (MARGIN + indent, baseline))
+            for text, font, href, x, width in line:
+                shown = b"/%s %d Tf %s Tj" % (font.encode(), size, _pdf_string(text))
+                if href:
+                    shown = b"%s rg %s %s rg" % (link_color, shown, color)
+                runs.append(shown)
+                if href:
+                    left = MARGIN + indent + x
+                    self.links.append(((left, baseline - 2, left + width, baseline + size), href))
+            runs.append(b"ET")
+            self.content.append(b" ".join(runs))
+        self.y -= 1
+
+    def block(self, block):
+        if block.kind == 'rule':
+            self.rule()
+        elif block.kind == 'heading':
+            self.text(block.spans, BLOCK_STYLES.get(block.level, BLOCK_STYLES[3]))
+            if block.level == 2:
+                self.rule(space_before=2)
+        elif block.kind == 'bullet':
+            self.text(block.spans, BLOCK_STYLES['body'], BULLET_INDENT * (block.level + 1), "•")
+        elif block.kind == 'number':
+            self.text(block.spans, BLOCK_STYLES['body'], BULLET_INDENT + 6, f"{block.level}.")
+        else:
+            self.text(block.spans, BLOCK_STYLES['body'])
+
+
+def _pdf_builtin(text, theme, title):
+    """Lay resume markdown out as a text PDF with the base-14 fonts (no embedded fonts, standard library only)."""
+    layout = _PDFLayout(theme)
+    for block in parse_markdown(text):
+        layout.block(block)
+
+    family = FONT_FAMILIES['serif' if theme.category == 'executive' else 'sans']
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None, # Page tree, filled in once the page objects are numbered
+        b"<< /Title %s /Producer (resume renderer) >>" % _pdf_string(title),
+    ]
+    fonts = []
+    for name in family + ('Courier',):
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % name.encode())
+        fonts.append(b"/F%d %d 0 R" % (len(fonts) + 1, len(objects)))
+    resources = b"<< /Font << %s >> >>" % b" ".join(fonts)
+
+    page_ids = []
+    for content, links in layout.pages:
+        stream = zlib.compress(b"\n".join(content))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        annotations = []
+        for (left, bottom, right, top), href in links:
+            objects.append(
+                b"<< /Type /Annot /Subtype /Link /Rect [%.2f %.2f %.2f %.2f] /Border [0 0 0] "
+                b"/A << /S /URI /URI %s >> >>" % (left, bottom, right, top, _pdf_string(href))
+            )
+            annotations.append(b"%d 0 R" % len(objects))
+        annots = b" /Annots [%s]" % b" ".join(annotations) if annotations else b""
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R%s >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, resources, content_id, annots)
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def _pdf_pymupdf(text, theme, title):
+    """Lay out the HTML page with PyMuPDF's Story (CSS support, embedded fonts)."""
+    pymupdf = importlib.import_module('pymupdf')
+    blocks = parse_markdown(text)
+    story = pymupdf.Story(html=blocks_html(blocks), user_css=stylesheet(theme, screen=False))
+    output = io.BytesIO()
+    writer = pymupdf.DocumentWriter(output)
+    page = pymupdf.Rect(0, 0, PAGE_WIDTH, PAGE_HEIGHT)
+    more = True
+    while more:
+        device = writer.begin_page(page)
+        more, _filled = story.place(page + (MARGIN, MARGIN, -MARGIN, -MARGIN))
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+    document = pymupdf.open(stream=output.getvalue(), filetype='pdf')
+    document.set_metadata({'title': title})
+    document.subset_fonts()
+    return document.tobytes(garbage=3, deflate=True)
+
+
+PDF_ENGINES = {
+    'builtin': (_pdf_builtin, None),
+    'pymupdf': (_pdf_pymupdf, 'pymupdf'),
+}
+
+
+def get_pdf_engine(name):
+    """The PDF writer function named ``name``, checking its optional package is installed."""
+    try:
+        writer, module = PDF_ENGINES[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown PDF rendering engine '{name}'. Choose from: {', '.join(PDF_ENGINES)}.")
+    if module:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            raise ImproperlyConfigured(f"PDF rendering engine '{name}' needs the '{module}' package: {e}")
+    return writer
+
+
+def base_fonts_cover(*texts):
+    """Whether the PDF base fonts (Windows-1252 encoded) can show every character of ``texts``."""
+    try:
+        for text in texts:
+            text.encode('cp1252')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def render(text, file_format, theme=DEFAULT_THEME, title="Resume", engine=DEFAULTS['PDF_ENGINE']):
+    """Render resume markdown ``text`` as ``file_format`` ('html' or 'pdf') bytes, in this process."""
+    theme = Theme(*theme)
+    if file_format == 'html':
+        return render_html(text, theme, title)
+    if file_format == 'pdf':
+        if engine == 'builtin' and not base_fonts_cover(text, title):
+            try:
+                return get_pdf_engine('pymupdf')(text, theme, title)
+            except ImproperlyConfigured as e:
+                raise RenderError(
+                    f"The resume has characters the built-in PDF engine cannot write (only Windows-1252 is supported): {e}"
+                )
+        return get_pdf_engine(engine)(text, theme, title)
+    raise RenderError(f"Unknown format '{file_format}'. Choose from: {', '.join(FORMATS)}.")
+
+
+# --- Web process side ---
+
+def get_config():
+    from django.conf import settings
+    return {**DEFAULTS, **getattr(settings, 'RESUME_RENDERING', {})}
+
+
+_pool = WorkerPool(get_config, RenderError, RenderTimeout, {
+    'timeout': "Timed out rendering the resume.",
+    'memory': "The resume needs more memory than allowed to render.",
+    'crash': "The rendering worker crashed, likely exceeding its memory limit.",
+})
+
+
+def submit(text, file_format, theme=DEFAULT_THEME, title="Resume"):
+    """Start rendering in the pool and return a Future resolving to the file's bytes."""
+    config = get_config()
+    get_pdf_engine(config['PDF_ENGINE']) # Fail here, not in the worker, if it is misconfigured
+    return _pool.submit(render, text, file_format, tuple(theme), title, config['PDF_ENGINE'])
+
+
+def result(future):
+    """Wait for a rendering Future and translate failures into RenderError."""
+    return _pool.result(future)
@@ -0,0 +1,66 @@
+import importlib.util
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from . import rendering
+from .models import Resume
+
+
+class ResumeExportTests(TestCase):
+    """Exports are for the resume's owner; the rendered file is only served through a fresh signed link."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'password')
+        self.resume = Resume.objects.create(
+            user=self.user, title="Иван Петров", personal_info={'full_name': "Иван Петров"}, skills=["Python"],
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_only_the_owner_can_export(self):
+        url = f'/api/resumes/{self.resume.pk}/export/html/'
+        self.assertEqual(APIClient().get(url).status_code, 401)
+        stranger = APIClient()
+        stranger.force_authenticate(User.objects.create_user('stranger', 'stranger@example.com', 'password'))
+        self.assertEqual(stranger.get(url).status_code, 404)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+        served = APIClient().get(response['Location'])
+        self.assertEqual(served.status_code, 200)
+        self.assertIn("Иван Петров", served.content.decode('utf-8'))
+
+    def test_artifact_links_are_signed_and_expire(self):
+        location = self.client.get(f'/api/resumes/{self.resume.pk}/export/html/')['Location']
+        path, _, query = location.partition('?')
+        self.assertEqual(APIClient().get(path).status_code, 403)
+        self.assertEqual(APIClient().get(path, {'signature': query.split('=', 1)[1] + 'x'}).status_code, 403)
+        with self.settings(RESUME_RENDERING={**settings.RESUME_RENDERING, 'URL_MAX_AGE': -1}):
+            self.assertEqual(APIClient().get(location).status_code, 403)
+
+
+class UnicodePDFTests(SimpleTestCase):
+    """Text outside the PDF base fonts' encoding is never written as '?'."""
+    TEXT = "# Иван Петров\n\n- Разработчик Python"
+
+    def test_base_font_text_uses_the_builtin_engine(self):
+        pdf = rendering.render("# Ivan Petrov\n\n- Python developer", 'pdf', engine='builtin')
+        self.assertIn(b"/BaseFont /Helvetica", pdf)
+
+    @skipUnless(importlib.util.find_spec('pymupdf'), "pymupdf is an optional dependency")
+    def test_other_text_falls_back_to_pymupdf(self):
+        pymupdf = importlib.import_module('pymupdf')
+        pdf = rendering.render(self.TEXT, 'pdf', title="Резюме", engine='builtin')
+        document = pymupdf.open(stream=pdf, filetype='pdf')
+        self.assertIn("Иван Петров", document[0].get_text())
+        self.assertEqual(document.metadata['title'], "Резюме")
+
+    def test_without_pymupdf_it_is_an_error(self):
+        with mock.patch.object(rendering, 'get_pdf_engine', side_effect=ImproperlyConfigured("needs 'pymupdf'")):
+            with self.assertRaisesMessage(rendering.RenderError, "Windows-1252"):
+                rendering.render(self.TEXT, 'pdf', engine='builtin')
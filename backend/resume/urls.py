@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import ResumeTemplateListView, ResumeTemplateDetailView, ResumeListView, ResumeDetailView, ManualResumeCreateView, ResumePreviewView
+from .views import ResumeTemplateListView, ResumeTemplateDetailView, ResumeListView, ResumeDetailView, ManualResumeCreateView, ResumePreviewView, ResumeExportView, RenderedArtifactView
 
 urlpatterns = [
     path('templates/', ResumeTemplateListView.as_view(), name='resumetemplate-list'),
@@ -8,4 +8,6 @@ urlpatterns = [
     path('resumes/<int:pk>/', ResumeDetailView.as_view(), name='resume-detail'),
     path('manual-resumes/', ManualResumeCreateView.as_view(), name='manual-resume-create'),
     path('resumes/<int:pk>/preview/', ResumePreviewView.as_view(), name='resume-preview'),
+    path('resumes/<int:pk>/export/<str:file_format>/', ResumeExportView.as_view(), name='resume-export'),
+    path('rendered/<str:key>/', RenderedArtifactView.as_view(), name='rendered-artifact'),
 ]
\ No newline at end of file
@@ -1,6 +1,16 @@
-from rest_framework import generics
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.http import etag
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from .models import ResumeTemplate, Resume
+from users.conditional import conditional_get, version_tag
+from . import artifacts, rendering
+from .models import ResumeTemplate, Resume, RenderedArtifact
 from .serializers import ResumeTemplateSerializer, ResumeSerializer, ManualResumeSerializer
 
 class ResumeTemplateListView(generics.ListAPIView):
@@ -21,6 +31,12 @@ class ResumeListView(generics.ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 
+def resume_validators(request, pk):
+    updated_at = Resume.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    return (version_tag('resume', pk, updated_at), updated_at) if updated_at else (None, None)
+
+
+@conditional_get(resume_validators)
 class ResumeDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Resume.objects.all()
     serializer_class = ResumeSerializer
@@ -31,6 +47,7 @@ class ManualResumeCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+@conditional_get(resume_validators)
 class ResumePreviewView(generics.RetrieveAPIView):
     queryset = Resume.objects.all()
     serializer_class = ResumeSerializer
@@ -39,4 +56,57 @@ class ResumePreviewView(generics.RetrieveAPIView):
         resume = self.get_object()
         # Add any additional processing for preview if needed
         serializer = self.get_serializer(resume)
-        return Response(serializer.data)
\ No newline at end of file
+        exports = artifacts.export_urls(request, {'pk': resume.pk}, 'resume-export')
+        return Response({**serializer.data, 'exports': exports})
+
+class ResumeExportView(generics.RetrieveAPIView):
+    """
+    Render one of the current user's resumes with its template as HTML or PDF
+    and redirect to the stored, long-cacheable file (through a signed link).
+    A resume rendered before is not rendered again.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ResumeSerializer
+
+    def get_queryset(self):
+        return Resume.objects.select_related('template').filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        file_format = kwargs['file_format']
+        if file_format not in rendering.FORMATS:
+            raise NotFound(f"Unknown format '{file_format}'. Choose from: {', '.join(rendering.FORMATS)}.")
+        resume = self.get_object()
+        text = rendering.resume_markdown(self.get_serializer(resume).data)
+        try:
+            key = artifacts.get_or_render(
+                artifacts.text_digest(text), file_format, rendering.theme_for(resume.template),
+                resume.title or "Resume", lambda: text,
+            )
+        except rendering.RenderError as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return redirect(artifacts.artifact_url(request, key))
+
+class RenderedArtifactView(View):
+    """
+    Serve a rendered resume file to holders of a valid signed link from an
+    export view (403 otherwise). Its key changes whenever its content would,
+    so clients may cache it for RESUME_RENDERING['CACHE_MAX_AGE'] seconds and
+    revalidation (If-None-Match) needs no query.
+    """
+
+    def get(self, request, key):
+        if not artifacts.check_signature(key, request.GET.get('signature', '')):
+            raise PermissionDenied("This link is invalid or has expired; export the resume again.")
+        return self.serve(request, key)
+
+    @method_decorator(etag(lambda request, key: key))
+    def serve(self, request, key):
+        artifact = get_object_or_404(RenderedArtifact.objects.only('format', 'data'), key=key)
+        response = HttpResponse(bytes(artifact.data), content_type=rendering.CONTENT_TYPES[artifact.format])
+        disposition = 'attachment' if artifact.format == 'pdf' else 'inline'
+        response['Content-Disposition'] = f'{disposition}; filename="resume-{key[:12]}.{artifact.format}"'
+        if artifact.format == 'html':
+            # The page is self-contained: no scripts, nothing loaded from elsewhere
+            response['Content-Security-Policy'] = "default-src 'none'; style-src 'unsafe-inline'"
+        patch_cache_control(response, private=True, max_age=rendering.get_config()['CACHE_MAX_AGE'], immutable=True)
+        return response
\ No newline at end of file
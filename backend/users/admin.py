@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Profile, Education, Experience, Skill, Project, Certification
+from .models import Profile, ProfileSnapshot, Education, Experience, Skill, Project, Certification
 
 # Register your models here.
 admin.site.register(Profile)
@@ -8,4 +8,5 @@ admin.site.register(Experience)
 admin.site.register(Project)
 admin.site.register(Certification)
 admin.site.register(Skill)
+admin.site.register(ProfileSnapshot)
 
@@ -0,0 +1,51 @@
+"""
+Conditional GET for the detail views the frontend polls.
+
+``conditional_get(validators)`` wraps a view class's ``get``.
+``validators(request, **kwargs)`` returns the resource's ``(etag,
+last_modified)``, either of which may be None, from one cheap query on a
+version counter or timestamps, never the serialized object. A request
+whose If-None-Match / If-Modified-Since still match gets 304 Not Modified
+without the handler running; other responses carry the validators.
+
+Responses are marked ``private, no-cache``: clients keep them but always
+revalidate, so polling stays cheap and never shows stale data. Validators
+must apply the same user scoping as the view, so a 304 reveals nothing the
+full response would not.
+"""
+import functools
+
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+
+def conditional_get(validators):
+    def decorator(view_class):
+        get = view_class.get
+
+        @functools.wraps(get)
+        def conditional(self, request, *args, **kwargs):
+            etag, last_modified = validators(request, **kwargs)
+            etag = quote_etag(etag) if etag else None
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = get(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        view_class.get = conditional
+        return view_class
+    return decorator
+
+
+def version_tag(*parts):
+    """An ETag from identifying parts; datetimes contribute their microsecond timestamp."""
+    return "-".join(
+        str(int(part.timestamp() * 1_000_000)) if hasattr(part, 'timestamp') else str(part) for part in parts
+    )
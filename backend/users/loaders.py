@@ -0,0 +1,18 @@
+from .models import Profile
+
+# Reverse relations rendered by ProfileDetailSerializer
+PROFILE_ITEM_RELATIONS = ('education', 'experiences', 'projects', 'skills', 'certifications')
+
+
+def profile_queryset():
+    """Profiles with their user and all nested items fetched up front."""
+    return Profile.objects.select_related('user').prefetch_related(*PROFILE_ITEM_RELATIONS)
+
+
+def load_profile(user):
+    """
+    Fetch ``user``'s profile graph in a fixed number of queries (one for the
+    profile and user, one per item relation), however many items it has.
+    Raises Profile.DoesNotExist if the user has no profile.
+    """
+    return profile_queryset().get(user=user)
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_snapshot_rows(apps, schema_editor):
+    Profile = apps.get_model('users', 'Profile')
+    ProfileSnapshot = apps.get_model('users', 'ProfileSnapshot')
+    ProfileSnapshot.objects.bulk_create(
+        [ProfileSnapshot(profile_id=pk) for pk in Profile.objects.values_list('pk', flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileSnapshot',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='users.profile')),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(create_snapshot_rows, migrations.RunPython.noop),
+    ]
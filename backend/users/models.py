@@ -67,3 +67,17 @@ class Certification(models.Model):
 
     def __str__(self):
         return self.name
+
+class ProfileSnapshot(models.Model):
+    """
+    Denormalized JSON copy of a profile and all its nested items, as rendered by
+    ProfileDetailSerializer. ``data`` is cleared (and ``version`` bumped) whenever
+    the profile or one of its items changes, and rebuilt on the next read.
+    """
+    profile = models.OneToOneField(Profile, on_delete=models.CASCADE, primary_key=True, related_name='snapshot')
+    data = models.JSONField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Snapshot of {self.profile} (v{self.version})"
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Profile, ProfileSnapshot, Education, Experience, Project, Skill, Certification
+from .snapshots import invalidate_profile_snapshot
+
+PROFILE_ITEM_MODELS = (Education, Experience, Project, Skill, Certification)
+# User fields rendered in the profile snapshot (see UserSerializer)
+SNAPSHOT_USER_FIELDS = {'username', 'email', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_on_profile_save(sender, instance, created, **kwargs):
+    if created:
+        # Create the (empty) snapshot row up front so invalidations always have a row to bump.
+        ProfileSnapshot.objects.get_or_create(profile=instance)
+    else:
+        invalidate_profile_snapshot(instance.pk)
+
+
+def invalidate_on_item_change(sender, instance, **kwargs):
+    invalidate_profile_snapshot(instance.profile_id)
+
+
+for model in PROFILE_ITEM_MODELS:
+    post_save.connect(invalidate_on_item_change, sender=model, dispatch_uid=f'snapshot-save-{model.__name__}')
+    post_delete.connect(invalidate_on_item_change, sender=model, dispatch_uid=f'snapshot-delete-{model.__name__}')
+
+
+@receiver(post_save, sender=User)
+def invalidate_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not SNAPSHOT_USER_FIELDS & set(update_fields)):
+        return # e.g. last_login updates
+    profile_id = Profile.objects.filter(user=instance).values_list('pk', flat=True).first()
+    if profile_id is not None:
+        invalidate_profile_snapshot(profile_id)
@@ -0,0 +1,44 @@
+"""
+Read-through cache of serialized profiles backed by ProfileSnapshot.
+
+Profile reads vastly outnumber writes, so instead of serializing six tables on
+every request the rendered profile is stored as JSON and only rebuilt after a
+write has invalidated it (see users/signals.py).
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from .loaders import load_profile
+from .models import ProfileSnapshot
+from .serializers import ProfileDetailSerializer
+
+
+def get_profile_snapshot(user):
+    """
+    Return the serialized profile of ``user``, rebuilding it if stale.
+    Raises Profile.DoesNotExist if the user has no profile.
+    """
+    snapshot = ProfileSnapshot.objects.filter(profile__user=user).only('profile_id', 'data', 'version').first()
+    if snapshot is not None and snapshot.data is not None:
+        return snapshot.data
+
+    if snapshot is None:
+        # Profiles created before snapshots have no row. Concurrent first reads
+        # may both insert it: the later insert is a no-op.
+        profile_id = load_profile(user).pk # Raises Profile.DoesNotExist; reloaded below once the version is known
+        ProfileSnapshot.objects.bulk_create([ProfileSnapshot(profile_id=profile_id)], ignore_conflicts=True)
+        snapshot = ProfileSnapshot.objects.only('version').get(profile_id=profile_id)
+
+    # The version is read before the profile, so a write during the load is never hidden.
+    profile = load_profile(user)
+    data = ProfileDetailSerializer(profile).data
+    # Only store the rebuilt data if no write invalidated it in the meantime.
+    ProfileSnapshot.objects.filter(profile_id=profile.pk, version=snapshot.version).update(
+        data=data, built_at=timezone.now()
+    )
+    return data
+
+
+def invalidate_profile_snapshot(profile_id):
+    """Mark the snapshot of the given profile as stale."""
+    ProfileSnapshot.objects.filter(profile_id=profile_id).update(data=None, version=F('version') + 1)
@@ -1,3 +1,140 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from . import snapshots
+from .loaders import load_profile
+from .models import Profile, ProfileSnapshot, Education, Experience, Project, Skill, Certification
+from .serializers import ProfileDetailSerializer
+
+
+def add_profile_items(profile, count):
+    """Give the profile ``count`` items of every nested type."""
+    for i in range(count):
+        Education.objects.create(profile=profile, institution_name=f"University {i}", degree="BSc", start_date=date(2010, 1, 1))
+        Experience.objects.create(profile=profile, company_name=f"Company {i}", job_title="Engineer", start_date=date(2015, 1, 1), description="Built things.")
+        Project.objects.create(profile=profile, project_name=f"Project {i}", description="A project.", technologies_used="Python, Django")
+        Skill.objects.create(profile=profile, name=f"Skill {i}")
+        Certification.objects.create(profile=profile, name=f"Cert {i}", issuing_organization="Org", issue_date=date(2020, 1, 1))
+
+
+class ProfileLoaderQueryCountTests(TestCase):
+    # One query for profile + user, one per nested relation
+    EXPECTED_QUERIES = 6
+
+    def setUp(self):
+        self.user = User.objects.create_user('senior', 'senior@example.com', 'password')
+        self.profile = Profile.objects.create(user=self.user, full_name="Senior Dev")
+
+    def serialize_profile(self):
+        return ProfileDetailSerializer(load_profile(self.user)).data
+
+    def test_query_count_is_constant_for_small_profile(self):
+        add_profile_items(self.profile, 1)
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            data = self.serialize_profile()
+        self.assertEqual(len(data['experiences']), 1)
+
+    def test_query_count_is_constant_for_large_profile(self):
+        add_profile_items(self.profile, 40)
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            data = self.serialize_profile()
+        self.assertEqual(len(data['experiences']), 40)
+        self.assertEqual(len(data['skills']), 40)
+        self.assertEqual(data['user']['username'], 'senior')
+
+    def test_profile_detail_view_query_count_does_not_grow(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        # Cold reads rebuild the snapshot: version (ETag) + lookup + profile graph + store
+        add_profile_items(self.profile, 1)
+        with self.assertNumQueries(2 + self.EXPECTED_QUERIES + 1):
+            response = client.get('/api/profile/')
+        self.assertEqual(response.status_code, 200)
+
+        add_profile_items(self.profile, 30)
+        with self.assertNumQueries(2 + self.EXPECTED_QUERIES + 1):
+            response = client.get('/api/profile/')
+        self.assertEqual(len(response.data['certifications']), 31)
+
+        # Warm reads are served from the snapshot alone
+        with self.assertNumQueries(2):
+            response = client.get('/api/profile/')
+        self.assertEqual(len(response.data['certifications']), 31)
+
+
+class ProfileSnapshotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('writer', 'writer@example.com', 'password')
+        self.profile = Profile.objects.create(user=self.user, full_name="Writer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_item_writes_through_views_invalidate_snapshot(self):
+        self.assertEqual(self.client.get('/api/profile/').data['skills'], [])
+
+        response = self.client.post('/api/skills/', {'name': 'Python'})
+        self.assertEqual(response.status_code, 201)
+        skills = self.client.get('/api/profile/').data['skills']
+        self.assertEqual([skill['name'] for skill in skills], ['Python'])
+
+        self.client.delete(f"/api/skills/{response.data['id']}/")
+        self.assertEqual(self.client.get('/api/profile/').data['skills'], [])
+
+    def test_profile_and_user_updates_invalidate_snapshot(self):
+        self.client.get('/api/profile/')
+        self.client.patch('/api/profile/', {'summary': 'Updated summary'})
+        self.assertEqual(self.client.get('/api/profile/').data['summary'], 'Updated summary')
+
+        self.user.email = 'new@example.com'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/profile/').data['user']['email'], 'new@example.com')
+
+    def test_missing_snapshot_row_is_created_once(self):
+        ProfileSnapshot.objects.all().delete()
+        self.assertEqual(snapshots.get_profile_snapshot(self.user)['full_name'], "Writer")
+        # A second first read (e.g. a concurrent one that also missed) finds the row already there
+        ProfileSnapshot.objects.update(data=None)
+        self.assertEqual(snapshots.get_profile_snapshot(self.user)['full_name'], "Writer")
+        self.assertEqual(ProfileSnapshot.objects.count(), 1)
+
+    def test_deleted_profile_has_no_snapshot(self):
+        snapshots.get_profile_snapshot(self.user)
+        self.profile.delete()
+        with self.assertRaises(Profile.DoesNotExist):
+            snapshots.get_profile_snapshot(self.user)
+        self.assertFalse(ProfileSnapshot.objects.exists())
+
+    def test_write_during_rebuild_is_not_hidden(self):
+        ProfileSnapshot.objects.all().delete()
+
+        def load_then_write(user):
+            profile = load_profile(user)
+            if ProfileSnapshot.objects.exists() and not Skill.objects.exists():
+                Skill.objects.create(profile=self.profile, name="Python") # Lands after the data was loaded
+            return profile
+
+        with mock.patch.object(snapshots, 'load_profile', load_then_write):
+            self.assertEqual(snapshots.get_profile_snapshot(self.user)['skills'], [])
+        self.assertIsNone(ProfileSnapshot.objects.get().data)
+        self.assertEqual([skill['name'] for skill in snapshots.get_profile_snapshot(self.user)['skills']], ["Python"])
+
+    def test_unchanged_profile_is_not_modified(self):
+        response = self.client.get('/api/profile/')
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        # Only the snapshot version is read
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/profile/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
 
-# Create your tests here.
+        self.client.post('/api/skills/', {'name': 'Python'})
+        response = self.client.get('/api/profile/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
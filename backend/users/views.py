@@ -7,7 +7,10 @@ from .serializers import (
     ProfileDetailSerializer # Optional: Use for profile retrieval
 )
 from django.contrib.auth.models import User
-from .models import Profile, Education, Experience, Project, Skill, Certification
+from .models import Profile, ProfileSnapshot, Education, Experience, Project, Skill, Certification
+from .conditional import conditional_get, version_tag
+from .loaders import load_profile
+from .snapshots import get_profile_snapshot
 
 class RegisterView(generics.GenericAPIView):
     serializer_class = RegisterSerializer
@@ -34,15 +37,31 @@ class UserDetailView(generics.RetrieveAPIView):
     def get_object(self):
         return self.request.user
 
+def profile_validators(request, **kwargs):
+    # The snapshot version is bumped by every write to the profile, its items or its user
+    snapshot = ProfileSnapshot.objects.filter(profile__user=request.user).values_list('profile_id', 'version').first()
+    return (version_tag('profile', *snapshot) if snapshot else None), None
+
 # Use RetrieveUpdateAPIView for the user's profile (usually only one)
+@conditional_get(profile_validators)
 class ProfileDetailView(generics.RetrieveUpdateAPIView):
     serializer_class = ProfileDetailSerializer # Use the detailed serializer for GET
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        # Ensure the user has a profile, create if not (shouldn't happen with RegisterView)
-        profile, created = Profile.objects.get_or_create(user=self.request.user)
-        return profile
+        # Load the profile with all nested items to avoid a query per relation
+        try:
+            return load_profile(self.request.user)
+        except Profile.DoesNotExist:
+            # Ensure the user has a profile, create if not (shouldn't happen with RegisterView)
+            return Profile.objects.create(user=self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Serve the denormalized snapshot instead of re-serializing six tables
+        try:
+            return Response(get_profile_snapshot(request.user))
+        except Profile.DoesNotExist:
+            return super().retrieve(request, *args, **kwargs)
 
 
 # --- Base View for Profile Items --- 
@@ -124,14 +124,47 @@ export const fetchResumePreview = (resumeId) => apiClient.get(`/resumes/${resume
 export const fetchAIGeneratedResumePreview = (resumeId) => apiClient.get(`/generated/${resumeId}/preview/`);
 
 export const createJobDescription = (jobDescriptionData) => apiClient.post('/job-descriptions/', jobDescriptionData);
-export const generateResume = (data) => apiClient.post('/compose/', data);
+export const enqueueComposition = (data, config) => apiClient.post('/compose/jobs/', data, config);
+export const fetchCompositionJob = (jobId, config) => apiClient.get(`/compose/jobs/${jobId}/`, config);
+
+// Thrown by generateResume when its job has not finished within `timeout` ms
+export class CompositionTimeoutError extends Error {
+  constructor() {
+    super('Resume composition is taking longer than expected. Check My Resumes again in a few minutes.');
+    this.name = 'CompositionTimeoutError';
+  }
+}
+
+const wait = (ms, signal) => new Promise((resolve, reject) => {
+  const timer = setTimeout(resolve, ms);
+  signal?.addEventListener('abort', () => {
+    clearTimeout(timer);
+    reject(signal.reason);
+  }, { once: true });
+});
+
+// Composes in the background workers (no web worker waits on the model) and
+// resolves with the generated resume once its job has finished. Polling stops
+// after `timeout` ms (CompositionTimeoutError) or when `signal` aborts.
+export const generateResume = async (data, { pollInterval = 1500, timeout = 5 * 60 * 1000, signal } = {}) => {
+  const { data: queued } = await enqueueComposition(data, { signal });
+  const deadline = Date.now() + timeout;
+  while (Date.now() < deadline) {
+    await wait(pollInterval, signal);
+    const { data: job } = await fetchCompositionJob(queued.job_id, { signal });
+    if (job.status === 'succeeded') return fetchGeneratedResume(job.generated_resume_id, { signal });
+    if (job.status === 'failed') throw new Error(job.error || 'Resume composition failed');
+  }
+  throw new CompositionTimeoutError();
+};
 export const fetchLatestGeneratedResume = () => apiClient.get('/generated-resumes/latest/');
-export const fetchGeneratedResume = (resumeId) => apiClient.get(`/generated/${resumeId}/`);
+export const fetchGeneratedResume = (resumeId, config) => apiClient.get(`/generated/${resumeId}/`, config);
 
 export const createManualResume = (resumeData) => apiClient.post('/manual-resumes/', resumeData);
 
 export const fetchUserResumes = () => apiClient.get('/resumes/');
-export const fetchAIGeneratedResumes = () => apiClient.get('/generated/');
+// Cursor-paginated, newest first; pass a page's `next` URL to load the following page
+export const fetchAIGeneratedResumes = (pageUrl) => apiClient.get(pageUrl || '/generated/');
 export const deleteAIGeneratedResume = (id) => apiClient.delete(`/generated/${id}/`);
 
 export default apiClient;
\ No newline at end of file
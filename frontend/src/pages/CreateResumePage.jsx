@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { motion } from 'framer-motion';
 import { 
   FiUser, FiBookOpen, FiBriefcase, FiAward, 
@@ -9,6 +9,7 @@ import {
   fetchResumeTemplates, 
   createResume, 
   generateResume,
+  CompositionTimeoutError,
   createJobDescription,
   fetchLatestGeneratedResume,
   createManualResume 
@@ -55,8 +56,13 @@ function CreateResumePage() {
   const [isLoading, setIsLoading] = useState(false);
   const [errorMessage, setErrorMessage] = useState(null);
 
+  // Aborted on unmount so a pending composition stops polling
+  const pollAbort = useRef(null);
+
   useEffect(() => {
     fetchTemplates();
+    pollAbort.current = new AbortController();
+    return () => pollAbort.current.abort();
   }, []);
 
   const fetchTemplates = async () => {
@@ -371,7 +377,7 @@ function CreateResumePage() {
         response = await generateResume({
           job_description_id: jobDescResponse.data.id,
           template_id: resumeData.template
-        });
+        }, { signal: pollAbort.current.signal });
       } else {
         // For manual mode, create the resume directly
         response = await createManualResume(resumeDataToSend);
@@ -384,6 +390,7 @@ function CreateResumePage() {
         throw new Error('Invalid response format from server');
       }
     } catch (error) {
+      if (pollAbort.current.signal.aborted) return; // Left the page
       console.error('Error creating resume:', error);
       
       if (error.response) {
@@ -412,7 +419,7 @@ function CreateResumePage() {
       
       const response = await generateResume({
         job_description_id: jobDescriptionResponse.data.id
-      });
+      }, { signal: pollAbort.current.signal });
       
       const generatedResumeResponse = await fetchLatestGeneratedResume();
       
@@ -423,8 +430,9 @@ function CreateResumePage() {
       toast.success('Resume generated successfully');
       window.location.href = `/resume/${generatedResumeResponse.data.id}`;
     } catch (error) {
+      if (pollAbort.current.signal.aborted) return; // Left the page
       console.error('Error generating resume:', error);
-      toast.error('Failed to generate resume');
+      toast.error(error instanceof CompositionTimeoutError ? error.message : 'Failed to generate resume');
     } finally {
       setIsLoading(false);
     }
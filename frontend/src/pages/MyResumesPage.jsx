@@ -8,6 +8,8 @@ import { fetchUserResumes, fetchAIGeneratedResumes, deleteResume, deleteAIGenera
 function MyResumesPage() {
   const [manualResumes, setManualResumes] = useState([]);
   const [aiResumes, setAiResumes] = useState([]);
+  const [aiNextPage, setAiNextPage] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('manual'); // 'manual' or 'ai'
 
@@ -22,7 +24,8 @@ function MyResumesPage() {
         ]);
         
         setManualResumes(manualResponse.data || []);
-        setAiResumes(aiResponse.data || []);
+        setAiResumes(aiResponse.data?.results || []); // Cursor-paginated: first page, newest first
+        setAiNextPage(aiResponse.data?.next || null);
       } catch (error) {
         console.error('Error fetching resumes:', error);
         toast.error('Failed to load resumes');
@@ -34,6 +37,20 @@ function MyResumesPage() {
     fetchResumes();
   }, []);
 
+  const loadMoreAIResumes = async () => {
+    try {
+      setIsLoadingMore(true);
+      const response = await fetchAIGeneratedResumes(aiNextPage);
+      setAiResumes(previous => [...previous, ...(response.data?.results || [])]);
+      setAiNextPage(response.data?.next || null);
+    } catch (error) {
+      console.error('Error fetching more resumes:', error);
+      toast.error('Failed to load more resumes');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (id, isAI = false) => {
     if (window.confirm('Are you sure you want to delete this resume?')) {
       try {
@@ -166,16 +183,29 @@ function MyResumesPage() {
           >
             AI Generated
             <span className="ml-2 bg-gray-700 text-gray-300 text-xs px-2 py-1 rounded-full">
-              {aiResumes.length}
+              {aiResumes.length}{aiNextPage ? '+' : ''}
             </span>
           </button>
         </div>
 
         {/* Resumes Grid */}
         {hasResumes ? (
-          <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-            {allResumes.map((resume) => renderResumeCard(resume, activeTab === 'ai'))}
-          </div>
+          <>
+            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+              {allResumes.map((resume) => renderResumeCard(resume, activeTab === 'ai'))}
+            </div>
+            {activeTab === 'ai' && aiNextPage && (
+              <div className="flex justify-center mt-8">
+                <button
+                  onClick={loadMoreAIResumes}
+                  disabled={isLoadingMore}
+                  className="px-6 py-2 bg-dark-800 hover:bg-dark-700 text-gray-300 rounded-lg transition-colors disabled:opacity-50"
+                >
+                  {isLoadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
+          </>
         ) : (
           <div className="text-center py-16 bg-dark-800/50 rounded-lg">
             <FiFileText className="mx-auto text-5xl text-gray-600 mb-4" />